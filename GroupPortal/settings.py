@@ -47,6 +47,9 @@ INSTALLED_APPS = [
     'portfolio',
     'voting',
     'polls',
+    'search',
+    'jobs',
+    'media',
 ]
 
 MIDDLEWARE = [
@@ -55,6 +58,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.PortalRolesMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -71,6 +75,8 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.context_processors.portal_roles',
+                'core.context_processors.group_profile',
             ],
         },
     },
@@ -121,6 +127,81 @@ USE_I18N = True
 USE_TZ = True
 
 
+# Ролі користувачів (core.permissions): скільки секунд кешувати групи та роль профілю
+# в CACHES['default'], 0 - лише в межах одного запиту. Ненульове значення - лише зі
+# спільним для всіх процесів кешем: з locmem зміну ролі скидає тільки процес, який її
+# зберіг, а решта до кінця таймауту працюють зі старими правами
+PORTAL_ROLES_CACHE_TIMEOUT = int(os.environ.get('PORTAL_ROLES_CACHE_TIMEOUT', 0))
+
+# Скільки секунд профіль групи (core.group_profile) живе в пам'яті процесу та в кеші.
+# Зі спільним кешем зміни видно одразу, з locmem інші процеси побачать їх через цей час
+GROUP_PROFILE_CACHE_TIMEOUT = 60
+
+# Скільки секунд кешувати структуру опитування (polls.services.poll_tree), 0 - без кешу
+POLL_TREE_CACHE_TIMEOUT = 60 * 60
+
+# Кеш: default - локальна пам'ять процесу; fragments - фрагменти спільних шаблонів
+# (core.fragments): 'locmem' або 'file' (спільний для всіх процесів, у FRAGMENT_CACHE_DIR),
+# без зовнішніх сервісів. 'locmem' коректний лише для одного процесу (runserver): скидання
+# версій фрагментів не доходить до інших воркерів, тож у gunicorn/uwsgi з кількома
+# воркерами потрібен 'file'
+FRAGMENT_CACHE_BACKEND = os.environ.get('FRAGMENT_CACHE_BACKEND', 'locmem')
+FRAGMENT_CACHE_DIR = os.environ.get('FRAGMENT_CACHE_DIR', str(BASE_DIR / '.cache' / 'fragments'))
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'fragments': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': FRAGMENT_CACHE_DIR,
+    } if FRAGMENT_CACHE_BACKEND == 'file' else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'fragments',
+    },
+}
+FRAGMENT_CACHE_ALIAS = 'fragments'
+# Скільки секунд зберігати фрагмент, 0 - без кешу фрагментів
+FRAGMENT_CACHE_TIMEOUT = 60 * 60
+
+# Ширини зменшених копій фото галереї (gallery.thumbnails), у пікселях
+GALLERY_THUMBNAIL_WIDTHS = (320, 640, 1024)
+
+# Фонові задачі (jobs, команда run_worker)
+JOBS_WORKER_PROCESSES = 2
+JOBS_MAX_ATTEMPTS = 5
+# Затримка перед повтором: JOBS_RETRY_BACKOFF * 2^(спроба-1) секунд, не більше JOBS_RETRY_BACKOFF_MAX
+JOBS_RETRY_BACKOFF = 30
+JOBS_RETRY_BACKOFF_MAX = 60 * 60
+# Задача в статусі running довше цього часу вважається покинутою і повертається в чергу
+JOBS_LOCK_TIMEOUT = 10 * 60
+JOBS_MAX_TASKS_PER_CHILD = 100
+
+# Найбільша сторона завантажених зображень після фонової обробки (core.images), у пікселях
+UPLOAD_IMAGE_MAX_SIZE = 2560
+AVATAR_MAX_SIZE = 512
+# Мініатюри скриншотів портфоліо для карток і сторінки проєкту
+PORTFOLIO_THUMBNAIL_SIZE = 480
+
+# gc_media не чіпає файли, змінені менше ніж стільки секунд тому (завантаження ще може тривати)
+MEDIA_GC_GRACE = 60 * 60
+# Файли в MEDIA_ROOT, на які посилаються не з БД (шаблони fnmatch); gc_media їх не видаляє
+MEDIA_GC_PROTECTED = ['avatars/default_avatar.png']
+
+# Віддача медіафайлів (media.views.serve_media): None - сам Django (FileResponse, sendfile
+# у gunicorn), 'x-accel-redirect' - nginx (internal location за MEDIA_ACCEL_REDIRECT_PREFIX),
+# 'x-sendfile' - Apache mod_xsendfile / lighttpd
+MEDIA_SERVE_OFFLOAD = None
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+# Скільки секунд браузер кешує медіафайли зі старими іменами (blobs/ кешуються назавжди)
+MEDIA_CACHE_MAX_AGE = 60 * 60
+
+# Поетапні завантаження (media.uploads): найбільший файл, найбільший шматок і скільки
+# секунд зберігати незавершені або неприкріплені завантаження
+MEDIA_UPLOAD_MAX_SIZE = 2 * 1024 ** 3
+MEDIA_UPLOAD_CHUNK_SIZE = 8 * 1024 ** 2
+MEDIA_UPLOAD_EXPIRY = 24 * 60 * 60
+
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
@@ -14,13 +14,13 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.conf import settings# dlya os
-from django.conf.urls.static import static
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.contrib import admin
-from django.urls import path, include
-from django.conf import settings
-from django.conf.urls.static import static
+
+from media.views import serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -34,4 +34,8 @@ urlpatterns = [
     path('accounts/', include('django.contrib.auth.urls')),  # Для login/logout
     path('voting/', include("voting.urls")),
     path('announcements/', include('announcements.urls', namespace='announcements')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    path('search/', include('search.urls', namespace='search')),
+    path('uploads/', include('media.urls', namespace='media')),
+    # Медіафайли з Range/ETag (media.views); у продакшні можна віддати вебсерверу через MEDIA_SERVE_OFFLOAD
+    re_path(r'^%s(?P<path>.*)$' % re.escape(settings.MEDIA_URL.lstrip('/')), serve_media, name='media'),
+]
\ No newline at end of file
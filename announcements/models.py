@@ -1,12 +1,14 @@
 from django.db import models
 from django.contrib.auth.models import User
+
+from media.storage import get_content_storage
 # Create your models here.
 class Announcement(models.Model):
     title = models.CharField(max_length=200)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
-    photo = models.ImageField(upload_to='static/media/', blank=True, null=True)
+    photo = models.ImageField(upload_to='static/media/', storage=get_content_storage, blank=True, null=True)
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="announcements", null=True, blank=True)
     def __str__(self):
         return self.title
\ No newline at end of file
@@ -1,3 +1,35 @@
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from .models import Announcement
+
+
+class AnnouncementOwnershipTest(TestCase):
+    """Тести для прав на зміну та видалення оголошень"""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', password='pass123')
+        User.objects.create_user(username='stranger', password='pass123')
+        User.objects.create_superuser(username='admin', password='pass123')
+        self.announcement = Announcement.objects.create(owner=self.owner, title='Збори', content='Завтра')
+        self.delete_url = reverse('announcements:announcement-delete', kwargs={'pk': self.announcement.pk})
+
+    def test_stranger_forbidden(self):
+        self.client.login(username='stranger', password='pass123')
+        self.assertEqual(self.client.post(self.delete_url).status_code, 403)
+
+    def test_ownerless_announcement_only_for_moderators(self):
+        self.announcement.owner = None
+        self.announcement.save()
+        self.client.login(username='stranger', password='pass123')
+        self.assertEqual(self.client.post(self.delete_url).status_code, 403)
+
+        self.client.login(username='admin', password='pass123')
+        self.assertRedirects(self.client.post(self.delete_url), reverse('announcements:announcement-list'))
+        self.assertFalse(Announcement.objects.exists())
+
+    def test_owner_can_delete(self):
+        self.client.login(username='owner', password='pass123')
+        self.client.post(self.delete_url)
+        self.assertFalse(Announcement.objects.exists())
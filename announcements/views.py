@@ -2,8 +2,11 @@ from django.shortcuts import render
 from django.urls import reverse_lazy
 from .models import Announcement
 from .forms import AnnouncementForm
+from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import ListView, DetailView, CreateView, View, UpdateView, DeleteView
 
+from core.mixins import OwnerRequiredMixin
+
 
 class AnnouncementListView(ListView):
     model = Announcement
@@ -25,14 +28,19 @@ class AnnouncementCreateView(CreateView):
         form.instance.owner = self.request.user
         return super().form_valid(form)
 
-class AnnouncementUpdateView(UpdateView):
+# Оголошення змінює або видаляє автор чи суперкористувач
+class AnnouncementUpdateView(LoginRequiredMixin, OwnerRequiredMixin, UpdateView):
+    allow_moderators = True
+    moderator_check = 'is_superuser'
     model = Announcement
     template_name = "announcements/announcement_update.html"
     form_class = AnnouncementForm
     success_url = reverse_lazy('announcements:announcement-list')
 
 
-class AnnouncementDeleteView(DeleteView):
+class AnnouncementDeleteView(LoginRequiredMixin, OwnerRequiredMixin, DeleteView):
+    allow_moderators = True
+    moderator_check = 'is_superuser'
     model = Announcement
     template_name = "announcements/announcement_delete.html"
     success_url = reverse_lazy('announcements:announcement-list')
@@ -0,0 +1,14 @@
+from django.utils.functional import SimpleLazyObject
+
+from .group_profile import get_group_profile
+from .permissions import get_portal_roles
+
+
+def portal_roles(request):
+    """Робить portal_roles доступним у всіх шаблонах"""
+    return {'portal_roles': get_portal_roles(request)}
+
+
+def group_profile(request):
+    """Профіль групи в усіх шаблонах; читається лише якщо шаблон до нього звернувся"""
+    return {'group_profile': SimpleLazyObject(get_group_profile)}
@@ -1,6 +1,8 @@
 from django import forms
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm
+from .images import enqueue_downscale
 from .models import UserProfile
 
 # Форма реєстації нових користувачів
@@ -38,4 +40,8 @@ class SignUpForm(UserCreationForm):
                     profile.avatar = self.cleaned_data['avatar']
                     profile.save()
 
+            if self.cleaned_data['avatar']:
+                # Аватар зменшується у фоні (run_worker), реєстрація не чекає на обробку
+                enqueue_downscale(profile, 'avatar', settings.AVATAR_MAX_SIZE)
+
         return user
\ No newline at end of file
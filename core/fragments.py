@@ -0,0 +1,66 @@
+"""Кеш фрагментів спільних шаблонів (навбар, футер, блок групи, чип користувача).
+
+Ключ фрагмента містить номер версії його "простору" (наприклад,
+group_profile або user_chip:42). Щоб скинути всі варіанти фрагмента,
+достатньо змінити версію (bump) - старі записи просто перестають
+читатися і витісняються за часом. Версії змінюють сигнали з
+core/signals.py. Кеш - окремий аліас FRAGMENT_CACHE_ALIAS (locmem або
+файловий, див. FRAGMENT_CACHE_BACKEND у налаштуваннях).
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import InvalidCacheBackendError, caches
+
+DEFAULT_ALIAS = 'fragments'
+
+GROUP_PROFILE = 'group_profile'
+NAVBAR = 'navbar'
+FOOTER = 'footer'
+
+
+def user_chip(user_id):
+    return f'user_chip:{user_id}'
+
+
+def get_cache():
+    alias = getattr(settings, 'FRAGMENT_CACHE_ALIAS', DEFAULT_ALIAS)
+    try:
+        return caches[alias]
+    except InvalidCacheBackendError:
+        return caches['default']
+
+
+def timeout():
+    """Скільки секунд зберігати фрагмент; 0 вимикає кеш фрагментів"""
+    return getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 60 * 60)
+
+
+def _version_key(namespace):
+    return f'fragment_version:{namespace}'
+
+
+def version(namespace):
+    cache = get_cache()
+    key = _version_key(namespace)
+    current = cache.get(key)
+    if current is None:
+        # Початкова версія з часу, а не 1: якщо лічильник витіснили, а фрагменти
+        # лишилися, нова версія не збіжеться зі старими ключами
+        cache.add(key, time.time_ns(), None)
+        current = cache.get(key)
+    return current
+
+
+def bump(*namespaces):
+    """Робить застарілими всі закешовані фрагменти цих просторів"""
+    stamp = time.time_ns()
+    get_cache().set_many({_version_key(namespace): stamp for namespace in namespaces}, None)
+
+
+def fragment_key(namespace, vary_on=()):
+    digest = hashlib.md5(
+        ':'.join(str(value) for value in vary_on).encode(), usedforsecurity=False
+    ).hexdigest()
+    return f'fragment:{namespace}:{version(namespace)}:{digest}'
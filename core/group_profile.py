@@ -0,0 +1,63 @@
+"""Єдиний профіль групи для всіх сторінок (логотип, назва у футері).
+
+Профіль кешується двічі: у фреймворку кешу (спільному для процесів, якщо
+кеш спільний) і в пам'яті процесу разом із номером версії. Процес
+звіряє лише версію в кеші, тож після прогріву запит не звертається до БД.
+Збереження чи видалення GroupProfile змінює версію після коміту
+(core/signals.py). Зі спільним кешем це одразу бачать усі процеси; з
+locmem - лише процес, що зберіг профіль, тому обидві копії живуть не
+довше GROUP_PROFILE_CACHE_TIMEOUT секунд.
+Повернений об'єкт спільний для всіх запитів процесу - його не можна змінювати.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import GroupProfile
+
+CACHE_KEY = 'group_profile'
+VERSION_KEY = 'group_profile:version'
+
+_MISSING = object()
+_lock = threading.Lock()
+_memo = {'version': None, 'profile': None, 'expires': 0.0}
+
+
+def cache_timeout():
+    """Скільки секунд профіль живе в пам'яті процесу та в кеші"""
+    return getattr(settings, 'GROUP_PROFILE_CACHE_TIMEOUT', 60)
+
+
+def _current_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def get_group_profile():
+    """Профіль групи (найстаріший запис) або None, якщо його ще не створили"""
+    now = time.monotonic()
+    version = _current_version()
+    if _memo['version'] == version and now < _memo['expires']:
+        return _memo['profile']
+
+    timeout = cache_timeout()
+    profile = cache.get(CACHE_KEY, _MISSING)
+    if profile is _MISSING:
+        profile = GroupProfile.objects.order_by('pk').first()
+        # None теж кешується, щоб портал без профілю не робив запит на кожній сторінці
+        cache.set(CACHE_KEY, profile, timeout)
+    with _lock:
+        _memo['version'] = version
+        _memo['profile'] = profile
+        _memo['expires'] = now + timeout
+    return profile
+
+
+def invalidate_group_profile():
+    cache.delete(CACHE_KEY)
+    cache.set(VERSION_KEY, time.time_ns(), None)
@@ -0,0 +1,71 @@
+"""Зменшення завантажених зображень у фоні.
+
+Веб-запит лише ставить задачу core.downscale_image (core/tasks.py), а
+воркер run_worker зменшує оригінал до max_size по більшій стороні,
+розвертає його за EXIF і підміняє файл у полі моделі.
+"""
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.dispatch import Signal
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from jobs import queue
+
+# Формати, які можна перезберегти без втрат функціональності (анімовані GIF не чіпаємо)
+SUPPORTED_FORMATS = {'JPEG': {'quality': 85, 'optimize': True}, 'PNG': {'optimize': True}, 'WEBP': {'quality': 85}}
+ORIENTATION_TAG = 0x0112
+
+# Надсилається задачею core.downscale_image після підміни файлу через update(),
+# тобто без post_save: sender - клас моделі, аргументи instance_pk і field
+image_downscaled = Signal()
+
+
+def downscale(field_file, max_size):
+    """Зберігає зменшену копію поруч з оригіналом; повертає її ім'я або None, якщо зменшувати не треба"""
+    storage = field_file.storage
+    try:
+        with storage.open(field_file.name, 'rb') as source:
+            image = Image.open(source)
+            image_format = image.format
+            if image_format not in SUPPORTED_FORMATS:
+                return None
+            rotated = image.getexif().get(ORIENTATION_TAG, 1) != 1
+            if max(image.size) <= max_size and not rotated:
+                return None
+            image.draft(image.mode, (max_size, max_size))
+            image = ImageOps.exif_transpose(image)
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+        return None
+
+    image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS, reducing_gap=3.0)
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, image_format, **SUPPORTED_FORMATS[image_format])
+    return storage.save(field_file.name, ContentFile(buffer.getvalue()))
+
+
+def _downscale_job(instance, field_name, max_size):
+    label = instance._meta.label
+    return (
+        f'downscale:{label}:{instance.pk}:{field_name}',
+        {'model': label, 'pk': instance.pk, 'field': field_name, 'max_size': max_size},
+    )
+
+
+def enqueue_downscale(instance, field_name, max_size):
+    """Ставить у чергу зменшення зображення з поля instance.field_name"""
+    if not getattr(instance, field_name):
+        return None
+    key, payload = _downscale_job(instance, field_name, max_size)
+    return queue.enqueue('core.downscale_image', key=key, **payload)
+
+
+def enqueue_downscale_many(instances, field_name, max_size):
+    """Те саме для пачки об'єктів однієї моделі - двома запитами незалежно від кількості"""
+    jobs = [
+        _downscale_job(instance, field_name, max_size)
+        for instance in instances if getattr(instance, field_name)
+    ]
+    return queue.enqueue_many('core.downscale_image', jobs) if jobs else []
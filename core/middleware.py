@@ -0,0 +1,12 @@
+from .permissions import PortalRoles
+
+
+class PortalRolesMiddleware:
+    """Додає до запиту request.portal_roles (має стояти після AuthenticationMiddleware)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.portal_roles = PortalRoles(request.user)
+        return self.get_response(request)
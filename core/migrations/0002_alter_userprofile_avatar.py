@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:26
+
+import media.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='userprofile',
+            name='avatar',
+            field=models.ImageField(blank=True, null=True, storage=media.storage.get_content_storage, upload_to='avatars/'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+from django.contrib.auth.mixins import UserPassesTestMixin
+
+from .permissions import get_portal_roles
+
+
+class ModeratorRequiredMixin(UserPassesTestMixin):
+    """Доступ лише для модераторів розділу.
+
+    moderator_check - назва перевірки core.permissions.PortalRoles
+    (is_moderator, is_vote_moderator, has_moderator_role, is_staff...).
+    """
+    moderator_check = 'is_moderator'
+
+    def test_func(self):
+        return getattr(get_portal_roles(self.request), self.moderator_check)
+
+
+class OwnerRequiredMixin(UserPassesTestMixin):
+    """Доступ до об'єкта (UpdateView, DeleteView, DetailView) лише для його власника.
+
+    Об'єкт завантажується один раз: get_object() запам'ятовується на view,
+    тож перевірка і сам обробник запиту використовують той самий екземпляр.
+    Власник порівнюється за id зовнішнього ключа, без завантаження User.
+    allow_moderators - модератори (перевірка moderator_check з PortalRoles)
+    теж мають доступ, без запиту об'єкта.
+    """
+    owner_field = 'owner'
+    allow_moderators = False
+    moderator_check = 'is_moderator'
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_owned_object'):
+            self._owned_object = super().get_object()
+        return self._owned_object
+
+    def is_owner(self, obj):
+        user_id = self.request.user.pk
+        return user_id is not None and getattr(obj, f'{self.owner_field}_id') == user_id
+
+    def test_func(self):
+        if self.allow_moderators and getattr(get_portal_roles(self.request), self.moderator_check):
+            return True
+        return self.is_owner(self.get_object())
+
+
+class OwnedQuerysetMixin:
+    """Для списків: лише об'єкти поточного користувача, фільтр виконується в SQL"""
+    owner_field = 'owner'
+
+    def get_owned_queryset(self, queryset):
+        return queryset.filter(**{f'{self.owner_field}_id': self.request.user.pk})
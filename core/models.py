@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import User
 
+from media.storage import get_content_storage
+
 # Модель "Профіль групи"
 class GroupProfile(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -26,7 +28,7 @@ class UserProfile(models.Model):
     )
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     bio = models.TextField(blank=True, null=True)
-    avatar = models.ImageField(upload_to='avatars/', blank=True, null=True)
+    avatar = models.ImageField(upload_to='avatars/', storage=get_content_storage, blank=True, null=True)
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='member')
 
     def __str__(self):
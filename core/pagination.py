@@ -0,0 +1,112 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+def encode_cursor(values):
+    raw = json.dumps([str(value) for value in values]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Розбирає курсор; для пошкодженого курсора повертає None"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or len(values) != 2:
+        return None
+    return values
+
+
+class KeysetPage:
+    def __init__(self, object_list, has_next, has_previous, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """Пагінація за ключем (field, pk) замість OFFSET.
+
+    Кожна сторінка - це один запит "WHERE (field, pk) > курсор LIMIT n",
+    який іде по індексу, тому сотий екран довгого списку відкривається
+    так само швидко, як перший. Курсори - непрозорі рядки для ?after= / ?before=.
+    """
+
+    def __init__(self, queryset, field, per_page, descending=False):
+        self.queryset = queryset
+        self.field = field
+        self.per_page = per_page
+        self.descending = descending
+        self._model_field = queryset.model._meta.get_field(field)
+        self._pk_field = queryset.model._meta.pk
+
+    def _order(self, reverse=False):
+        descending = self.descending != reverse
+        prefix = '-' if descending else ''
+        return [prefix + self.field, prefix + 'pk']
+
+    def _beyond(self, cursor, reverse=False):
+        """Умова "після курсора" у напрямку сортування (або навпаки, якщо reverse)"""
+        value, pk = cursor
+        lookup = 'lt' if self.descending != reverse else 'gt'
+        return (
+            Q(**{f'{self.field}__{lookup}': value}) |
+            Q(**{self.field: value, f'pk__{lookup}': pk})
+        )
+
+    def _parse(self, token):
+        values = decode_cursor(token) if token else None
+        if values is None:
+            return None
+        try:
+            return self._model_field.to_python(values[0]), self._pk_field.to_python(values[1])
+        except ValidationError:
+            return None
+
+    def cursor_for(self, obj):
+        value = getattr(obj, self.field)
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        return encode_cursor([value, obj.pk])
+
+    def page(self, after=None, before=None):
+        after = self._parse(after)
+        before = self._parse(before) if after is None else None
+
+        if before is not None:
+            rows = list(
+                self.queryset.filter(self._beyond(before, reverse=True))
+                .order_by(*self._order(reverse=True))[:self.per_page + 1]
+            )
+            has_previous = len(rows) > self.per_page
+            items = rows[:self.per_page][::-1]
+            has_next = True
+        else:
+            queryset = self.queryset
+            if after is not None:
+                queryset = queryset.filter(self._beyond(after))
+            rows = list(queryset.order_by(*self._order())[:self.per_page + 1])
+            has_next = len(rows) > self.per_page
+            items = rows[:self.per_page]
+            has_previous = after is not None
+
+        return KeysetPage(
+            items,
+            has_next=has_next and bool(items),
+            has_previous=has_previous and bool(items),
+            next_cursor=self.cursor_for(items[-1]) if items else None,
+            previous_cursor=self.cursor_for(items[0]) if items else None,
+        )
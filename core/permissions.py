@@ -0,0 +1,118 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+# Назва групи модераторів і ролі профілю, які мають права модератора
+MODERATORS_GROUP = 'Moderators'
+MODERATOR_ROLES = ('moderator', 'admin')
+
+
+def roles_cache_key(user_id):
+    return f'portal_roles:{user_id}'
+
+
+def invalidate_roles(*user_ids):
+    """Скидає закешовані ролі користувачів (викликається з core/signals.py)"""
+    cache.delete_many([roles_cache_key(user_id) for user_id in user_ids])
+
+
+def load_roles(user):
+    """Групи та роль профілю користувача одним запитом"""
+    timeout = getattr(settings, 'PORTAL_ROLES_CACHE_TIMEOUT', 0)
+    key = roles_cache_key(user.pk)
+    if timeout:
+        data = cache.get(key)
+        if data is not None:
+            return data
+
+    rows = User.objects.filter(pk=user.pk).values_list('groups__name', 'profile__role')
+    groups = []
+    role = None
+    for group_name, profile_role in rows:
+        if group_name:
+            groups.append(group_name)
+        role = profile_role
+    data = {'groups': groups, 'role': role}
+
+    if timeout:
+        cache.set(key, data, timeout)
+    return data
+
+
+class PortalRoles:
+    """Права користувача порталу, обчислені один раз на запит.
+
+    Доступні як request.portal_roles (core.middleware.PortalRolesMiddleware)
+    і як portal_roles у шаблонах. Розділи порталу мають різні правила
+    модерації, і кожне лишається окремою перевіркою: голосування -
+    is_vote_moderator (staff або група Moderators), щоденник, форум,
+    матеріали й опитування - has_moderator_role (роль профілю),
+    повний список оцінок - is_staff. is_moderator об'єднує всі правила.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._data = None
+
+    def _load(self):
+        if self._data is None:
+            if self.user.is_authenticated:
+                self._data = load_roles(self.user)
+            else:
+                self._data = {'groups': [], 'role': None}
+        return self._data
+
+    @property
+    def is_authenticated(self):
+        return self.user.is_authenticated
+
+    @property
+    def is_staff(self):
+        return self.user.is_authenticated and (self.user.is_staff or self.user.is_superuser)
+
+    @property
+    def groups(self):
+        return frozenset(self._load()['groups'])
+
+    @property
+    def role(self):
+        return self._load()['role']
+
+    def in_group(self, name):
+        return name in self.groups
+
+    @property
+    def is_admin(self):
+        return self.is_staff or self.role == 'admin'
+
+    @property
+    def is_superuser(self):
+        return self.user.is_authenticated and self.user.is_superuser
+
+    @property
+    def has_moderator_role(self):
+        """Роль профілю moderator/admin - правило щоденника, форуму, матеріалів і опитувань"""
+        return self.user.is_authenticated and self.role in MODERATOR_ROLES
+
+    @property
+    def is_vote_moderator(self):
+        """Staff або член групи Moderators - правило голосувань"""
+        return self.is_staff or (self.user.is_authenticated and self.in_group(MODERATORS_GROUP))
+
+    @property
+    def is_moderator(self):
+        """Будь-яке з правил вище - для спільних розділів (модерація галереї, позначка в навбарі)"""
+        if not self.user.is_authenticated:
+            return False
+        return (
+            self.is_staff or
+            self.in_group(MODERATORS_GROUP) or
+            self.role in MODERATOR_ROLES
+        )
+
+
+def get_portal_roles(request):
+    """Ролі поточного користувача, навіть якщо middleware не підключено"""
+    if not hasattr(request, 'portal_roles'):
+        request.portal_roles = PortalRoles(request.user)
+    return request.portal_roles
@@ -0,0 +1,84 @@
+from functools import partial
+
+from django.contrib.auth.models import Group, User
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import fragments
+from .group_profile import invalidate_group_profile
+from .images import image_downscaled
+from .models import GroupProfile, UserProfile
+from .permissions import invalidate_roles
+
+
+def bump_fragments(*namespaces):
+    """Скидає фрагменти після коміту, як і решту кешів нижче: інакше запит
+    між скиданням і комітом закешує старий вміст під новою версією"""
+    transaction.on_commit(partial(fragments.bump, *namespaces))
+
+
+def reset_users(*user_ids):
+    """Скидає закешовані ролі та чипи користувачів у навбарі.
+
+    Ролі скидаються після коміту: інакше паралельний запит може між
+    скиданням і комітом прочитати старі ролі й знову їх закешувати.
+    """
+    transaction.on_commit(partial(invalidate_roles, *user_ids))
+    bump_fragments(*(fragments.user_chip(user_id) for user_id in user_ids))
+
+
+@receiver(post_save, sender=User)
+def reset_roles_for_new_user(sender, instance, created, **kwargs):
+    """Новий користувач може отримати id видаленого - скидаємо старий кеш"""
+    if created:
+        transaction.on_commit(partial(invalidate_roles, instance.pk))
+    # Ім'я користувача показується в чипі навбару
+    bump_fragments(fragments.user_chip(instance.pk))
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def reset_roles_on_profile_change(sender, instance, **kwargs):
+    reset_users(instance.user_id)
+
+
+@receiver(image_downscaled, sender=UserProfile)
+def reset_chip_on_avatar_downscale(sender, instance_pk, **kwargs):
+    user_id = UserProfile.objects.filter(pk=instance_pk).values_list('user_id', flat=True).first()
+    if user_id is not None:
+        bump_fragments(fragments.user_chip(user_id))
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def reset_roles_on_membership_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # Після clear() учасників групи вже не знайти - запам'ятовуємо їх заздалегідь
+        instance._cleared_user_ids = list(instance.user_set.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        # instance - користувач
+        reset_users(instance.pk)
+    elif action == 'post_clear':
+        reset_users(*instance.__dict__.pop('_cleared_user_ids', ()))
+    else:
+        # instance - група, pk_set - користувачі
+        reset_users(*pk_set)
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def reset_roles_on_group_change(sender, instance, created=False, **kwargs):
+    if not created:
+        reset_users(*instance.user_set.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=GroupProfile)
+@receiver(post_delete, sender=GroupProfile)
+def reset_group_profile(sender, **kwargs):
+    # Після коміту: запит між скиданням і комітом закешував би старий профіль під новою версією
+    transaction.on_commit(invalidate_group_profile)
+    # Назва й логотип групи є в блоці логотипа навбару та у футері
+    bump_fragments(fragments.GROUP_PROFILE, fragments.FOOTER)
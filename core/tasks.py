@@ -0,0 +1,26 @@
+from django.apps import apps
+
+from jobs.registry import task
+
+from . import images
+
+
+@task('core.downscale_image')
+def downscale_image(model, pk, field, max_size):
+    model_class = apps.get_model(model)
+    instance = model_class._default_manager.filter(pk=pk).first()
+    if instance is None:
+        return
+    field_file = getattr(instance, field)
+    if not field_file:
+        return
+    old_name = field_file.name
+    new_name = images.downscale(field_file, max_size)
+    if new_name is None:
+        return
+
+    # Підміняємо файл, лише якщо користувач не встиг завантажити інший
+    updated = model_class._default_manager.filter(pk=pk, **{field: old_name}).update(**{field: new_name})
+    field_file.storage.delete(old_name if updated else new_name)
+    if updated:
+        images.image_downscaled.send(sender=model_class, instance_pk=pk, field=field)
@@ -0,0 +1,56 @@
+from django import template
+
+from core import fragments
+
+register = template.Library()
+
+
+class FragmentNode(template.Node):
+    def __init__(self, nodelist, namespace, scope, vary_on):
+        self.nodelist = nodelist
+        self.namespace = namespace
+        self.scope = scope
+        self.vary_on = vary_on
+
+    def render(self, context):
+        timeout = fragments.timeout()
+        if not timeout:
+            return self.nodelist.render(context)
+        namespace = self.namespace.resolve(context)
+        if self.scope is not None:
+            namespace = f'{namespace}:{self.scope.resolve(context)}'
+        key = fragments.fragment_key(namespace, [var.resolve(context) for var in self.vary_on])
+        cache = fragments.get_cache()
+        value = cache.get(key)
+        if value is None:
+            value = self.nodelist.render(context)
+            cache.set(key, value, timeout)
+        return value
+
+
+@register.tag('fragment')
+def do_fragment(parser, token):
+    """Кешує фрагмент шаблону з версійованим ключем (core/fragments.py).
+
+        {% fragment "navbar" %}...{% endfragment %}
+        {% fragment "user_chip" scope=user.pk %}...{% endfragment %}
+
+    scope додається до простору імен: версія user_chip:42 скидається окремо
+    для кожного користувача. Інші аргументи - додаткові складові ключа.
+    Усередині фрагмента не можна виводити значення, унікальні для запиту
+    (наприклад, {% csrf_token %}).
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' потребує щонайменше назву фрагмента")
+    nodelist = parser.parse(('endfragment',))
+    parser.delete_first_token()
+    scope = None
+    vary_on = []
+    for bit in bits[2:]:
+        if bit.startswith('scope='):
+            scope = parser.compile_filter(bit[len('scope='):])
+        else:
+            vary_on.append(parser.compile_filter(bit))
+    return FragmentNode(nodelist, parser.compile_filter(bits[1]), scope, vary_on)
+
@@ -1,3 +1,270 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from io import BytesIO
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, Group, User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+
+from jobs import queue
+from jobs.models import Job
+
+from . import fragments
+from .group_profile import get_group_profile, invalidate_group_profile
+from .images import enqueue_downscale
+from .models import GroupProfile, UserProfile
+from .permissions import PortalRoles
+
+
+@override_settings(PORTAL_ROLES_CACHE_TIMEOUT=300)
+class PortalRolesTest(TestCase):
+    """Тести для core.permissions.PortalRoles"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='member', password='pass123')
+        self.profile = UserProfile.objects.create(user=self.user, role='member')
+
+    def test_anonymous_user_has_no_roles(self):
+        roles = PortalRoles(AnonymousUser())
+        with self.assertNumQueries(0):
+            self.assertFalse(roles.is_moderator)
+            self.assertIsNone(roles.role)
+
+    def test_roles_resolved_with_single_query(self):
+        self.user.groups.add(Group.objects.create(name='Moderators'))
+        roles = PortalRoles(self.user)
+        with self.assertNumQueries(1):
+            self.assertTrue(roles.is_moderator)
+            self.assertEqual(roles.role, 'member')
+            self.assertTrue(roles.in_group('Moderators'))
+
+    def test_roles_cached_between_requests(self):
+        PortalRoles(self.user).role
+        with self.assertNumQueries(0):
+            self.assertEqual(PortalRoles(self.user).role, 'member')
+
+    def test_profile_role_change_invalidates_cache(self):
+        self.assertFalse(PortalRoles(self.user).is_moderator)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.role = 'moderator'
+            self.profile.save()
+            # До коміту кеш не скидається, щоб паралельний запит не закешував старі ролі
+            self.assertFalse(PortalRoles(self.user).is_moderator)
+        self.assertTrue(PortalRoles(self.user).is_moderator)
+
+    def test_group_membership_change_invalidates_cache(self):
+        group = Group.objects.create(name='Moderators')
+        self.assertFalse(PortalRoles(self.user).is_moderator)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            group.user_set.add(self.user)
+        self.assertTrue(PortalRoles(self.user).is_moderator)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.groups.clear()
+        self.assertFalse(PortalRoles(self.user).is_moderator)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            group.user_set.add(self.user)
+        self.assertTrue(PortalRoles(self.user).is_moderator)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            group.user_set.clear()
+        self.assertFalse(PortalRoles(self.user).is_moderator)
+
+    def test_section_rules_stay_separate(self):
+        group_member = User.objects.create_user(username='group_member')
+        group_member.groups.add(Group.objects.create(name='Moderators'))
+        self.profile.role = 'moderator'
+        self.profile.save()
+
+        roles = PortalRoles(group_member)
+        self.assertTrue(roles.is_vote_moderator)
+        self.assertFalse(roles.has_moderator_role)
+        self.assertFalse(roles.is_staff)
+
+        roles = PortalRoles(self.user)
+        self.assertTrue(roles.has_moderator_role)
+        self.assertFalse(roles.is_vote_moderator)
+        self.assertTrue(roles.is_moderator)
+
+    def test_staff_is_moderator(self):
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        self.assertTrue(PortalRoles(staff).is_moderator)
+        self.assertTrue(PortalRoles(staff).is_admin)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), AVATAR_MAX_SIZE=100)
+class DownscaleImageTest(TestCase):
+    """Тести для фонового зменшення завантажених зображень"""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.profile = UserProfile.objects.create(user=self.user)
+        self.client.login(username='testuser', password='testpass123')
+
+    def upload(self, size):
+        buffer = BytesIO()
+        Image.new('RGB', size, (10, 120, 200)).save(buffer, 'JPEG')
+        return SimpleUploadedFile('avatar.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+    def test_avatar_downscaled_by_worker(self):
+        self.client.post(reverse('core:user_profile_edit'), {'bio': '', 'avatar': self.upload((800, 400))})
+        self.profile.refresh_from_db()
+        original = self.profile.avatar.name
+        self.assertEqual(Job.objects.filter(name='core.downscale_image').count(), 1)
+
+        queue.run_pending()
+
+        self.profile.refresh_from_db()
+        self.assertNotEqual(self.profile.avatar.name, original)
+        self.assertFalse(self.profile.avatar.storage.exists(original))
+        with self.profile.avatar.open() as f:
+            self.assertEqual(Image.open(f).size, (100, 50))
+
+    def test_small_avatar_is_left_as_is(self):
+        self.profile.avatar = self.upload((80, 80))
+        self.profile.save()
+        enqueue_downscale(self.profile, 'avatar', 100)
+
+        queue.run_pending()
+
+        name = self.profile.avatar.name
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.avatar.name, name)
+
+
+class FragmentCacheTest(TestCase):
+    """Тести для кешу фрагментів навбару й футера (core.fragments)"""
+
+    def setUp(self):
+        fragments.get_cache().clear()
+        invalidate_group_profile()
+        self.url = reverse('gallery_list')
+        self.user = User.objects.create_user(username='member', password='pass123')
+        UserProfile.objects.create(user=self.user, role='member')
+
+    def group_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        return response, [q['sql'] for q in queries.captured_queries if 'core_groupprofile' in q['sql']]
+
+    def test_group_block_cached_until_profile_changes(self):
+        group = GroupProfile.objects.create(name='КН-21')
+
+        response, queries = self.group_queries()
+        self.assertContains(response, 'КН-21')
+        self.assertTrue(queries)
+
+        response, queries = self.group_queries()
+        self.assertContains(response, 'КН-21')
+        self.assertEqual(queries, [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            group.name = 'КН-22'
+            group.save()
+        response, _ = self.group_queries()
+        self.assertContains(response, 'КН-22')
+        self.assertNotContains(response, 'КН-21')
+
+    def test_user_chip_invalidated_by_profile_and_groups(self):
+        self.client.login(username='member', password='pass123')
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Профіль (member)')
+        self.assertNotContains(response, 'модератор</span>')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.groups.add(Group.objects.create(name='Moderators'))
+        response = self.client.get(self.url)
+        self.assertContains(response, 'модератор</span>')
+
+        chip_key = fragments.fragment_key(fragments.user_chip(self.user.pk))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.username = 'renamed'
+            self.user.save()
+            # До коміту версія чипа не змінюється
+            self.assertEqual(fragments.fragment_key(fragments.user_chip(self.user.pk)), chip_key)
+        self.client.force_login(self.user)
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Профіль (renamed)')
+
+    def test_chip_is_per_user_and_csrf_not_cached(self):
+        other = User.objects.create_user(username='other', password='pass123')
+        self.client.login(username='member', password='pass123')
+        self.client.get(self.url)
+
+        self.client.force_login(other)
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Профіль (other)')
+        self.assertNotContains(response, 'Профіль (member)')
+        self.assertContains(response, 'csrfmiddlewaretoken')
+
+    @override_settings(FRAGMENT_CACHE_TIMEOUT=0)
+    def test_zero_timeout_disables_cache(self):
+        self.client.login(username='member', password='pass123')
+        self.client.get(self.url)
+        # update() не надсилає сигналів, тож зміну видно лише без кешу фрагментів
+        User.objects.filter(pk=self.user.pk).update(username='renamed')
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Профіль (renamed)')
+
+
+class GroupProfileContextTest(TestCase):
+    """Тести для профілю групи в контексті всіх шаблонів"""
+
+    def setUp(self):
+        invalidate_group_profile()
+        self.group = GroupProfile.objects.create(name='КН-21')
+        GroupProfile.objects.create(name='Пізніший профіль')
+
+    def test_oldest_profile_available_everywhere(self):
+        response = self.client.get(reverse('gallery_list'))
+        self.assertEqual(response.context['group_profile'].pk, self.group.pk)
+
+        response = self.client.get(reverse('core:group_profile'))
+        self.assertEqual(response.context['group'].pk, self.group.pk)
+
+    def test_no_queries_after_warm_up(self):
+        get_group_profile()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_group_profile().name, 'КН-21')
+
+        # Інший процес: пам'ять порожня, але профіль є у спільному кеші
+        from . import group_profile
+        group_profile._memo['version'] = None
+        with self.assertNumQueries(0):
+            self.assertEqual(get_group_profile().name, 'КН-21')
+
+    def test_save_invalidates_after_commit(self):
+        get_group_profile()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.name = 'КН-22'
+            self.group.save()
+            self.assertEqual(get_group_profile().name, 'КН-21')
+
+        self.assertEqual(get_group_profile().name, 'КН-22')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            GroupProfile.objects.all().delete()
+        self.assertIsNone(get_group_profile())
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_group_profile())
+
+    def test_memo_expires(self):
+        with override_settings(GROUP_PROFILE_CACHE_TIMEOUT=0):
+            get_group_profile()
+            # Зміна з іншого процесу: версія в locmem цього процесу не змінилась
+            GroupProfile.objects.filter(pk=self.group.pk).update(name='КН-23')
+            self.assertEqual(get_group_profile().name, 'КН-23')
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.shortcuts import render, redirect
 from django.urls import reverse_lazy
 from django.contrib import messages
@@ -5,6 +6,8 @@ from django.views.generic import DetailView, UpdateView, CreateView
 from .models import GroupProfile, UserProfile
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from .forms import SignUpForm
+from .group_profile import get_group_profile
+from .images import enqueue_downscale
 from django.contrib.auth import login
 from django.contrib.auth.models import User
 
@@ -16,8 +19,8 @@ class GroupProfileView(DetailView):
     context_object_name = 'group'
 
     def get_object(self):
-        # Отримуємо перший профіль групи (припускаємо, що є лише один)
-        return GroupProfile.objects.first()
+        # Єдиний профіль групи з кешу (core/group_profile.py)
+        return get_group_profile()
     
     # Додаємо список користувачів
     def get_context_data(self, **kwargs):
@@ -54,7 +57,10 @@ class UserProfileUpdateView(LoginRequiredMixin, UpdateView):
 
     def form_valid(self, form):
         messages.success(self.request, 'Профіль успішно оновлено!')
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        if 'avatar' in form.changed_data:
+            enqueue_downscale(self.object, 'avatar', settings.AVATAR_MAX_SIZE)
+        return response
 
 
 # Створення нового користувача (реєстрація)
@@ -0,0 +1,99 @@
+"""Зведена відомість оцінок: учні × предмети.
+
+Усе рахується в БД. Середні та кількості беруться з одного згрупованого
+запиту з JOIN на профіль, користувача і предмет. Підсумки по учню й
+предмету складаються з сум і кількостей клітинок. Медіани рахуються
+віконними функціями, і з БД приходять лише одне-два серединні значення
+на групу. Кількість запитів не залежить ні від кількості учнів, ні від
+кількості оцінок.
+"""
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from django.db.models import Count, F, Sum, Window
+from django.db.models.functions import RowNumber
+
+
+@dataclass
+class GradeStats:
+    count: int = 0
+    total: int = 0
+    median: float | None = None
+
+    @property
+    def average(self):
+        return self.total / self.count if self.count else None
+
+    def add(self, count, total):
+        self.count += count
+        self.total += total
+
+
+@dataclass
+class GradebookColumn:
+    subject_id: int
+    name: str
+    stats: GradeStats = field(default_factory=GradeStats)
+
+
+@dataclass
+class GradebookRow:
+    student_id: int
+    username: str
+    cells: list
+    stats: GradeStats = field(default_factory=GradeStats)
+
+
+@dataclass
+class Gradebook:
+    columns: list
+    rows: list
+
+
+def medians(grades, group_field):
+    """Медіана оцінок для кожного значення group_field: {id: медіана}"""
+    ranked = grades.order_by().annotate(
+        position=Window(RowNumber(), partition_by=[F(group_field)], order_by=[F('score').asc(), F('pk').asc()]),
+        group_size=Window(Count('pk'), partition_by=[F(group_field)]),
+    )
+    # Серединний рядок (непарна кількість) або два серединні (парна)
+    middle = ranked.filter(position__gte=F('group_size') / 2.0, position__lte=F('group_size') / 2.0 + 1)
+    scores = defaultdict(list)
+    for key, score in middle.values_list(group_field, 'score'):
+        scores[key].append(score)
+    return {key: sum(values) / len(values) for key, values in scores.items()}
+
+
+def build_gradebook(grades):
+    """Відомість за вибіркою оцінок grades (QuerySet Grade, вже відфільтрований)"""
+    cells = (
+        grades.order_by()
+        .values('student_id', 'student__user__username', 'subject_id', 'subject__name')
+        .annotate(count=Count('pk'), total=Sum('score'))
+    )
+    columns = {}
+    rows = {}
+    matrix = {}
+    for cell in cells:
+        column = columns.get(cell['subject_id'])
+        if column is None:
+            column = columns[cell['subject_id']] = GradebookColumn(cell['subject_id'], cell['subject__name'])
+        row = rows.get(cell['student_id'])
+        if row is None:
+            row = rows[cell['student_id']] = GradebookRow(cell['student_id'], cell['student__user__username'], [])
+        stats = GradeStats(cell['count'], cell['total'])
+        matrix[cell['student_id'], cell['subject_id']] = stats
+        column.stats.add(stats.count, stats.total)
+        row.stats.add(stats.count, stats.total)
+
+    if matrix:
+        for student_id, median in medians(grades, 'student_id').items():
+            rows[student_id].stats.median = median
+        for subject_id, median in medians(grades, 'subject_id').items():
+            columns[subject_id].stats.median = median
+
+    columns = sorted(columns.values(), key=lambda column: column.name)
+    rows = sorted(rows.values(), key=lambda row: row.username)
+    for row in rows:
+        row.cells = [matrix.get((row.student_id, column.subject_id)) for column in columns]
+    return Gradebook(columns, rows)
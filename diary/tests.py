@@ -1,18 +1,144 @@
+from django.contrib.auth.models import Group, User
+from django.db import connection
 from django.test import TestCase
-from django.contrib.auth.models import User
-from .models import Student, Subject, Grade
-import datetime
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import UserProfile
+
+from .gradebook import build_gradebook
+from .models import Subject, Grade
+
 
 class ModelsTestCase(TestCase):
     def setUp(self):
         user = User.objects.create(username="testuser")
-        student = Student.objects.create(user=user, full_name="Test Student")
+        student = UserProfile.objects.create(user=user)
         subject = Subject.objects.create(name="Math")
-        Grade.objects.create(student=student, subject=subject, score=10, date=datetime.date.today())
+        Grade.objects.create(student=student, subject=subject, score=10)
 
     def test_grade_created(self):
         grade = Grade.objects.first()
         self.assertEqual(grade.score, 10)
 
 
+class GradebookTest(TestCase):
+    """Тести для зведеної відомості (diary.gradebook)"""
+
+    def setUp(self):
+        self.teacher = User.objects.create_user(username='teacher', password='pass123', is_staff=True)
+        self.math = Subject.objects.create(name='Математика')
+        self.history = Subject.objects.create(name='Історія')
+        self.anna = UserProfile.objects.create(user=User.objects.create_user(username='anna'))
+        self.bohdan = UserProfile.objects.create(user=User.objects.create_user(username='bohdan'))
+
+    def grade(self, student, subject, *scores):
+        Grade.objects.bulk_create([Grade(student=student, subject=subject, score=score) for score in scores])
+
+    def test_matrix_and_statistics(self):
+        self.grade(self.anna, self.math, 10, 12, 5)
+        self.grade(self.anna, self.history, 8)
+        self.grade(self.bohdan, self.math, 4, 6)
+
+        gradebook = build_gradebook(Grade.objects.all())
+
+        self.assertEqual([column.name for column in gradebook.columns], ['Історія', 'Математика'])
+        anna, bohdan = gradebook.rows
+        self.assertEqual(anna.username, 'anna')
+        self.assertEqual(anna.cells[0].average, 8)
+        self.assertEqual(anna.cells[1].count, 3)
+        self.assertEqual(anna.stats.average, 35 / 4)
+        self.assertEqual(anna.stats.median, 9)
+        self.assertIsNone(bohdan.cells[0])
+        self.assertEqual(bohdan.stats.median, 5)
+        math = gradebook.columns[1]
+        self.assertEqual((math.stats.count, math.stats.average, math.stats.median), (5, 37 / 5, 6))
+
+    def test_empty(self):
+        gradebook = build_gradebook(Grade.objects.all())
+        self.assertEqual((gradebook.columns, gradebook.rows), ([], []))
+
+    def test_queries_do_not_grow_with_class_size(self):
+        self.grade(self.anna, self.math, 10)
+        self.client.login(username='teacher', password='pass123')
+        url = reverse('dairy:gradebook')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url)
+
+        subjects = Subject.objects.bulk_create([Subject(name=f'Предмет {i}') for i in range(15)])
+        students = [
+            UserProfile.objects.create(user=User.objects.create_user(username=f'student{i}'))
+            for i in range(30)
+        ]
+        Grade.objects.bulk_create([
+            Grade(student=student, subject=subject, score=score)
+            for student in students for subject in subjects for score in (3, 7, 11)
+        ])
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(url)
+
+        self.assertEqual(len(many), len(few))
+        self.assertEqual(len(response.context['gradebook'].rows), 31)
+        self.assertContains(response, 'student29')
+
+    def test_requires_moderator(self):
+        User.objects.create_user(username='pupil', password='pass123')
+        self.client.login(username='pupil', password='pass123')
+        self.assertEqual(self.client.get(reverse('dairy:gradebook')).status_code, 403)
+
+    def test_grade_list_joins_student_and_subject(self):
+        self.grade(self.anna, self.math, *range(1, 11))
+        self.client.login(username='teacher', password='pass123')
+        url = reverse('dairy:grade-list')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url)
+        self.grade(self.bohdan, self.history, *range(1, 21))
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(url)
+
+        self.assertEqual(len(many), len(few))
+        self.assertContains(response, 'bohdan')
+
+
+class GradeAccessTest(TestCase):
+    """Тести для прав у щоденнику: повний список - staff, зміни - роль профілю"""
+
+    def setUp(self):
+        self.math = Subject.objects.create(name='Математика')
+        self.pupil = UserProfile.objects.create(user=User.objects.create_user(username='pupil', password='pass123'))
+        other = UserProfile.objects.create(user=User.objects.create_user(username='other'))
+        self.grade = Grade.objects.create(student=self.pupil, subject=self.math, score=9)
+        Grade.objects.create(student=other, subject=self.math, score=5)
+
+        self.group_moderator = User.objects.create_user(username='group_moderator', password='pass123')
+        self.group_moderator.groups.add(Group.objects.create(name='Moderators'))
+        UserProfile.objects.create(user=self.group_moderator)
+        self.role_moderator = User.objects.create_user(username='role_moderator', password='pass123')
+        UserProfile.objects.create(user=self.role_moderator, role='moderator')
+        User.objects.create_user(username='staff', password='pass123', is_staff=True)
+
+    def grade_count(self, username):
+        self.client.login(username=username, password='pass123')
+        return len(self.client.get(reverse('dairy:grade-list')).context['grades'])
+
+    def test_full_list_only_for_staff(self):
+        self.assertEqual(self.grade_count('staff'), 2)
+        self.assertEqual(self.grade_count('pupil'), 1)
+        self.assertEqual(self.grade_count('group_moderator'), 0)
+        self.assertEqual(self.grade_count('role_moderator'), 0)
+
+    def test_moderators_group_cannot_change_grades(self):
+        self.client.login(username='group_moderator', password='pass123')
+        self.assertEqual(self.client.get(reverse('dairy:grade-add')).status_code, 403)
+        self.assertEqual(
+            self.client.post(reverse('dairy:grade-delete', kwargs={'pk': self.grade.pk})).status_code, 403
+        )
+        self.assertEqual(self.client.get(reverse('dairy:gradebook')).status_code, 403)
 
+    def test_profile_role_moderator_changes_grades(self):
+        self.client.login(username='role_moderator', password='pass123')
+        self.assertEqual(self.client.get(reverse('dairy:grade-add')).status_code, 200)
+        self.client.post(reverse('dairy:grade-delete', kwargs={'pk': self.grade.pk}))
+        self.assertFalse(Grade.objects.filter(pk=self.grade.pk).exists())
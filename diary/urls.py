@@ -1,10 +1,11 @@
 from django.urls import path
-from .views import GradeListView, GradeCreateView, GradeUpdateView, GradeDeleteView
+from .views import GradeListView, GradeCreateView, GradeUpdateView, GradeDeleteView, GradebookView
 
 app_name = 'dairy'
 
 urlpatterns = [
     path('', GradeListView.as_view(), name='grade-list'),
+    path('gradebook/', GradebookView.as_view(), name='gradebook'),
     path('add/', GradeCreateView.as_view(), name='grade-add'),
     path('<int:pk>/edit/', GradeUpdateView.as_view(), name='grade-edit'),
     path('<int:pk>/delete/', GradeDeleteView.as_view(), name='grade-delete'),
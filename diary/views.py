@@ -1,53 +1,63 @@
 from django.shortcuts import render
-from django.views.generic import ListView, CreateView, UpdateView, DeleteView
-from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.views.generic import ListView, CreateView, UpdateView, DeleteView, TemplateView
+from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
+from core.mixins import ModeratorRequiredMixin
+from core.permissions import get_portal_roles
 from .models import Grade
 from .forms import GradeForm
+from .gradebook import build_gradebook
 
 
 class GradeListView(LoginRequiredMixin, ListView):
     model = Grade
     template_name = 'diary/grade_list.html'
     context_object_name = 'grades'
+    paginate_by = 50
 
     def get_queryset(self):
-        if self.request.user.is_staff:
-            return Grade.objects.all()
-        return Grade.objects.filter(student__user=self.request.user)
+        # Учень, його користувач і предмет - в одному запиті зі сторінкою оцінок
+        queryset = Grade.objects.select_related('student__user', 'subject').order_by('-date', '-pk')
+        # Усі оцінки бачить лише staff, решта - власні
+        if get_portal_roles(self.request).is_staff:
+            return queryset
+        return queryset.filter(student__user=self.request.user)
 
 
-class GradeCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
+# Зведена відомість: учні × предмети з середніми, кількостями та медіанами
+class GradebookView(LoginRequiredMixin, ModeratorRequiredMixin, TemplateView):
+    # Відомість показує всі оцінки - те саме правило, що й повний список
+    moderator_check = 'is_staff'
+    template_name = 'diary/gradebook.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['gradebook'] = build_gradebook(Grade.objects.all())
+        return context
+
+
+class GradeCreateView(LoginRequiredMixin, ModeratorRequiredMixin, CreateView):
+    moderator_check = 'has_moderator_role'
     model = Grade
     form_class = GradeForm
     template_name = 'diary/grade_form.html'
     success_url = reverse_lazy('dairy:grade-list')
 
-    def test_func(self):
-        return self.request.user.profile.role in ['moderator', 'admin']
-        #return self.request.user.is_staff
 
-
-class GradeUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class GradeUpdateView(LoginRequiredMixin, ModeratorRequiredMixin, UpdateView):
+    moderator_check = 'has_moderator_role'
     model = Grade
     form_class = GradeForm
     template_name = 'diary/grade_form.html'
     success_url = reverse_lazy('dairy:grade-list')
 
-    def test_func(self):
-        return self.request.user.profile.role in ['moderator', 'admin']
-        #return self.request.user.is_staff
-
 
-class GradeDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class GradeDeleteView(LoginRequiredMixin, ModeratorRequiredMixin, DeleteView):
+    moderator_check = 'has_moderator_role'
     model = Grade
     template_name = 'diary/grade_confirm_delete.html'
     success_url = reverse_lazy('dairy:grade-list')
 
-    def test_func(self):
-        return self.request.user.profile.role in ['moderator', 'admin']
-        #return self.request.user.is_staff
-
 
 
         
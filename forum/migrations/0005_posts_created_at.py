@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:14
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0004_alter_posts_media_alter_theme_media'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='posts',
+            options={'ordering': ['created_at', 'id']},
+        ),
+        migrations.AddField(
+            model_name='posts',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='posts',
+            index=models.Index(fields=['theme', 'created_at'], name='forum_posts_theme_created_idx'),
+        ),
+    ]
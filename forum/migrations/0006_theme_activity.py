@@ -0,0 +1,47 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:14
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_activity(apps, schema_editor):
+    Theme = apps.get_model('forum', 'Theme')
+    Posts = apps.get_model('forum', 'Posts')
+
+    posts = Posts.objects.filter(theme=OuterRef('pk')).order_by().values('theme')
+    Theme.objects.update(
+        reply_count=Coalesce(Subquery(posts.annotate(total=Count('pk')).values('total')), 0),
+        last_post_at=Subquery(posts.annotate(last=Max('created_at')).values('last')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0005_posts_created_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='theme',
+            name='last_post_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='theme',
+            name='reply_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='theme',
+            index=models.Index(fields=['topic'], name='forum_theme_topic_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='theme',
+            index=models.Index(fields=['-last_post_at', '-id'], name='forum_theme_activity_idx'),
+        ),
+        migrations.RunPython(fill_activity, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:52
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_created_at(apps, schema_editor):
+    Theme = apps.get_model('forum', 'Theme')
+    Posts = apps.get_model('forum', 'Posts')
+
+    # Для старих тем точного часу створення немає - беремо перший пост
+    first_post = Posts.objects.filter(theme=OuterRef('pk')).order_by().values('theme').annotate(
+        first=Min('created_at')
+    ).values('first')
+    Theme.objects.update(created_at=Coalesce(Subquery(first_post), F('created_at')))
+    Theme.objects.filter(last_post_at__isnull=True).update(last_post_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0006_theme_activity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='theme',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.RunPython(fill_created_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='theme',
+            name='last_post_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
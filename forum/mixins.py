@@ -1,8 +1,8 @@
 from django.core.exceptions import PermissionDenied
+from core.permissions import get_portal_roles
 class UserIsAdminMixin(object):
     def dispatch(self, request, *args, **kwargs):
-        instance = self.get_object()
-        if self.request.user.role != 'admin' and self.request.user.role != 'moderator':
+        if not get_portal_roles(request).has_moderator_role:
             raise PermissionDenied 
         return super().dispatch(request, *args, **kwargs)
     
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
 
 # Create your models here.
@@ -10,6 +11,17 @@ class Theme(models.Model):
     question = models.CharField()
     other_content = models.CharField(null=True)
     media = models.ImageField(null=True, blank=True, upload_to='theme_static/')
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    # Денормалізована активність обговорення, оновлюється в forum/signals.py.
+    # Поки постів немає, остання активність - створення теми
+    reply_count = models.PositiveIntegerField(default=0, editable=False)
+    last_post_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['topic'], name='forum_theme_topic_idx'),
+            models.Index(fields=['-last_post_at', '-id'], name='forum_theme_activity_idx'),
+        ]
 
 
 
@@ -26,4 +38,12 @@ class Posts(models.Model):
     media = models.ImageField(null=True, blank=True, upload_to='posts_static/')
     reaction = models.CharField(max_length=20, choices=react_choices)
     theme = models.ForeignKey(Theme, on_delete=models.CASCADE)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        indexes = [
+            # Сторінки обговорення вибираються за (theme, created_at, id) - див. ThemeDetailView
+            models.Index(fields=['theme', 'created_at'], name='forum_posts_theme_created_idx'),
+        ]
 
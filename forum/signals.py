@@ -0,0 +1,31 @@
+from django.db.models import F, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Theme, Posts
+
+
+@receiver(post_save, sender=Posts)
+def count_new_post(sender, instance, created, raw=False, **kwargs):
+    """Збільшує лічильник відповідей і оновлює час останньої активності теми"""
+    if created and not raw:
+        Theme.objects.filter(pk=instance.theme_id).update(
+            reply_count=F('reply_count') + 1,
+            last_post_at=instance.created_at
+        )
+
+
+@receiver(post_delete, sender=Posts)
+def uncount_deleted_post(sender, instance, origin=None, **kwargs):
+    """Зменшує лічильник і бере час останньої активності з решти постів або створення теми"""
+    if isinstance(origin, Theme):
+        # Пости видаляються каскадом разом із темою - оновлювати нічого
+        return
+    last_post = Posts.objects.filter(theme=OuterRef('pk')).order_by().values('theme').annotate(
+        last=Max('created_at')
+    ).values('last')
+    Theme.objects.filter(pk=instance.theme_id).update(
+        reply_count=Greatest(F('reply_count') - 1, Value(0)),
+        last_post_at=Coalesce(Subquery(last_post), F('created_at'))
+    )
@@ -1,3 +1,150 @@
+from django.contrib.auth.models import Group, User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from core.models import UserProfile
+
+from .models import Theme, Posts
+
+
+class ThemeDetailPaginationTest(TestCase):
+    """Тести для посторінкового перегляду обговорення"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.theme = Theme.objects.create(owner=self.user, topic='Тема', question='Питання')
+        Posts.objects.bulk_create([
+            Posts(owner=self.user, content=f'Пост {i}', reaction='LIKE', theme=self.theme)
+            for i in range(45)
+        ])
+        self.url = reverse('theme-detail', kwargs={'pk': self.theme.pk})
+
+    def test_pages_cover_thread_in_order(self):
+        seen = []
+        response = self.client.get(self.url)
+        while True:
+            seen.extend(post.content for post in response.context['posts'])
+            page = response.context['posts_page']
+            if not page.has_next:
+                break
+            response = self.client.get(self.url, {'after': page.next_cursor})
+
+        self.assertEqual(seen, [f'Пост {i}' for i in range(45)])
+
+    def test_previous_page(self):
+        first = self.client.get(self.url).context['posts_page']
+        second = self.client.get(self.url, {'after': first.next_cursor}).context['posts_page']
+        back = self.client.get(self.url, {'before': second.previous_cursor}).context['posts_page']
+
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous)
+
+    def test_query_count_does_not_depend_on_thread_length(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+
+    def test_broken_cursor_falls_back_to_first_page(self):
+        response = self.client.get(self.url, {'after': 'зламаний'})
+        self.assertEqual(response.context['posts'][0].content, 'Пост 0')
+
+
+class ThemeActivityTest(TestCase):
+    """Тести для лічильника відповідей і сортування тем за активністю"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.quiet = Theme.objects.create(owner=self.user, topic='Тема', question='Тиха')
+        self.busy = Theme.objects.create(owner=self.user, topic='Тема', question='Активна')
+
+    def add_post(self, theme):
+        return Posts.objects.create(owner=self.user, content='Пост', reaction='LIKE', theme=theme)
+
+    def test_reply_count_and_last_post(self):
+        first = self.add_post(self.busy)
+        second = self.add_post(self.busy)
+        self.busy.refresh_from_db()
+        self.assertEqual(self.busy.reply_count, 2)
+        self.assertEqual(self.busy.last_post_at, second.created_at)
+
+        second.delete()
+        self.busy.refresh_from_db()
+        self.assertEqual(self.busy.reply_count, 1)
+        self.assertEqual(self.busy.last_post_at, first.created_at)
+
+        first.delete()
+        self.busy.refresh_from_db()
+        self.assertEqual((self.busy.reply_count, self.busy.last_post_at), (0, self.busy.created_at))
+
+    def test_list_ordered_by_last_activity(self):
+        self.add_post(self.quiet)
+        self.add_post(self.busy)
+        empty = Theme.objects.create(owner=self.user, topic='Інше', question='Порожня')
+
+        # Нова тема без відповідей - теж активність, вона вгорі списку
+        response = self.client.get(reverse('theme-list'))
+        self.assertEqual(list(response.context['themes']), [empty, self.busy, self.quiet])
+
+        response = self.client.get(reverse('theme-list'), {'topic': 'Інше'})
+        self.assertEqual(list(response.context['themes']), [empty])
+
+    def test_theme_deletion_does_not_recount_per_post(self):
+        theme = Theme.objects.create(owner=self.user, topic='Тема', question='Видалити')
+        Posts.objects.bulk_create([
+            Posts(owner=self.user, content=f'Пост {i}', reaction='LIKE', theme=theme) for i in range(10)
+        ])
+
+        with CaptureQueriesContext(connection) as queries:
+            theme.delete()
+
+        updates = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE "forum_theme"')]
+        self.assertEqual(updates, [])
+        self.assertFalse(Posts.objects.filter(theme_id=theme.pk).exists())
+
+
+class ThemeOwnershipTest(TestCase):
+    """Тести для прав на зміну та видалення теми"""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', password='pass123')
+        self.stranger = User.objects.create_user(username='stranger', password='pass123')
+        self.moderator = User.objects.create_user(username='moderator', password='pass123')
+        UserProfile.objects.create(user=self.moderator, role='moderator')
+        # Група Moderators - правило голосувань, на форумі прав не дає
+        self.vote_moderator = User.objects.create_user(username='vote_moderator', password='pass123')
+        self.vote_moderator.groups.add(Group.objects.create(name='Moderators'))
+        self.theme = Theme.objects.create(owner=self.owner, topic='Тема', question='Питання')
+        self.update_url = reverse('theme-updation', kwargs={'pk': self.theme.pk})
+        self.delete_url = reverse('theme-deletion', kwargs={'pk': self.theme.pk})
+
+    def test_anonymous_redirected_to_login(self):
+        self.assertEqual(self.client.post(self.delete_url).status_code, 302)
+        self.assertTrue(Theme.objects.exists())
+
+    def test_stranger_forbidden(self):
+        self.client.login(username='stranger', password='pass123')
+        self.assertEqual(self.client.get(self.update_url).status_code, 403)
+        self.assertEqual(self.client.post(self.delete_url).status_code, 403)
+        self.assertTrue(Theme.objects.exists())
+
+    def test_owner_loads_theme_once(self):
+        self.client.login(username='owner', password='pass123')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.update_url)
+
+        self.assertEqual(response.status_code, 200)
+        lookups = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('SELECT') and 'FROM "forum_theme"' in q['sql']]
+        self.assertEqual(len(lookups), 1)
+
+    def test_moderators_group_is_not_forum_moderator(self):
+        self.client.login(username='vote_moderator', password='pass123')
+        self.assertEqual(self.client.post(self.delete_url).status_code, 403)
+
+    def test_moderator_can_delete(self):
+        self.client.login(username='moderator', password='pass123')
+        response = self.client.post(self.delete_url)
+
+        self.assertRedirects(response, reverse('theme-list'))
+        self.assertFalse(Theme.objects.exists())
@@ -9,15 +9,19 @@ from django.contrib.auth.views import LogoutView, LoginView
 from django.http import HttpResponseRedirect
 from .forms import ThemeForm, PostsForm, ThemeSortForm
 from django.urls import reverse
+from core.mixins import OwnerRequiredMixin
+from core.pagination import KeysetPaginator
 # Create your views here.
 
 class ThemesListView(ListView):
     model = Theme
     template_name = 'forum/themes_list.html'
     context_object_name='themes'
+    paginate_by = 20
 
     def get_queryset(self):
-        queryset = super().get_queryset()
+        # Кількість відповідей і остання активність - денормалізовані поля Theme
+        queryset = super().get_queryset().order_by('-last_post_at', '-id')
         topic = self.request.GET.get('topic', '')
         if topic:
             queryset = queryset.filter(topic=topic)
@@ -43,9 +47,18 @@ class ThemeDetailView(DetailView):
     template_name = 'forum/theme_details.html'
     context_object_name = "theme"
 
+    posts_per_page = 20
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['posts'] = Posts.objects.filter(theme=self.object)
+        # Пагінація за (created_at, id) по індексу forum_posts_theme_created_idx
+        posts = Posts.objects.filter(theme=self.object).select_related('owner')
+        page = KeysetPaginator(posts, 'created_at', self.posts_per_page).page(
+            after=self.request.GET.get('after'),
+            before=self.request.GET.get('before'),
+        )
+        context['posts'] = page.object_list
+        context['posts_page'] = page
         return context
 
 class PostCreationView(CreateView):
@@ -67,12 +80,17 @@ class PostCreationView(CreateView):
         return reverse('theme-detail', kwargs={'pk': th.pk})
     
 
-class ThemeDeletionView(DeleteView):
+# Тему змінює або видаляє її автор чи модератор
+class ThemeDeletionView(LoginRequiredMixin, OwnerRequiredMixin, DeleteView):
+    allow_moderators = True
+    moderator_check = 'has_moderator_role'
     model = Theme
     template_name = 'forum/delete_page.html'
     success_url = reverse_lazy('theme-list')
 
-class ThemeUpdateView(UpdateView):
+class ThemeUpdateView(LoginRequiredMixin, OwnerRequiredMixin, UpdateView):
+    allow_moderators = True
+    moderator_check = 'has_moderator_role'
     model = Theme
     template_name = 'forum/update_page.html'
     form_class = ThemeForm
@@ -1,7 +1,16 @@
 from django.contrib import admin
-from .models import Mediafiles
+from .models import Mediafiles, ModerationAction
 
 @admin.register(Mediafiles)
 class GalleryAdmin(admin.ModelAdmin):
-    list_display = ['title', 'media_type', 'author', 'status']
-    list_filter = ['status', 'media_type']
\ No newline at end of file
+    list_display = ['title', 'media_type', 'author', 'status', 'file_size', 'captured_at']
+    list_filter = ['status', 'media_type']
+    readonly_fields = [
+        'file_size', 'width', 'height', 'duration', 'captured_at', 'moderated_by', 'moderated_at'
+    ]
+
+
+@admin.register(ModerationAction)
+class ModerationActionAdmin(admin.ModelAdmin):
+    list_display = ['moderator', 'action', 'count', 'created_at']
+    list_filter = ['action']
\ No newline at end of file
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 class GalleryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'gallery'
-    verbose_name = "Photos" 
\ No newline at end of file
+    verbose_name = "Photos"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -1,7 +1,38 @@
 from django import forms
+
+from media.forms import ChunkedUploadFormMixin
+
 from .models import Mediafiles
 
-class GalleryForm(forms.ModelForm):
+class GalleryForm(ChunkedUploadFormMixin, forms.ModelForm):
+    # Большие видео можно загрузить частями через /uploads/ и прикрепить по токену
+    upload_field = 'media_file'
+
     class Meta:
         model = Mediafiles
-        fields = ['title', 'description', 'media_file'] 
\ No newline at end of file
+        fields = ['title', 'description', 'media_file'] 
+
+class GalleryFilterForm(forms.Form):
+    """Параметры фильтрации и сортировки списка галереи (GET)"""
+    SORTS = (
+        ('new', 'Сначала новые'),
+        ('old', 'Сначала старые'),
+        ('taken', 'По дате съемки'),
+        ('size', 'По размеру'),
+        ('duration', 'По длительности'),
+    )
+    ORIENTATIONS = (
+        ('', 'Любая ориентация'),
+        ('landscape', 'Горизонтальные'),
+        ('portrait', 'Вертикальные'),
+    )
+
+    type = forms.ChoiceField(choices=(('', 'Все'),) + Mediafiles.MEDIA_TYPES, required=False)
+    sort = forms.ChoiceField(choices=SORTS, required=False, label='Сортировка')
+    orientation = forms.ChoiceField(choices=ORIENTATIONS, required=False, label='Ориентация')
+    taken_from = forms.DateField(
+        required=False, label='Снято с', widget=forms.DateInput(attrs={'type': 'date'})
+    )
+    taken_to = forms.DateField(
+        required=False, label='Снято по', widget=forms.DateInput(attrs={'type': 'date'})
+    )
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from gallery import metadata
+from gallery.models import Mediafiles
+
+
+class Command(BaseCommand):
+    help = "Определяет тип, размеры, длительность и дату съемки медиафайлов, у которых их еще нет"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'ids', nargs='*', type=int,
+            help="ID медиафайлов (по умолчанию все)"
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help="Извлечь метаданные заново, даже если они уже есть"
+        )
+        parser.add_argument('--batch-size', type=int, default=100)
+
+    def handle(self, *args, **options):
+        items = Mediafiles.objects.exclude(media_file='').order_by('pk')
+        if options['ids']:
+            items = items.filter(pk__in=options['ids'])
+        if not options['force']:
+            items = items.filter(file_size__isnull=True)
+
+        updated = 0
+        for item in items.iterator(chunk_size=options['batch_size']):
+            if metadata.ensure_metadata(item, force=options['force']):
+                updated += 1
+                if options['verbosity'] > 1:
+                    self.stdout.write(f"{item.pk}: {item.get_media_type_display()}, {item.file_size} байт")
+
+        self.stdout.write(self.style.SUCCESS(f"Обработано файлов: {updated}"))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from gallery import thumbnails
+from gallery.models import Mediafiles
+
+
+class Command(BaseCommand):
+    help = "Создает уменьшенные копии (WebP/JPEG) для фото галереи, у которых их еще нет"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'ids', nargs='*', type=int,
+            help="ID медиафайлов (по умолчанию все фото)"
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help="Пересоздать миниатюры, даже если они уже есть"
+        )
+        parser.add_argument('--batch-size', type=int, default=100)
+
+    def handle(self, *args, **options):
+        items = Mediafiles.objects.filter(media_type='photo').exclude(media_file='').order_by('pk')
+        if options['ids']:
+            items = items.filter(pk__in=options['ids'])
+
+        created = 0
+        for item in items.iterator(chunk_size=options['batch_size']):
+            if thumbnails.ensure_thumbnails(item, force=options['force']):
+                created += 1
+                if options['verbosity'] > 1:
+                    self.stdout.write(f"{item.pk}: {item.media_file.name}")
+
+        self.stdout.write(self.style.SUCCESS(f"Обработано файлов: {created}"))
@@ -0,0 +1,249 @@
+"""Определение типа и метаданных медиафайлов галереи.
+
+Тип определяется по сигнатуре (первым байтам) файла, а не по расширению,
+поэтому photo.JPG, .webp и переименованные файлы распознаются верно.
+sniff() читает только начало файла и вызывается прямо в Mediafiles.save();
+extract() читает размеры, длительность и дату съемки из EXIF и
+выполняется фоновой задачей gallery.extract_metadata.
+"""
+import os
+import struct
+from datetime import datetime
+
+from django.conf import settings
+from django.utils import timezone
+from PIL import Image, UnidentifiedImageError
+
+from jobs import queue
+
+HEAD_SIZE = 64
+
+# Запасной вариант, если сигнатура не распознана
+EXTENSION_TYPES = {
+    'jpg': 'photo', 'jpeg': 'photo', 'jfif': 'photo', 'png': 'photo', 'webp': 'photo',
+    'bmp': 'photo', 'tif': 'photo', 'tiff': 'photo', 'heic': 'photo',
+    'gif': 'gif',
+    'mp4': 'video', 'm4v': 'video', 'mov': 'video', 'avi': 'video', 'webm': 'video', 'mkv': 'video',
+    'mp3': 'audio', 'm4a': 'audio', 'wav': 'audio', 'ogg': 'audio', 'oga': 'audio', 'flac': 'audio',
+}
+
+EXIF_IFD = 0x8769
+EXIF_DATETIME_ORIGINAL = 36867
+EXIF_DATETIME = 306
+EXIF_ORIENTATION = 274
+
+
+def sniff_type(head):
+    """Тип медиафайла по первым байтам или None"""
+    if head.startswith(b'\xff\xd8\xff') or head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'photo'
+    if head.startswith(b'BM') or head[:4] in (b'II*\x00', b'MM\x00*'):
+        return 'photo'
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if head[:4] == b'RIFF':
+        return {b'WEBP': 'photo', b'AVI ': 'video', b'WAVE': 'audio'}.get(head[8:12])
+    if head[4:8] == b'ftyp':
+        brand = head[8:12]
+        if brand in (b'heic', b'heix', b'mif1', b'avif'):
+            return 'photo'
+        return 'audio' if brand in (b'M4A ', b'M4B ') else 'video'
+    if head.startswith(b'\x1a\x45\xdf\xa3'):
+        return 'video'
+    if head.startswith(b'ID3') or head[:4] in (b'OggS', b'fLaC'):
+        return 'audio'
+    if len(head) > 1 and head[0] == 0xff and head[1] & 0xe0 == 0xe0:
+        # Синхрослово кадра MPEG-аудио (mp3 без ID3-тега)
+        return 'audio'
+    return None
+
+
+def _read_head(field_file):
+    was_closed = field_file.closed
+    field_file.open('rb')
+    try:
+        field_file.seek(0)
+        head = field_file.read(HEAD_SIZE)
+        field_file.seek(0)
+    finally:
+        if was_closed:
+            field_file.close()
+    return head
+
+
+def sniff(field_file):
+    """Тип файла: сигнатура, а если она неизвестна - расширение без учета регистра"""
+    try:
+        media_type = sniff_type(_read_head(field_file))
+    except (OSError, ValueError):
+        media_type = None
+    if media_type is None:
+        extension = os.path.splitext(field_file.name)[1].lower().lstrip('.')
+        media_type = EXTENSION_TYPES.get(extension)
+    return media_type
+
+
+def _exif_datetime(image):
+    exif = image.getexif()
+    value = exif.get_ifd(EXIF_IFD).get(EXIF_DATETIME_ORIGINAL) or exif.get(EXIF_DATETIME)
+    if not isinstance(value, str):
+        return None
+    try:
+        captured = datetime.strptime(value.strip('\x00 ')[:19], '%Y:%m:%d %H:%M:%S')
+    except ValueError:
+        return None
+    # В EXIF нет часового пояса: считаем время местным
+    return timezone.make_aware(captured) if settings.USE_TZ else captured
+
+
+def _image_metadata(source):
+    image = Image.open(source)
+    width, height = image.size
+    if image.getexif().get(EXIF_ORIENTATION) in (5, 6, 7, 8):
+        # Снимок повернут на 90°: на экране (и в миниатюрах) стороны меняются местами
+        width, height = height, width
+    data = {'width': width, 'height': height, 'captured_at': _exif_datetime(image)}
+    if getattr(image, 'is_animated', False):
+        total = 0
+        for frame in range(image.n_frames):
+            image.seek(frame)
+            total += image.info.get('duration', 0)
+        data['duration'] = total / 1000 or None
+    return data
+
+
+def _mp4_boxes(source, end):
+    while source.tell() + 8 <= end:
+        start = source.tell()
+        size, kind = struct.unpack('>I4s', source.read(8))
+        header = 8
+        if size == 1:
+            size = struct.unpack('>Q', source.read(8))[0]
+            header = 16
+        elif size == 0:
+            size = end - start
+        if size < header:
+            return
+        yield kind, start + header, start + size
+        source.seek(start + size)
+
+
+def _mp4_metadata(source, file_size):
+    """Длительность из moov/mvhd и размер кадра из первого видеотрека (tkhd)"""
+    data = {}
+    for kind, body, end in _mp4_boxes(source, file_size):
+        if kind != b'moov':
+            continue
+        source.seek(body)
+        for child, child_body, child_end in _mp4_boxes(source, end):
+            if child == b'mvhd':
+                source.seek(child_body)
+                version = source.read(1)[0]
+                source.seek(child_body + (20 if version == 1 else 12))
+                if version == 1:
+                    timescale, duration = struct.unpack('>IQ', source.read(12))
+                else:
+                    timescale, duration = struct.unpack('>II', source.read(8))
+                if timescale:
+                    data['duration'] = duration / timescale
+            elif child == b'trak' and 'width' not in data:
+                source.seek(child_body)
+                for box, _, box_end in _mp4_boxes(source, child_end):
+                    if box == b'tkhd':
+                        # Ширина и высота - последние 8 байт tkhd, числа 16.16
+                        source.seek(box_end - 8)
+                        width, height = struct.unpack('>II', source.read(8))
+                        if width and height:
+                            data['width'], data['height'] = width >> 16, height >> 16
+                        break
+            source.seek(child_end)
+        break
+    return data
+
+
+# Битрейты MPEG-1 Layer III, кбит/с
+MP3_BITRATES = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+
+
+def _mp3_metadata(source, file_size):
+    """Оценка длительности по первому кадру (точна для CBR, приблизительна для VBR)"""
+    head = source.read(10)
+    offset = 0
+    if head.startswith(b'ID3'):
+        size = head[6:10]
+        offset = 10 + (size[0] << 21 | size[1] << 14 | size[2] << 7 | size[3])
+    source.seek(offset)
+    frame = source.read(4)
+    if len(frame) < 4 or frame[0] != 0xff or frame[1] & 0xe0 != 0xe0:
+        return {}
+    bitrate_index = frame[2] >> 4
+    if not 0 < bitrate_index < len(MP3_BITRATES):
+        return {}
+    bitrate = MP3_BITRATES[bitrate_index] * 1000
+    return {'duration': (file_size - offset) * 8 / bitrate}
+
+
+def _wav_metadata(source, file_size):
+    source.seek(12)
+    byte_rate = None
+    while True:
+        chunk = source.read(8)
+        if len(chunk) < 8:
+            return {}
+        kind, size = struct.unpack('<4sI', chunk)
+        if kind == b'fmt ':
+            byte_rate = struct.unpack('<I', source.read(12)[8:12])[0]
+            source.seek(size - 12, os.SEEK_CUR)
+        elif kind == b'data':
+            return {'duration': size / byte_rate} if byte_rate else {}
+        else:
+            source.seek(size + (size & 1), os.SEEK_CUR)
+
+
+def extract(field_file):
+    """Метаданные файла: media_type, file_size, width, height, duration, captured_at"""
+    storage = field_file.storage
+    data = {'media_type': sniff(field_file), 'file_size': storage.size(field_file.name)}
+    try:
+        with storage.open(field_file.name, 'rb') as source:
+            head = source.read(HEAD_SIZE)
+            source.seek(0)
+            if data['media_type'] in ('photo', 'gif'):
+                data.update(_image_metadata(source))
+            elif head[4:8] == b'ftyp':
+                data.update(_mp4_metadata(source, data['file_size']))
+            elif head[:4] == b'RIFF' and head[8:12] == b'WAVE':
+                data.update(_wav_metadata(source, data['file_size']))
+            elif data['media_type'] == 'audio' and (head.startswith(b'ID3') or head[:1] == b'\xff'):
+                data.update(_mp3_metadata(source, data['file_size']))
+    except (OSError, ValueError, struct.error, IndexError, UnidentifiedImageError, Image.DecompressionBombError):
+        # Битый или непонятный файл: оставляем то, что удалось определить
+        pass
+    return data
+
+
+def needs_metadata(item):
+    return bool(item.media_file) and item.file_size is None
+
+
+def enqueue_metadata(item):
+    """Ставит извлечение метаданных в очередь фоновых задач, если их еще нет"""
+    if not needs_metadata(item):
+        return None
+    return queue.enqueue('gallery.extract_metadata', key=f'metadata:{item.pk}', media_id=item.pk)
+
+
+def ensure_metadata(item, force=False):
+    """Извлекает и сохраняет метаданные; True, если запись обновлена"""
+    if not item.media_file or not (force or needs_metadata(item)):
+        return False
+    data = extract(item.media_file)
+    data = {field: data.get(field) for field in ('media_type', *item.METADATA_FIELDS)}
+    if data['media_type'] is None:
+        data['media_type'] = item.media_type
+    for field, value in data.items():
+        setattr(item, field, value)
+    # update() вместо save(), чтобы не запускать сигналы повторно;
+    # условие по имени файла защищает от записи устаревших данных, если файл успели заменить
+    type(item).objects.filter(pk=item.pk, media_file=item.media_file.name).update(**data)
+    return True
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0003_alter_mediafiles_media_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediafiles',
+            name='thumbnails',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Миниатюры'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:26
+
+import media.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0004_mediafiles_thumbnails'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='mediafiles',
+            name='media_file',
+            field=models.FileField(storage=media.storage.get_content_storage, upload_to='gallery/', verbose_name='Файл'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0005_alter_mediafiles_media_file'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediafiles',
+            name='captured_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Дата съемки'),
+        ),
+        migrations.AddField(
+            model_name='mediafiles',
+            name='duration',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Длительность, с'),
+        ),
+        migrations.AddField(
+            model_name='mediafiles',
+            name='file_size',
+            field=models.BigIntegerField(blank=True, editable=False, null=True, verbose_name='Размер, байт'),
+        ),
+        migrations.AddField(
+            model_name='mediafiles',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Высота'),
+        ),
+        migrations.AddField(
+            model_name='mediafiles',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина'),
+        ),
+        migrations.AddIndex(
+            model_name='mediafiles',
+            index=models.Index(fields=['status', 'media_type', 'created_at'], name='gallery_status_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediafiles',
+            index=models.Index(fields=['status', 'captured_at'], name='gallery_status_taken_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediafiles',
+            index=models.Index(fields=['status', 'file_size'], name='gallery_status_size_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediafiles',
+            index=models.Index(fields=['status', 'duration'], name='gallery_status_duration_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediafiles',
+            index=models.Index(fields=['status', 'width', 'height'], name='gallery_status_dims_idx'),
+        ),
+    ]
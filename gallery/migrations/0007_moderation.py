@@ -0,0 +1,53 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0006_mediafiles_metadata'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModerationAction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(choices=[('pending', 'На модерации'), ('approved', 'Опубликовано'), ('rejected', 'Отклонено')], max_length=10, verbose_name='Решение')),
+                ('count', models.PositiveIntegerField(verbose_name='Количество файлов')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата')),
+            ],
+            options={
+                'verbose_name': 'действие модератора',
+                'verbose_name_plural': 'действия модераторов',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='mediafiles',
+            name='moderated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Дата модерации'),
+        ),
+        migrations.AddField(
+            model_name='mediafiles',
+            name='moderated_by',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='moderated_media', to=settings.AUTH_USER_MODEL, verbose_name='Модератор'),
+        ),
+        migrations.AddIndex(
+            model_name='mediafiles',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='gallery_status_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='moderationaction',
+            name='moderator',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='gallery_moderation_actions', to=settings.AUTH_USER_MODEL, verbose_name='Модератор'),
+        ),
+        migrations.AddIndex(
+            model_name='moderationaction',
+            index=models.Index(fields=['moderator', 'created_at'], name='gallery_moderator_created_idx'),
+        ),
+    ]
@@ -1,6 +1,10 @@
 from django.db import models
 from django.contrib.auth.models import User
 
+from media.storage import get_content_storage
+
+from . import metadata
+
 class Mediafiles(models.Model):
     MEDIA_TYPES = (
         ('photo', 'Фото'),
@@ -17,29 +21,88 @@ class Mediafiles(models.Model):
 
     title = models.CharField(max_length=200, verbose_name='Название')  
     description = models.TextField(blank=True, verbose_name='Описание')
-    media_file = models.FileField(upload_to='gallery/', verbose_name='Файл')
+    media_file = models.FileField(upload_to='gallery/', storage=get_content_storage, verbose_name='Файл')
     media_type = models.CharField(max_length=10, choices=MEDIA_TYPES, default='photo', verbose_name='Тип')
     author = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name='Автор')
     status = models.CharField(max_length=10, choices=STATUS, default='pending', verbose_name='Статус')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')
+    # Уменьшенные копии фото (gallery/thumbnails.py): исходный файл и варианты по ширинам
+    thumbnails = models.JSONField(default=dict, blank=True, editable=False, verbose_name='Миниатюры')
+    # Метаданные (gallery/metadata.py) заполняет фоновая задача; file_size = NULL - еще не извлечены
+    file_size = models.BigIntegerField(null=True, blank=True, editable=False, verbose_name='Размер, байт')
+    width = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name='Ширина')
+    height = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name='Высота')
+    duration = models.FloatField(null=True, blank=True, editable=False, verbose_name='Длительность, с')
+    captured_at = models.DateTimeField(null=True, blank=True, editable=False, verbose_name='Дата съемки')
+    moderated_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, editable=False,
+        related_name='moderated_media', verbose_name='Модератор'
+    )
+    moderated_at = models.DateTimeField(null=True, blank=True, editable=False, verbose_name='Дата модерации')
+
+    METADATA_FIELDS = ('file_size', 'width', 'height', 'duration', 'captured_at')
 
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'медиафайл'
         verbose_name_plural = 'медиафайлы'
+        # Галерея всегда фильтрует по status, поэтому он первый в каждом индексе
+        indexes = [
+            models.Index(fields=['status', 'media_type', 'created_at'], name='gallery_status_type_idx'),
+            # Очередь модерации: WHERE status = 'pending' ORDER BY created_at, id
+            models.Index(fields=['status', 'created_at', 'id'], name='gallery_status_created_idx'),
+            models.Index(fields=['status', 'captured_at'], name='gallery_status_taken_idx'),
+            models.Index(fields=['status', 'file_size'], name='gallery_status_size_idx'),
+            models.Index(fields=['status', 'duration'], name='gallery_status_duration_idx'),
+            models.Index(fields=['status', 'width', 'height'], name='gallery_status_dims_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.get_media_type_display()})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем имя файла, чтобы save() определял тип только при замене файла
+        instance._loaded_file_name = instance.__dict__.get('media_file')
+        return instance
+
+    @property
+    def duration_display(self):
+        if self.duration is None:
+            return ''
+        minutes, seconds = divmod(round(self.duration), 60)
+        return f'{minutes}:{seconds:02d}'
+
     def save(self, *args, **kwargs):
-        if self.media_file:
-            ext = self.media_file.name.split('.')[-1]
-            if ext =='gif':
-                self.media_type = 'gif'
-            if ext in ['jpg', 'jpeg', 'png']:
-                self.media_type = 'photo'
-            elif ext in ['mp4', 'avi']:
-                self.media_type = 'video'
-            elif ext in ['mp3']:
-                self.media_type = 'audio'
-        super().save(*args, **kwargs)
\ No newline at end of file
+        if self.media_file and (
+            not self.media_file._committed or
+            self.media_file.name != getattr(self, '_loaded_file_name', None)
+        ):
+            # Новый файл: тип по сигнатуре, остальные метаданные извлечет фоновая задача
+            self.media_type = metadata.sniff(self.media_file) or self.media_type
+            for field in self.METADATA_FIELDS:
+                setattr(self, field, None)
+        super().save(*args, **kwargs)
+        self._loaded_file_name = self.media_file.name
+
+
+class ModerationAction(models.Model):
+    """Одно массовое действие модератора; по этим записям считается статистика"""
+    moderator = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='gallery_moderation_actions', verbose_name='Модератор'
+    )
+    action = models.CharField(max_length=10, choices=Mediafiles.STATUS, verbose_name='Решение')
+    count = models.PositiveIntegerField(verbose_name='Количество файлов')
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата')
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'действие модератора'
+        verbose_name_plural = 'действия модераторов'
+        indexes = [
+            models.Index(fields=['moderator', 'created_at'], name='gallery_moderator_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.moderator} - {self.get_action_display()}: {self.count}"
@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Max, Q, Sum
+from django.utils import timezone
+
+from .models import Mediafiles, ModerationAction
+
+MODERATION_DECISIONS = ('approved', 'rejected')
+
+
+def moderate(moderator, ids, decision):
+    """Одобряет или отклоняет файлы одним UPDATE; возвращает число измененных записей.
+
+    Меняются только файлы, которые еще на модерации, поэтому два модератора,
+    одновременно отметившие одни и те же файлы, не посчитают их дважды.
+    save() и сигналы не вызываются: файл не меняется, а значит, не нужно
+    заново определять тип и создавать миниатюры.
+    """
+    if decision not in MODERATION_DECISIONS:
+        raise ValueError(f'Неизвестное решение: {decision}')
+    ids = list(ids)
+    if not ids:
+        return 0
+    with transaction.atomic():
+        count = Mediafiles.objects.filter(pk__in=ids, status='pending').update(
+            status=decision, moderated_by=moderator, moderated_at=timezone.now()
+        )
+        if count:
+            ModerationAction.objects.create(moderator=moderator, action=decision, count=count)
+    return count
+
+
+def moderator_stats(now=None):
+    """Пропускная способность модераторов одним сгруппированным запросом"""
+    now = now or timezone.now()
+    today = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    return list(
+        ModerationAction.objects
+        .values('moderator_id', 'moderator__username')
+        .annotate(
+            approved=Sum('count', filter=Q(action='approved'), default=0),
+            rejected=Sum('count', filter=Q(action='rejected'), default=0),
+            last_hour=Sum('count', filter=Q(created_at__gte=now - timedelta(hours=1)), default=0),
+            today=Sum('count', filter=Q(created_at__gte=today), default=0),
+            week=Sum('count', filter=Q(created_at__gte=now - timedelta(days=7)), default=0),
+            last_action=Max('created_at'),
+        )
+        .order_by('-week', 'moderator__username')
+    )
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import metadata, thumbnails
+from .models import Mediafiles
+
+
+@receiver(post_save, sender=Mediafiles)
+def generate_thumbnails(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    metadata.enqueue_metadata(instance)
+    thumbnails.enqueue_thumbnails(instance)
+
+
+@receiver(post_delete, sender=Mediafiles)
+def delete_thumbnails(sender, instance, **kwargs):
+    if instance.media_file:
+        thumbnails.delete_variants(instance.media_file.storage, instance.thumbnails)
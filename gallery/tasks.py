@@ -0,0 +1,19 @@
+from jobs.registry import task
+
+from . import metadata, thumbnails
+from .models import Mediafiles
+
+
+@task('gallery.generate_thumbnails')
+def generate_thumbnails(media_id):
+    item = Mediafiles.objects.filter(pk=media_id).first()
+    if item is not None:
+        thumbnails.ensure_thumbnails(item)
+
+
+@task('gallery.extract_metadata')
+def extract_metadata(media_id):
+    item = Mediafiles.objects.filter(pk=media_id).first()
+    if item is not None and metadata.ensure_metadata(item):
+        # Тип мог уточниться (например, фото, загруженное без расширения)
+        thumbnails.enqueue_thumbnails(item)
@@ -1,3 +1,324 @@
-from django.test import TestCase
+import shutil
+import struct
+import tempfile
+import wave
+from datetime import datetime
+from io import BytesIO, StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from jobs import queue
+from jobs.models import Job
+
+from . import metadata, services, thumbnails
+from .models import Mediafiles
+from .views import ModerationQueueView
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def image_upload(name='photo.jpg', size=(2000, 1500), fmt='JPEG'):
+    buffer = BytesIO()
+    Image.new('RGB', size, (200, 30, 30)).save(buffer, fmt)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+def exif_upload(name='IMG_0001.JPG', taken='2024:05:01 12:30:00', orientation=None):
+    exif = Image.Exif()
+    exif.get_ifd(metadata.EXIF_IFD)[metadata.EXIF_DATETIME_ORIGINAL] = taken
+    if orientation:
+        exif[metadata.EXIF_ORIENTATION] = orientation
+    buffer = BytesIO()
+    Image.new('RGB', (300, 200), (20, 120, 200)).save(buffer, 'JPEG', exif=exif)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+def gif_upload(name='anim.gif'):
+    buffer = BytesIO()
+    frames = [Image.new('RGB', (40, 30), color) for color in ((255, 0, 0), (0, 255, 0), (0, 0, 255))]
+    frames[0].save(buffer, 'GIF', save_all=True, append_images=frames[1:], duration=500, loop=0)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/gif')
+
+
+def wav_upload(name='voice.wav', seconds=2):
+    buffer = BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(8000)
+        wav.writeframes(b'\0\0' * 8000 * seconds)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='audio/wav')
+
+
+def _box(kind, body):
+    return struct.pack('>I4s', len(body) + 8, kind) + body
+
+
+def mp4_upload(name='clip.mp4', seconds=5, size=(640, 360)):
+    """Минимальный MP4: ftyp и moov с mvhd и tkhd (без самих кадров)"""
+    mvhd = b'\0' * 12 + struct.pack('>II', 1000, seconds * 1000) + b'\0' * 80
+    tkhd = b'\0' * 76 + struct.pack('>II', size[0] << 16, size[1] << 16)
+    data = _box(b'ftyp', b'isom\0\0\2\0') + _box(b'moov', _box(b'mvhd', mvhd) + _box(b'trak', _box(b'tkhd', tkhd)))
+    return SimpleUploadedFile(name, data, content_type='video/mp4')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, GALLERY_THUMBNAIL_WIDTHS=(320, 640))
+class ThumbnailTest(TestCase):
+    """Тесты для уменьшенных копий фото"""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+
+    def test_variants_generated_by_worker_after_save(self):
+        item = Mediafiles.objects.create(title='Фото', media_file=image_upload(), author=self.user)
+        self.assertEqual(Job.objects.filter(name='gallery.generate_thumbnails').count(), 1)
+
+        queue.run_pending()
+
+        item.refresh_from_db()
+        variants = item.thumbnails['variants']
+        self.assertEqual([v['width'] for v in variants], [320, 640])
+        self.assertEqual(variants[0]['height'], 240)
+        storage = item.media_file.storage
+        for variant in variants:
+            with storage.open(variant['webp']) as f:
+                self.assertEqual(Image.open(f).format, 'WEBP')
+            self.assertTrue(storage.exists(variant['jpeg']))
+
+    def test_small_image_is_not_upscaled(self):
+        item = Mediafiles.objects.create(
+            title='Маленькое', media_file=image_upload(size=(400, 300)), author=self.user
+        )
+        queue.run_pending()
+        item.refresh_from_db()
+
+        self.assertEqual([v['width'] for v in item.thumbnails['variants']], [320, 400])
+
+    def test_broken_image_falls_back_to_original(self):
+        broken = SimpleUploadedFile('broken.jpg', b'not an image', content_type='image/jpeg')
+        item = Mediafiles.objects.create(title='Битое', media_file=broken, author=self.user)
+        queue.run_pending()
+        item.refresh_from_db()
+
+        self.assertEqual(item.thumbnails['variants'], [])
+        self.assertIsNone(thumbnails.variants_for(item))
+
+    def test_delete_removes_variants(self):
+        item = Mediafiles.objects.create(title='Фото', media_file=image_upload(), author=self.user)
+        queue.run_pending()
+        item.refresh_from_db()
+        names = [v['webp'] for v in item.thumbnails['variants']]
+        storage = item.media_file.storage
+
+        item.delete()
+
+        self.assertFalse(any(storage.exists(name) for name in names))
+
+    def test_legacy_rows_queued_from_list(self):
+        item = Mediafiles.objects.create(
+            title='Старое', media_file=image_upload(), author=self.user, status='approved'
+        )
+        Job.objects.all().delete()
+        Mediafiles.objects.filter(pk=item.pk).update(thumbnails={})
+
+        response = self.client.get(reverse('gallery_list'))
+
+        # Пока миниатюр нет, отдается оригинал, а создание ставится в очередь один раз
+        self.assertContains(response, item.media_file.url)
+        self.client.get(reverse('gallery_list'))
+        self.assertEqual(Job.objects.filter(status=Job.QUEUED).count(), 1)
+
+        queue.run_pending()
+        response = self.client.get(reverse('gallery_list'))
+
+        self.assertContains(response, 'type="image/webp"')
+        self.assertContains(response, '.webp 320w')
+
+    def test_generate_thumbnails_command(self):
+        item = Mediafiles.objects.create(title='Фото', media_file=image_upload(), author=self.user)
+        Mediafiles.objects.filter(pk=item.pk).update(thumbnails={})
+
+        out = StringIO()
+        call_command('generate_thumbnails', stdout=out)
+
+        self.assertIn('1', out.getvalue())
+        item.refresh_from_db()
+        self.assertEqual(item.thumbnails['source'], item.media_file.name)
+
+
+class MetadataTest(TestCase):
+    """Тесты для определения типа и метаданных медиафайлов"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+
+    def create(self, upload, **kwargs):
+        kwargs.setdefault('status', 'approved')
+        item = Mediafiles.objects.create(title=upload.name, media_file=upload, author=self.user, **kwargs)
+        queue.run_pending()
+        item.refresh_from_db()
+        return item
+
+    def test_type_sniffed_from_content(self):
+        self.assertEqual(self.create(exif_upload('PHOTO.JPG')).media_type, 'photo')
+        self.assertEqual(self.create(image_upload('picture.webp', fmt='WEBP')).media_type, 'photo')
+        self.assertEqual(self.create(gif_upload()).media_type, 'gif')
+        # Расширение не совпадает с содержимым: верим сигнатуре
+        self.assertEqual(self.create(image_upload('renamed.mp4', fmt='PNG')).media_type, 'photo')
+        self.assertEqual(self.create(mp4_upload()).media_type, 'video')
+        self.assertEqual(self.create(wav_upload()).media_type, 'audio')
+
+    def test_image_metadata_and_exif_date(self):
+        item = self.create(exif_upload(orientation=6))
+
+        # Ориентация 6 - поворот на 90°: ширина и высота меняются местами
+        self.assertEqual((item.width, item.height), (200, 300))
+        self.assertEqual(item.file_size, item.media_file.size)
+        self.assertEqual(item.captured_at, timezone.make_aware(datetime(2024, 5, 1, 12, 30)))
+
+    def test_duration_of_gif_audio_and_video(self):
+        self.assertAlmostEqual(self.create(gif_upload()).duration, 1.5)
+        self.assertAlmostEqual(self.create(wav_upload(seconds=2)).duration, 2.0)
+        video = self.create(mp4_upload(seconds=5, size=(640, 360)))
+        self.assertEqual((video.width, video.height, video.duration), (640, 360, 5.0))
+
+    def test_saving_without_new_file_keeps_metadata(self):
+        item = self.create(exif_upload())
+        item.title = 'Новое название'
+        item.save()
+        queue.run_pending()
+        item.refresh_from_db()
+
+        self.assertIsNotNone(item.file_size)
+        self.assertFalse(Job.objects.filter(status=Job.QUEUED).exists())
+
+        item.media_file = wav_upload()
+        item.save()
+        self.assertEqual(item.media_type, 'audio')
+        self.assertIsNone(item.width)
+
+    def test_extract_metadata_command(self):
+        item = self.create(exif_upload())
+        Mediafiles.objects.filter(pk=item.pk).update(file_size=None, width=None, media_type='video')
+
+        call_command('extract_metadata', stdout=StringIO())
+
+        item.refresh_from_db()
+        self.assertEqual((item.media_type, item.width), ('photo', 300))
+
+    def test_list_filters_and_sorts_by_metadata(self):
+        photo = self.create(exif_upload(taken='2023:01:10 09:00:00'))
+        gif = self.create(gif_upload())
+        video = self.create(mp4_upload(seconds=30))
+        audio = self.create(wav_upload(seconds=1))
+        url = reverse('gallery_list')
+
+        response = self.client.get(url, {'type': 'gif'})
+        self.assertEqual(list(response.context['galleries']), [gif])
+
+        response = self.client.get(url, {'sort': 'duration'})
+        self.assertEqual(list(response.context['galleries'])[:3], [video, gif, audio])
+
+        response = self.client.get(url, {'taken_from': '2023-01-10', 'taken_to': '2023-01-10'})
+        self.assertEqual(list(response.context['galleries']), [photo])
+
+        response = self.client.get(url, {'orientation': 'landscape', 'sort': 'size'})
+        self.assertEqual(set(response.context['galleries']), {photo, gif, video})
+
+        # Некорректные параметры игнорируются
+        response = self.client.get(url, {'sort': 'drop table', 'taken_from': 'вчера'})
+        self.assertEqual(len(response.context['galleries']), 4)
+
+
+class ModerationTest(TestCase):
+    """Тесты для очереди модерации"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.author = User.objects.create_user(username='author', password='testpass123')
+        self.moderator = User.objects.create_user(username='moder', password='testpass123', is_staff=True)
+        self.url = reverse('gallery_moderation')
+
+    def create_pending(self, count):
+        return [
+            Mediafiles.objects.create(title=f'Файл {i}', media_file=wav_upload(), author=self.author)
+            for i in range(count)
+        ]
+
+    def test_only_moderators_have_access(self):
+        self.client.login(username='author', password='testpass123')
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_bulk_approve_is_single_update(self):
+        items = self.create_pending(5)
+
+        with CaptureQueriesContext(connection) as queries:
+            count = services.moderate(self.moderator, [item.pk for item in items[:3]], 'approved')
+
+        # Один UPDATE на все файлы и одна запись в журнал для статистики
+        statements = [query['sql'].split()[0] for query in queries.captured_queries]
+        self.assertEqual([s for s in statements if s in ('UPDATE', 'INSERT', 'SELECT')], ['UPDATE', 'INSERT'])
+        self.assertEqual(count, 3)
+        self.assertEqual(Mediafiles.objects.filter(status='approved', moderated_by=self.moderator).count(), 3)
+
+    def test_queue_paginates_by_keyset_and_applies_decisions(self):
+        items = self.create_pending(3)
+        ModerationQueueView.per_page = 2
+        self.addCleanup(setattr, ModerationQueueView, 'per_page', 50)
+        self.client.login(username='moder', password='testpass123')
+
+        response = self.client.get(self.url)
+        self.assertEqual(list(response.context['items']), items[:2])
+        page = response.context['items_page']
+        response = self.client.get(self.url, {'after': page.next_cursor})
+        self.assertEqual(list(response.context['items']), items[2:])
+
+        response = self.client.post(
+            self.url, {'decision': 'rejected', 'items': [items[0].pk, items[1].pk]}, follow=True
+        )
+        self.assertContains(response, 'Отклонено файлов: 2')
+        self.assertEqual(list(response.context['items']), items[2:])
+
+        # Повторное решение по уже обработанным файлам ничего не меняет и не попадает в статистику
+        self.client.post(self.url, {'decision': 'approved', 'items': [items[0].pk, items[2].pk]})
+        self.assertEqual(
+            list(Mediafiles.objects.order_by('pk').values_list('status', flat=True)),
+            ['rejected', 'rejected', 'approved']
+        )
+
+        stats = services.moderator_stats()
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(
+            (stats[0]['approved'], stats[0]['rejected'], stats[0]['today'], stats[0]['last_hour']),
+            (1, 2, 3, 3)
+        )
+
+    def test_moderation_does_not_requeue_processing(self):
+        items = self.create_pending(2)
+        queue.run_pending()
+
+        services.moderate(self.moderator, [item.pk for item in items], 'approved')
+
+        self.assertFalse(Job.objects.filter(status=Job.QUEUED).exists())
@@ -0,0 +1,173 @@
+"""Уменьшенные копии фотографий галереи.
+
+Для каждого фото рядом с оригиналом сохраняются варианты нескольких
+ширин в WebP и JPEG (запасной формат для старых браузеров). Имена файлов
+и размеры записываются в Mediafiles.thumbnails, чтобы шаблон строил
+srcset без обращений к хранилищу. Варианты создаются при сохранении
+фоновой задачей gallery.generate_thumbnails (ставится в очередь при
+сохранении и при первом показе старых записей) и командой generate_thumbnails.
+"""
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from jobs import queue
+from media.references import reference_provider
+
+DEFAULT_WIDTHS = (320, 640, 1024)
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+
+def thumbnail_widths():
+    return tuple(sorted(getattr(settings, 'GALLERY_THUMBNAIL_WIDTHS', DEFAULT_WIDTHS)))
+
+
+def variant_name(source_name, width, extension):
+    """gallery/photo.jpg -> gallery/thumbs/photo-320.webp"""
+    directory, filename = os.path.split(source_name)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(directory, 'thumbs', f'{stem}-{width}.{extension}')
+
+
+def _encode(image, extension):
+    buffer = BytesIO()
+    if extension == 'webp':
+        image.save(buffer, 'WEBP', quality=WEBP_QUALITY, method=4)
+    else:
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        image.save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def delete_variants(storage, data):
+    for variant in (data or {}).get('variants', []):
+        for name in (variant.get('webp'), variant.get('jpeg')):
+            if name and storage.exists(name):
+                storage.delete(name)
+
+
+def generate(field_file):
+    """Создает варианты для файла; возвращает данные для Mediafiles.thumbnails"""
+    storage = field_file.storage
+    data = {'source': field_file.name, 'variants': []}
+    try:
+        with storage.open(field_file.name, 'rb') as source:
+            image = Image.open(source)
+            widths = thumbnail_widths()
+            # Для JPEG декодер сразу уменьшает изображение, не разворачивая его целиком
+            image.draft('RGB', (widths[-1], widths[-1]))
+            image.load()
+            image = ImageOps.exif_transpose(image)
+            if image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+        # Битый файл или не изображение: помечаем как обработанный, шаблон покажет оригинал
+        return data
+
+    # Не увеличиваем: ширины больше оригинала заменяются самим размером оригинала
+    targets = sorted({min(width, image.width) for width in widths}, reverse=True)
+
+    variants = []
+    for width in targets:
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        variants.append({
+            'width': image.width,
+            'height': image.height,
+            'webp': storage.save(variant_name(field_file.name, width, 'webp'), ContentFile(_encode(image, 'webp'))),
+            'jpeg': storage.save(variant_name(field_file.name, width, 'jpg'), ContentFile(_encode(image, 'jpeg'))),
+        })
+    data['variants'] = variants[::-1]
+    return data
+
+
+def needs_thumbnails(item):
+    return (
+        item.media_type == 'photo' and bool(item.media_file) and
+        (item.thumbnails or {}).get('source') != item.media_file.name
+    )
+
+
+def enqueue_thumbnails(item):
+    """Ставит создание вариантов в очередь фоновых задач, если они нужны"""
+    if not needs_thumbnails(item):
+        return None
+    return queue.enqueue('gallery.generate_thumbnails', key=f'thumbnails:{item.pk}', media_id=item.pk)
+
+
+def ensure_thumbnails(item, force=False):
+    """Создает варианты, если их нет или оригинал заменили; True, если что-то создано"""
+    if item.media_type != 'photo' or not item.media_file:
+        return False
+    if not force and not needs_thumbnails(item):
+        return False
+    delete_variants(item.media_file.storage, item.thumbnails)
+    item.thumbnails = generate(item.media_file)
+    # update() вместо save(), чтобы не запускать сигналы повторно
+    type(item).objects.filter(pk=item.pk).update(thumbnails=item.thumbnails)
+    return True
+
+
+class ImageVariants:
+    """Данные для <picture>: srcset в WebP и JPEG плюс src по умолчанию"""
+
+    def __init__(self, storage, data):
+        self.variants = [
+            {**variant, 'webp_url': storage.url(variant['webp']), 'jpeg_url': storage.url(variant['jpeg'])}
+            for variant in data['variants']
+        ]
+
+    @property
+    def webp_srcset(self):
+        return ', '.join(f"{v['webp_url']} {v['width']}w" for v in self.variants)
+
+    @property
+    def jpeg_srcset(self):
+        return ', '.join(f"{v['jpeg_url']} {v['width']}w" for v in self.variants)
+
+    @property
+    def src(self):
+        # Средний размер: разумное качество для браузеров без поддержки srcset
+        return self.variants[len(self.variants) // 2]['jpeg_url']
+
+    @property
+    def preview(self):
+        # Самый маленький вариант - для списков вроде очереди модерации
+        return self.variants[0]
+
+    @property
+    def width(self):
+        return self.variants[0]['width']
+
+    @property
+    def height(self):
+        return self.variants[0]['height']
+
+
+def variants_for(item):
+    """Варианты для показа или None, если их еще нет (тогда они ставятся в очередь)"""
+    if needs_thumbnails(item):
+        enqueue_thumbnails(item)
+        return None
+    data = item.thumbnails or {}
+    if item.media_type != 'photo' or not data.get('variants'):
+        return None
+    return ImageVariants(item.media_file.storage, data)
+
+
+@reference_provider
+def thumbnail_files():
+    """Имена вариантов для gc_media: они хранятся в JSONField, а не в FileField"""
+    from .models import Mediafiles
+
+    rows = Mediafiles.objects.exclude(thumbnails={}).values_list('thumbnails', flat=True)
+    for data in rows.iterator(chunk_size=500):
+        for variant in (data or {}).get('variants', []):
+            yield variant.get('webp')
+            yield variant.get('jpeg')
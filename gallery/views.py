@@ -1,11 +1,26 @@
+from datetime import datetime, time, timedelta
+
+from django.db.models import F
 from django.shortcuts import render, redirect
-from django.views.generic import CreateView, ListView
+from django.utils import timezone
+from django.contrib import messages
+from django.views.generic import CreateView, ListView, TemplateView
 from django.contrib.auth import login, logout
 from django.contrib.auth.forms import AuthenticationForm, UserCreationForm
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
+
+from core.mixins import ModeratorRequiredMixin
+from core.pagination import KeysetPaginator
+
+from . import services
 from .models import Mediafiles
-from .forms import GalleryForm
+from .forms import GalleryFilterForm, GalleryForm
+from .thumbnails import variants_for
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
 
 
 class GalleryListView(ListView):
@@ -14,15 +29,43 @@ class GalleryListView(ListView):
     paginate_by = 9  
     context_object_name = 'galleries'
     
+    # Порядок сортировок; pk в конце делает порядок однозначным для пагинации
+    ORDERINGS = {
+        'new': ('-created_at', '-pk'),
+        'old': ('created_at', 'pk'),
+        'taken': (F('captured_at').desc(nulls_last=True), '-pk'),
+        'size': (F('file_size').desc(nulls_last=True), '-pk'),
+        'duration': (F('duration').desc(nulls_last=True), '-pk'),
+    }
+
     def get_queryset(self):
-        queryset = Mediafiles.objects.filter(status='approved')
-        
+        queryset = Mediafiles.objects.filter(status='approved').select_related('author')
+
+        self.filter_form = GalleryFilterForm(self.request.GET)
+        filters = self.filter_form.cleaned_data if self.filter_form.is_valid() else {}
+
         # Фильтрация по типу файла
-        media_type = self.request.GET.get('type')
-        if media_type in ['photo', 'video', 'audio']:
-            queryset = queryset.filter(media_type=media_type)
-        
-        return queryset.order_by('-created_at')
+        if filters.get('type'):
+            queryset = queryset.filter(media_type=filters['type'])
+        if filters.get('orientation') == 'landscape':
+            queryset = queryset.filter(width__gt=F('height'))
+        elif filters.get('orientation') == 'portrait':
+            queryset = queryset.filter(height__gt=F('width'))
+        # Диапазон дат переводим в границы datetime, чтобы работал индекс по captured_at
+        if filters.get('taken_from'):
+            queryset = queryset.filter(captured_at__gte=_day_start(filters['taken_from']))
+        if filters.get('taken_to'):
+            queryset = queryset.filter(captured_at__lt=_day_start(filters['taken_to'] + timedelta(days=1)))
+
+        return queryset.order_by(*self.ORDERINGS[filters.get('sort') or 'new'])
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['filter_form'] = self.filter_form
+        # Уменьшенные копии только для текущей страницы; пока их нет, показывается оригинал
+        for item in context['galleries']:
+            item.variants = variants_for(item)
+        return context
 
 
 class GalleryCreateView(LoginRequiredMixin, CreateView):
@@ -31,11 +74,56 @@ class GalleryCreateView(LoginRequiredMixin, CreateView):
     template_name = 'gallery/add.html'
     success_url = reverse_lazy('gallery_list')  
     
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['user'] = self.request.user
+        return kwargs
+
     def form_valid(self, form):
         form.instance.author = self.request.user
         return super().form_valid(form)
 
 
+class ModerationQueueView(LoginRequiredMixin, ModeratorRequiredMixin, TemplateView):
+    """Очередь модерации: файлы на проверке и массовое одобрение/отклонение"""
+    template_name = 'gallery/moderation.html'
+    per_page = 50
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        pending = Mediafiles.objects.filter(status='pending').select_related('author')
+        media_type = self.request.GET.get('type')
+        if media_type in dict(Mediafiles.MEDIA_TYPES):
+            pending = pending.filter(media_type=media_type)
+
+        # Старые сначала; пагинация по (created_at, id) идет по индексу gallery_status_created_idx
+        page = KeysetPaginator(pending, 'created_at', self.per_page).page(
+            after=self.request.GET.get('after'),
+            before=self.request.GET.get('before'),
+        )
+        for item in page.object_list:
+            item.variants = variants_for(item)
+        context['items'] = page.object_list
+        context['items_page'] = page
+        context['pending_count'] = pending.count()
+        context['media_types'] = Mediafiles.MEDIA_TYPES
+        context['stats'] = services.moderator_stats()
+        return context
+
+    def post(self, request, *args, **kwargs):
+        decision = request.POST.get('decision')
+        ids = [value for value in request.POST.getlist('items') if value.isdigit()]
+        if decision not in services.MODERATION_DECISIONS or not ids:
+            messages.error(request, 'Выберите файлы и действие.')
+        else:
+            count = services.moderate(request.user, ids, decision)
+            label = 'Одобрено' if decision == 'approved' else 'Отклонено'
+            messages.success(request, f'{label} файлов: {count}')
+        # Остаемся на той же странице очереди (курсор и фильтр сохраняются)
+        query = request.GET.urlencode()
+        return redirect(f"{request.path}?{query}" if query else request.path)
+
+
 def register_view(request):
     if request.method == 'POST':
         form = UserCreationForm(request.POST)
@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'status', 'attempts', 'run_after', 'finished_at']
+    list_filter = ['status', 'name']
+    search_fields = ['key']
+    readonly_fields = ['locked_by', 'locked_at', 'last_error', 'created_at', 'finished_at']
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'jobs'
+    verbose_name = 'Фонові задачі'
+
+    def ready(self):
+        # Задачі оголошуються в <app>/tasks.py через jobs.registry.task
+        autodiscover_modules('tasks')
@@ -0,0 +1,24 @@
+"""Точки входу дочірніх процесів пулу.
+
+Модуль імпортується в процесі, запущеному через spawn, ще до
+django.setup(), тому моделі й черга імпортуються лише всередині функцій.
+"""
+import signal
+
+
+def init_process():
+    import django
+    django.setup()
+    # Ctrl+C отримує вся група процесів; зупинкою керує головний процес
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def execute(job_id):
+    from django.db import close_old_connections
+
+    from . import queue
+
+    try:
+        return queue.run_job(job_id)
+    finally:
+        close_old_connections()
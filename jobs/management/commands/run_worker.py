@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = "Запускає воркер фонових задач (обробка завантажених файлів тощо)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=getattr(settings, 'JOBS_WORKER_PROCESSES', 2),
+            help="Кількість процесів пулу; 0 - виконувати в поточному процесі"
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help="Скільки секунд чекати нових задач, коли черга порожня"
+        )
+        parser.add_argument(
+            '--max-tasks-per-child', type=int,
+            default=getattr(settings, 'JOBS_MAX_TASKS_PER_CHILD', 100),
+            help="Після скількох задач перезапускати дочірній процес"
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help="Виконати всі готові задачі й завершитися"
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            processes=options['processes'],
+            poll_interval=options['poll_interval'],
+            max_tasks_per_child=options['max_tasks_per_child'] or None,
+            log=self.stdout.write,
+        )
+        self.stdout.write(f"Воркер запущено, процесів: {options['processes']}")
+        done = worker.run(once=options['once'])
+        self.stdout.write(self.style.SUCCESS(f"Оброблено задач: {done}"))
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Задача')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='Аргументи')),
+                ('key', models.CharField(blank=True, db_index=True, max_length=200, verbose_name='Ключ')),
+                ('status', models.CharField(choices=[('queued', 'В черзі'), ('running', 'Виконується'), ('done', 'Виконано'), ('failed', 'Помилка')], default='queued', max_length=10, verbose_name='Статус')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Спроб')),
+                ('max_attempts', models.PositiveIntegerField(default=5, verbose_name='Максимум спроб')),
+                ('run_after', models.DateTimeField(verbose_name='Не раніше')),
+                ('locked_by', models.CharField(blank=True, max_length=100, verbose_name='Воркер')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Взято в роботу')),
+                ('last_error', models.TextField(blank=True, verbose_name='Остання помилка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Створено')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Завершено')),
+            ],
+            options={
+                'verbose_name': 'Задача',
+                'verbose_name_plural': 'Задачі',
+                'ordering': ['run_after', 'id'],
+                'indexes': [models.Index(fields=['status', 'run_after', 'id'], name='jobs_job_ready_idx')],
+            },
+        ),
+    ]
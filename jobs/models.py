@@ -0,0 +1,42 @@
+from django.db import models
+
+
+class Job(models.Model):
+    """Фонова задача в черзі; виконується командою run_worker"""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, 'В черзі'),
+        (RUNNING, 'Виконується'),
+        (DONE, 'Виконано'),
+        (FAILED, 'Помилка'),
+    )
+
+    name = models.CharField(max_length=100, verbose_name='Задача')
+    payload = models.JSONField(default=dict, blank=True, verbose_name='Аргументи')
+    # Ключ для дедуплікації: поки задача з таким ключем не завершена, нова не ставиться
+    key = models.CharField(max_length=200, blank=True, db_index=True, verbose_name='Ключ')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED, verbose_name='Статус')
+    attempts = models.PositiveIntegerField(default=0, verbose_name='Спроб')
+    max_attempts = models.PositiveIntegerField(default=5, verbose_name='Максимум спроб')
+    run_after = models.DateTimeField(verbose_name='Не раніше')
+    locked_by = models.CharField(max_length=100, blank=True, verbose_name='Воркер')
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name='Взято в роботу')
+    last_error = models.TextField(blank=True, verbose_name='Остання помилка')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Створено')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Завершено')
+
+    class Meta:
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачі'
+        ordering = ['run_after', 'id']
+        indexes = [
+            # Вибірка воркера: WHERE status = 'queued' AND run_after <= now ORDER BY run_after, id
+            models.Index(fields=['status', 'run_after', 'id'], name='jobs_job_ready_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.get_status_display()})"
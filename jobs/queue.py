@@ -0,0 +1,167 @@
+"""Черга фонових задач у БД.
+
+Веб-запит лише додає рядок у таблицю jobs_job (enqueue) і одразу
+повертає відповідь; обробку виконує окремий процес run_worker. Воркер
+забирає готові задачі (claim), виконує їх і фіксує результат. Невдала
+задача повертається в чергу з експоненційною затримкою, доки не вичерпає
+max_attempts, після чого отримує статус failed. Задачі, що зависли у
+статусі running (воркер упав), повертаються в чергу requeue_stale().
+"""
+import os
+import random
+import socket
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+from .registry import get_task
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def enqueue(name, key='', delay=0, max_attempts=None, **payload):
+    """Ставить задачу в чергу; повертає Job або None, якщо така вже очікує.
+
+    key - ключ дедуплікації: якщо задача з таким ключем ще не взята в
+    роботу, друга не створюється (вона однаково прочитає актуальні дані).
+    """
+    get_task(name)
+    if key and Job.objects.filter(key=key, status=Job.QUEUED).exists():
+        return None
+    return Job.objects.create(
+        name=name,
+        payload=payload,
+        key=key,
+        run_after=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or _setting('JOBS_MAX_ATTEMPTS', 5),
+    )
+
+
+def enqueue_many(name, jobs, delay=0, max_attempts=None):
+    """Ставить у чергу кілька задач двома запитами; jobs - пари (key, payload).
+
+    Дедуплікація за key така сама, як в enqueue(). Повертає створені Job.
+    """
+    get_task(name)
+    jobs = list(jobs)
+    keys = {key for key, _ in jobs if key}
+    seen = set()
+    if keys:
+        seen.update(Job.objects.filter(key__in=keys, status=Job.QUEUED).values_list('key', flat=True))
+    run_after = timezone.now() + timedelta(seconds=delay)
+    max_attempts = max_attempts or _setting('JOBS_MAX_ATTEMPTS', 5)
+    new_jobs = []
+    for key, payload in jobs:
+        if key:
+            if key in seen:
+                continue
+            seen.add(key)
+        new_jobs.append(Job(name=name, payload=payload, key=key, run_after=run_after, max_attempts=max_attempts))
+    return Job.objects.bulk_create(new_jobs)
+
+
+def backoff(attempts):
+    """Затримка перед повтором: base * 2^(n-1), не більше max, з випадковим розкидом"""
+    base = _setting('JOBS_RETRY_BACKOFF', 30)
+    limit = _setting('JOBS_RETRY_BACKOFF_MAX', 60 * 60)
+    delay = min(base * 2 ** max(attempts - 1, 0), limit)
+    # Розкид не дає задачам, що впали разом, разом і повторитися
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def claim(limit, owner=None):
+    """Забирає до limit готових задач; повертає їхні id.
+
+    Кожен виклик має власний токен у locked_by, тому два воркери, що
+    прочитали ті самі id, не отримають одну задачу двічі: оновиться лише
+    рядок, який ще в статусі queued.
+    """
+    now = timezone.now()
+    token = f'{owner or worker_id()}:{uuid.uuid4().hex[:8]}'
+    with transaction.atomic():
+        ids = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.QUEUED, run_after__lte=now)
+            .order_by('run_after', 'id')
+            .values_list('id', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        Job.objects.filter(pk__in=ids, status=Job.QUEUED).update(
+            status=Job.RUNNING, locked_by=token, locked_at=now, attempts=F('attempts') + 1
+        )
+    return list(
+        Job.objects.filter(locked_by=token, status=Job.RUNNING)
+        .order_by('run_after', 'id').values_list('id', flat=True)
+    )
+
+
+def _record_failure(job, error):
+    now = timezone.now()
+    update = {'last_error': error, 'locked_by': '', 'locked_at': None}
+    if job.attempts >= job.max_attempts:
+        update.update(status=Job.FAILED, finished_at=now)
+    else:
+        update.update(status=Job.QUEUED, run_after=now + timedelta(seconds=backoff(job.attempts)))
+    # Умова на locked_by: якщо задачу вже забрав інший воркер, результат не перезаписується
+    Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(**update)
+
+
+def run_job(job_id):
+    """Виконує взяту в роботу задачу; True, якщо успішно"""
+    job = Job.objects.get(pk=job_id)
+    try:
+        get_task(job.name)(**job.payload)
+    except Exception:
+        _record_failure(job, traceback.format_exc())
+        return False
+    Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(
+        status=Job.DONE, finished_at=timezone.now(), last_error='', locked_by='', locked_at=None
+    )
+    return True
+
+
+def fail_job(job_id, error):
+    """Фіксує падіння задачі поза run_job (наприклад, коли впав дочірній процес)"""
+    job = Job.objects.filter(pk=job_id, status=Job.RUNNING).first()
+    if job is not None:
+        _record_failure(job, error)
+
+
+def requeue_stale():
+    """Повертає в чергу задачі, що зависли в running довше за JOBS_LOCK_TIMEOUT"""
+    cutoff = timezone.now() - timedelta(seconds=_setting('JOBS_LOCK_TIMEOUT', 10 * 60))
+    stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, finished_at=timezone.now(), last_error='Перевищено час виконання',
+        locked_by='', locked_at=None
+    )
+    requeued = stale.update(
+        status=Job.QUEUED, run_after=timezone.now(), last_error='Перевищено час виконання',
+        locked_by='', locked_at=None
+    )
+    return failed + requeued
+
+
+def run_pending(limit=None):
+    """Виконує готові задачі в поточному процесі; повертає кількість виконаних"""
+    done = 0
+    while limit is None or done < limit:
+        ids = claim(1)
+        if not ids:
+            break
+        run_job(ids[0])
+        done += 1
+    return done
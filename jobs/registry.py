@@ -0,0 +1,27 @@
+"""Реєстр фонових задач.
+
+Задача - звичайна функція з JSON-сумісними keyword-аргументами:
+
+    @task('gallery.generate_thumbnails')
+    def generate_thumbnails(media_id):
+        ...
+
+Модулі <app>/tasks.py імпортуються автоматично в JobsConfig.ready.
+"""
+TASKS = {}
+
+
+def task(name):
+    def decorator(func):
+        if name in TASKS and TASKS[name] is not func:
+            raise ValueError(f"Задачу '{name}' вже зареєстровано")
+        TASKS[name] = func
+        return func
+    return decorator
+
+
+def get_task(name):
+    try:
+        return TASKS[name]
+    except KeyError:
+        raise LookupError(f"Невідома задача '{name}'") from None
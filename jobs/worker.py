@@ -0,0 +1,99 @@
+"""Пул процесів для виконання фонових задач (команда run_worker)."""
+import multiprocessing
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.db import connections
+
+from . import queue
+from .child import execute, init_process
+
+
+class Worker:
+    """Головний процес забирає задачі з БД і роздає їх пулу процесів.
+
+    processes=0 виконує задачі в самому процесі (зручно для розробки).
+    """
+
+    def __init__(self, processes, poll_interval=1.0, max_tasks_per_child=None, log=None):
+        self.processes = processes
+        self.poll_interval = poll_interval
+        self.max_tasks_per_child = max_tasks_per_child
+        self.log = log or (lambda message: None)
+        self.stopping = False
+
+    def stop(self, *args):
+        if not self.stopping:
+            self.log("Зупинка: завершуємо задачі, що виконуються...")
+        self.stopping = True
+
+    def _sleep(self):
+        deadline = time.monotonic() + self.poll_interval
+        while not self.stopping and time.monotonic() < deadline:
+            time.sleep(min(0.2, self.poll_interval))
+
+    def run(self, once=False):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        queue.requeue_stale()
+        if self.processes == 0:
+            return self._run_inline(once)
+        return self._run_pool(once)
+
+    def _run_inline(self, once):
+        done = 0
+        while not self.stopping:
+            ids = queue.claim(1)
+            if ids:
+                queue.run_job(ids[0])
+                done += 1
+            elif once:
+                break
+            else:
+                self._sleep()
+        return done
+
+    def _run_pool(self, once):
+        done = 0
+        while not self.stopping:
+            # Не передаємо дочірнім процесам відкриті з'єднання з БД
+            connections.close_all()
+            # spawn, а не fork: дочірні процеси не успадковують стан головного
+            pool = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_process,
+                max_tasks_per_child=self.max_tasks_per_child,
+            )
+            in_flight = {}
+            try:
+                while True:
+                    if not self.stopping:
+                        # Невеликий запас, щоб процеси не простоювали між задачами
+                        for job_id in queue.claim(self.processes * 2 - len(in_flight)):
+                            in_flight[pool.submit(execute, job_id)] = job_id
+                    if not in_flight:
+                        if self.stopping or once:
+                            self.stopping = True
+                            break
+                        self._sleep()
+                        queue.requeue_stale()
+                        continue
+                    finished, _ = wait(in_flight, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        job_id = in_flight.pop(future)
+                        error = future.exception()
+                        if error is not None:
+                            queue.fail_job(job_id, repr(error))
+                            if isinstance(error, BrokenProcessPool):
+                                raise error
+                        done += 1
+            except BrokenProcessPool:
+                self.log("Пул процесів упав, перезапуск")
+                for job_id in in_flight.values():
+                    queue.fail_job(job_id, 'Пул процесів упав')
+            finally:
+                pool.shutdown(wait=True, cancel_futures=True)
+        return done
@@ -1,7 +1,13 @@
 from django import forms
 from .models import Material
 from django.forms import ModelForm
-class MaterialForm(ModelForm):
+
+from media.forms import ChunkedUploadFormMixin
+
+class MaterialForm(ChunkedUploadFormMixin, ModelForm):
+    # Великі відео можна завантажити частинами через /uploads/ і прикріпити за токеном
+    upload_field = 'video'
+
     class Meta:
         model = Material
         fields = ['name', 'description', 'image', 'video', 'url']
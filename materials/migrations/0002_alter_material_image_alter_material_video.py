@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:26
+
+import media.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('materials', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='material',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=media.storage.get_content_storage, upload_to='materials/'),
+        ),
+        migrations.AlterField(
+            model_name='material',
+            name='video',
+            field=models.FileField(blank=True, null=True, storage=media.storage.get_content_storage, upload_to='materials/videos/'),
+        ),
+    ]
@@ -1,13 +1,15 @@
 from django.db import models
 from urllib.parse import urlparse, parse_qs
 
+from media.storage import get_content_storage
+
 # Create your models here.
 
 class Material(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField()
-    image = models.ImageField(upload_to='materials/', blank=True, null=True)
-    video = models.FileField(upload_to='materials/videos/', blank=True, null=True)
+    image = models.ImageField(upload_to='materials/', storage=get_content_storage, blank=True, null=True)
+    video = models.FileField(upload_to='materials/videos/', storage=get_content_storage, blank=True, null=True)
     url = models.URLField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -1,7 +1,9 @@
+from django.conf import settings
 from django.shortcuts import render
 from .models import Material
 from django.views.generic import CreateView, DeleteView, UpdateView, ListView
 from .forms import MaterialForm, MaterialUpdateForm
+from core.images import enqueue_downscale
 
 # Create your views here.
 
@@ -16,6 +18,16 @@ class MaterialCreateView(CreateView):
     success_url = '/materials/'
     form_class = MaterialForm
 
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['user'] = self.request.user
+        return kwargs
+
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        enqueue_downscale(self.object, 'image', settings.UPLOAD_IMAGE_MAX_SIZE)
+        return response
+
 class MaterialUpdateView(UpdateView):
     model = Material
     template_name = 'materials/material_update.html'
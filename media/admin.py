@@ -0,0 +1,17 @@
+from django.contrib import admin
+
+from .models import Blob, Upload
+
+
+@admin.register(Blob)
+class BlobAdmin(admin.ModelAdmin):
+    list_display = ['name', 'size', 'refcount', 'updated_at']
+    search_fields = ['name']
+    readonly_fields = ['name', 'size', 'refcount', 'created_at', 'updated_at']
+
+
+@admin.register(Upload)
+class UploadAdmin(admin.ModelAdmin):
+    list_display = ['filename', 'owner', 'size', 'received', 'status', 'updated_at']
+    list_filter = ['status']
+    readonly_fields = ['token', 'received', 'file', 'created_at', 'updated_at']
@@ -0,0 +1,49 @@
+from django import forms
+from django.urls import reverse_lazy
+
+from . import uploads
+from .models import Upload
+
+
+class ChunkedUploadFormMixin:
+    """Дозволяє замість файлу у формі передати токен завершеного поетапного завантаження.
+
+    upload_field - поле моделі, куди прикріплюється файл. Форма отримує
+    user у kwargs: прикріпити можна лише власне завантаження.
+    """
+    upload_field = None
+
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.user = user
+        self.upload = None
+        field = self.fields[self.upload_field]
+        self.file_required = field.required
+        field.required = False
+        # Для static/js/chunked_upload.js: великі файли йдуть через API, а не в POST форми
+        field.widget.attrs['data-chunked-upload'] = reverse_lazy('media:upload-create')
+        self.fields['upload_token'] = forms.UUIDField(required=False, widget=forms.HiddenInput)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        token = cleaned_data.get('upload_token')
+        if token:
+            if self.user is None or not self.user.is_authenticated:
+                self.add_error(self.upload_field, "Щоб прикріпити завантажений файл, увійдіть у систему.")
+            else:
+                self.upload = Upload.objects.filter(
+                    token=token, owner=self.user, status=Upload.COMPLETE
+                ).first()
+                if self.upload is None:
+                    self.add_error(self.upload_field, "Завантаження не знайдено або воно ще не завершене.")
+        elif self.file_required and not cleaned_data.get(self.upload_field):
+            self.add_error(self.upload_field, self.fields[self.upload_field].error_messages['required'])
+        return cleaned_data
+
+    def save(self, commit=True):
+        if self.upload is not None:
+            setattr(self.instance, self.upload_field, self.upload.file.name)
+        instance = super().save(commit)
+        if self.upload is not None and commit:
+            uploads.attach(self.upload)
+        return instance
@@ -0,0 +1,243 @@
+"""Прибирання файлів, на які більше немає посилань (команда gc_media).
+
+collect_blobs() відповідає за сховище за вмістом (blobs/), а
+collect_orphans() - за решту MEDIA_ROOT: файли під старими іменами, що
+лишились після каскадного видалення рядків або заміни файлу в полі.
+"""
+import fnmatch
+import os
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from . import uploads
+from .models import Blob, Upload
+from .references import count_references, file_fields, find_referenced, provider_names
+from .storage import BLOB_DIR, TMP_DIR, UPLOADS_DIR, content_storage, is_blob
+
+BATCH_SIZE = 500
+
+
+@dataclass
+class Report:
+    files: int = 0
+    bytes: int = 0
+    recounted: int = 0
+    adopted: int = 0
+
+    def add(self, size):
+        self.files += 1
+        self.bytes += size
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def collect_blobs(grace, dry_run=False, storage=content_storage):
+    """Звіряє лічильники Blob з посиланнями й видаляє файли без посилань.
+
+    Blob читаються пачками по BATCH_SIZE за зростанням pk; для кожної
+    пачки посилання рахуються запитами "WHERE поле IN (...)", після чого
+    лічильники оновлюються, а файли без посилань видаляються - у пам'яті
+    лише одна пачка. grace - скільки секунд не чіпати щойно змінені
+    файли: збережений storage.save() файл отримує посилання в рядку
+    моделі трохи пізніше.
+    """
+    report = Report()
+    cutoff = timezone.now() - timedelta(seconds=grace)
+    fields = list(file_fields(storage))
+
+    last_pk = 0
+    while True:
+        blobs = list(Blob.objects.filter(updated_at__lt=cutoff, pk__gt=last_pk).order_by('pk')[:BATCH_SIZE])
+        if not blobs:
+            break
+        last_pk = blobs[-1].pk
+        references = count_references([blob.name for blob in blobs], fields)
+
+        changed = []
+        orphans = []
+        for blob in blobs:
+            actual = references[blob.name]
+            if actual == 0:
+                orphans.append(blob.pk)
+            elif blob.refcount != actual:
+                blob.refcount = actual
+                changed.append(blob)
+        report.recounted += _save_counts(changed, dry_run)
+        if orphans:
+            _delete_orphans(orphans, cutoff, storage, report, dry_run)
+
+    _collect_untracked(storage, cutoff.timestamp(), report, dry_run)
+    return report
+
+
+def _delete_orphans(pks, cutoff, storage, report, dry_run):
+    with transaction.atomic():
+        # Blob, змінений після початку прибирання, міг отримати нове посилання
+        blobs = Blob.objects.select_for_update().filter(pk__in=pks, updated_at__lt=cutoff)
+        for blob in blobs:
+            report.add(blob.size)
+            if not dry_run:
+                _remove(storage.path(blob.name))
+        if not dry_run:
+            blobs.delete()
+
+
+def _save_counts(blobs, dry_run):
+    if blobs and not dry_run:
+        Blob.objects.bulk_update(blobs, ['refcount'])
+    return len(blobs)
+
+
+def _collect_untracked(storage, cutoff, report, dry_run):
+    """Файли в blobs/ без рядка Blob (збій посеред збереження) і залишки тимчасових файлів"""
+    root = storage.path(BLOB_DIR)
+    if not os.path.isdir(root):
+        return
+    tmp_root = storage.path(TMP_DIR)
+    # Незавершені завантаження мають власний строк життя (collect_uploads)
+    skip = {storage.path(UPLOADS_DIR)}
+
+    def sweep(batch):
+        known = set(Blob.objects.filter(name__in=[name for name, _, _ in batch]).values_list('name', flat=True))
+        for name, path, size in batch:
+            if name not in known:
+                report.add(size)
+                if not dry_run:
+                    _remove(path)
+
+    batch = []
+    for entry in _walk_files(root, skip=skip):
+        stat = entry.stat(follow_symlinks=False)
+        if stat.st_mtime >= cutoff:
+            continue
+        if os.path.dirname(entry.path) == tmp_root:
+            report.add(stat.st_size)
+            if not dry_run:
+                _remove(entry.path)
+            continue
+        batch.append((os.path.relpath(entry.path, storage.location).replace(os.sep, '/'), entry.path, stat.st_size))
+        if len(batch) >= BATCH_SIZE:
+            sweep(batch)
+            batch = []
+    if batch:
+        sweep(batch)
+
+
+def collect_uploads(expiry, dry_run=False, storage=content_storage):
+    """Скасовує поетапні завантаження, які не завершили або не прикріпили за expiry секунд"""
+    report = Report()
+    cutoff = timezone.now() - timedelta(seconds=expiry)
+    for upload in list(Upload.objects.filter(updated_at__lt=cutoff)):
+        report.add(upload.received)
+        if not dry_run:
+            uploads.cancel(upload)
+
+    # Частини, рядки яких зникли разом з користувачем
+    root = storage.path(UPLOADS_DIR)
+    if os.path.isdir(root):
+        tokens = {str(token) for token in Upload.objects.values_list('token', flat=True)}
+        for entry in _walk_files(root):
+            stat = entry.stat(follow_symlinks=False)
+            if entry.name.removesuffix('.part') not in tokens and stat.st_mtime < cutoff.timestamp():
+                report.add(stat.st_size)
+                if not dry_run:
+                    _remove(entry.path)
+    return report
+
+
+def adopt_legacy(dry_run=False, storage=content_storage):
+    """Переносить старі файли полів зі сховищем за вмістом у blobs/.
+
+    Дублікати при цьому зливаються в один файл. Старі файли не
+    видаляються: на них можуть посилатись інші поля, їх прибирає gc_media.
+    """
+    adopted = 0
+    for model, field in file_fields(storage):
+        manager = model._default_manager
+        rows = (
+            manager.exclude(**{field.attname: ''})
+            .exclude(**{f'{field.attname}__isnull': True})
+            .exclude(**{f'{field.attname}__startswith': BLOB_DIR + '/'})
+            .values_list('pk', field.attname)
+        )
+        for pk, name in rows.iterator(chunk_size=BATCH_SIZE):
+            if is_blob(name) or not storage.exists(name):
+                continue
+            adopted += 1
+            if dry_run:
+                continue
+            with storage.open(name, 'rb') as source:
+                new_name = storage.save(name, File(source))
+            if not manager.filter(pk=pk, **{field.attname: name}).update(**{field.attname: new_name}):
+                storage.delete(new_name)
+    return adopted
+
+
+def _walk_files(root, skip=()):
+    """Потоково обходить файли під root через os.scandir, не збираючи їх у список"""
+    pending = [root]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.path not in skip:
+                        pending.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
+
+
+def collect_orphans(grace, dry_run=False, batch_size=BATCH_SIZE, log=None):
+    """Видаляє з MEDIA_ROOT файли, на які не посилається жодне FileField.
+
+    Файли читаються пачками по batch_size; для кожної пачки по кожному
+    полю виконується один запит "WHERE поле IN (...)", тож ні список
+    файлів, ні список посилань не тримаються в пам'яті цілком. Каталог
+    blobs/ пропускається (див. collect_blobs), як і шаблони MEDIA_GC_PROTECTED.
+    """
+    report = Report()
+    root = os.path.abspath(settings.MEDIA_ROOT)
+    if not os.path.isdir(root):
+        return report
+    cutoff = time.time() - grace
+    protected = getattr(settings, 'MEDIA_GC_PROTECTED', ())
+    fields = list(file_fields())
+    # Імена з провайдерів (мініатюри в JSONField), крім blobs/, яких тут не буде
+    extra = frozenset(name for name in provider_names() if not is_blob(name))
+
+    def sweep(batch):
+        referenced = find_referenced((name for name, _, _ in batch), fields, extra)
+        for name, path, size in batch:
+            if name in referenced:
+                continue
+            report.add(size)
+            if log:
+                log(name)
+            if not dry_run:
+                _remove(path)
+
+    batch = []
+    for entry in _walk_files(root, skip={os.path.join(root, BLOB_DIR)}):
+        stat = entry.stat(follow_symlinks=False)
+        if stat.st_mtime >= cutoff:
+            continue
+        name = os.path.relpath(entry.path, root).replace(os.sep, '/')
+        if any(fnmatch.fnmatch(name, pattern) for pattern in protected):
+            continue
+        batch.append((name, entry.path, stat.st_size))
+        if len(batch) >= batch_size:
+            sweep(batch)
+            batch = []
+    if batch:
+        sweep(batch)
+    return report
@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from media import gc
+
+
+class Command(BaseCommand):
+    help = "Прибирає з MEDIA_ROOT файли, на які більше немає посилань у БД"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Лише показати, що буде видалено"
+        )
+        parser.add_argument(
+            '--grace', type=int, default=getattr(settings, 'MEDIA_GC_GRACE', 60 * 60),
+            help="Не чіпати файли, змінені менше ніж стільки секунд тому"
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=gc.BATCH_SIZE,
+            help="Скільки файлів перевіряти одним запитом до кожного поля"
+        )
+        parser.add_argument(
+            '--adopt-legacy', action='store_true',
+            help="Спершу перенести старі файли полів у blobs/ (дублікати зливаються)"
+        )
+        parser.add_argument(
+            '--blobs-only', action='store_true',
+            help="Прибрати лише blobs/, не обходячи решту MEDIA_ROOT"
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        prefix = "[dry-run] " if dry_run else ""
+        log = self.stdout.write if options['verbosity'] > 1 else None
+
+        if options['adopt_legacy']:
+            adopted = gc.adopt_legacy(dry_run=dry_run)
+            self.stdout.write(f"{prefix}Перенесено старих файлів: {adopted}")
+
+        expired = gc.collect_uploads(getattr(settings, 'MEDIA_UPLOAD_EXPIRY', 24 * 60 * 60), dry_run=dry_run)
+        self.stdout.write(f"{prefix}Прострочені завантаження: {expired.files}, {filesizeformat(expired.bytes)}")
+
+        blobs = gc.collect_blobs(options['grace'], dry_run=dry_run)
+        self.stdout.write(f"{prefix}Виправлено лічильників: {blobs.recounted}")
+        self.stdout.write(f"{prefix}blobs/: файлів без посилань {blobs.files}, {filesizeformat(blobs.bytes)}")
+
+        total = expired.files + blobs.files, expired.bytes + blobs.bytes
+        if not options['blobs_only']:
+            orphans = gc.collect_orphans(
+                options['grace'], dry_run=dry_run, batch_size=options['batch_size'], log=log
+            )
+            self.stdout.write(
+                f"{prefix}Інші файли: без посилань {orphans.files}, {filesizeformat(orphans.bytes)}"
+            )
+            total = total[0] + orphans.files, total[1] + orphans.bytes
+
+        verb = "Можна звільнити" if dry_run else "Звільнено"
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{verb}: {filesizeformat(total[1])} (файлів: {total[0]})"
+        ))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name="Ім'я")),
+                ('size', models.PositiveBigIntegerField(verbose_name='Розмір')),
+                ('refcount', models.PositiveIntegerField(default=0, verbose_name='Посилань')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Створено')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Змінено')),
+            ],
+            options={
+                'verbose_name': 'Файл',
+                'verbose_name_plural': 'Файли',
+            },
+        ),
+    ]
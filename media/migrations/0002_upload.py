@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:34
+
+import django.db.models.deletion
+import media.storage
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('media', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Upload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.UUIDField(default=uuid.uuid4, editable=False, unique=True, verbose_name='Токен')),
+                ('filename', models.CharField(max_length=255, verbose_name="Ім'я файлу")),
+                ('size', models.PositiveBigIntegerField(verbose_name='Розмір')),
+                ('received', models.PositiveBigIntegerField(default=0, verbose_name='Отримано байтів')),
+                ('sha256', models.CharField(blank=True, max_length=64, verbose_name='Очікуваний SHA-256')),
+                ('status', models.CharField(choices=[('pending', 'Завантажується'), ('complete', 'Завантажено')], default='pending', max_length=10, verbose_name='Статус')),
+                ('file', models.FileField(blank=True, storage=media.storage.get_content_storage, upload_to='', verbose_name='Файл')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Створено')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Змінено')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='uploads', to=settings.AUTH_USER_MODEL, verbose_name='Власник')),
+            ],
+            options={
+                'verbose_name': 'Завантаження',
+                'verbose_name_plural': 'Завантаження',
+            },
+        ),
+    ]
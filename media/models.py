@@ -0,0 +1,62 @@
+import uuid
+
+from django.conf import settings
+from django.db import models
+
+from .storage import get_content_storage
+
+
+class Blob(models.Model):
+    """Файл у сховищі за вмістом (media.storage.ContentAddressedStorage).
+
+    refcount - скільки разів файл було збережено і ще не видалено через
+    storage.delete(). Рядки, видалені каскадом, лічильник не зменшують;
+    його звіряє з реальними посиланнями команда gc_media.
+    """
+    name = models.CharField(max_length=100, unique=True, verbose_name="Ім'я")
+    size = models.PositiveBigIntegerField(verbose_name='Розмір')
+    refcount = models.PositiveIntegerField(default=0, verbose_name='Посилань')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Створено')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Змінено')
+
+    class Meta:
+        verbose_name = 'Файл'
+        verbose_name_plural = 'Файли'
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount})"
+
+
+class Upload(models.Model):
+    """Поетапне завантаження великого файлу (media.uploads).
+
+    Поки status=pending, байти дописуються в blobs/uploads/<token>.part;
+    після finalize файл переноситься в blobs/ і поле file посилається на
+    нього, доки форма не прикріпить завантаження за токеном.
+    """
+    PENDING = 'pending'
+    COMPLETE = 'complete'
+    STATUS_CHOICES = (
+        (PENDING, 'Завантажується'),
+        (COMPLETE, 'Завантажено'),
+    )
+
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False, verbose_name='Токен')
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='uploads', verbose_name='Власник'
+    )
+    filename = models.CharField(max_length=255, verbose_name="Ім'я файлу")
+    size = models.PositiveBigIntegerField(verbose_name='Розмір')
+    received = models.PositiveBigIntegerField(default=0, verbose_name='Отримано байтів')
+    sha256 = models.CharField(max_length=64, blank=True, verbose_name='Очікуваний SHA-256')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING, verbose_name='Статус')
+    file = models.FileField(storage=get_content_storage, blank=True, verbose_name='Файл')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Створено')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Змінено')
+
+    class Meta:
+        verbose_name = 'Завантаження'
+        verbose_name_plural = 'Завантаження'
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
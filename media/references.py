@@ -0,0 +1,76 @@
+"""Звідки беруться посилання на файли.
+
+Основне джерело - FileField/ImageField усіх моделей. Файли, імена яких
+зберігаються не у FileField (наприклад, мініатюри галереї в JSONField),
+додаються через reference_provider:
+
+    @reference_provider
+    def thumbnail_files():
+        yield 'blobs/ab/cd/....webp'
+"""
+from django.apps import apps
+from django.db.models import Count, FileField
+
+PROVIDERS = []
+
+
+def reference_provider(func):
+    if func not in PROVIDERS:
+        PROVIDERS.append(func)
+    return func
+
+
+def file_fields(storage=None):
+    """Пари (модель, поле) для всіх FileField; лише з указаним сховищем, якщо воно задане"""
+    for model in apps.get_models():
+        if model._meta.proxy:
+            continue
+        for field in model._meta.concrete_fields:
+            if isinstance(field, FileField) and (storage is None or field.storage is storage):
+                yield model, field
+
+
+def provider_names():
+    for provider in PROVIDERS:
+        for name in provider():
+            if name:
+                yield name
+
+
+def find_referenced(names, fields, extra=frozenset()):
+    """Які з names (пачка імен файлів) згадуються хоча б в одному полі або в extra"""
+    names = list(names)
+    referenced = set(extra.intersection(names))
+    for model, field in fields:
+        remaining = [name for name in names if name not in referenced]
+        if not remaining:
+            break
+        referenced.update(
+            model._default_manager.filter(**{f'{field.attname}__in': remaining})
+            .values_list(field.attname, flat=True)
+        )
+    return referenced
+
+
+def count_references(names, fields):
+    """Лічильник посилань {ім'я: кількість} для пачки імен names.
+
+    Для кожного поля - один згрупований запит "WHERE поле IN (...)", тож
+    пам'ять залежить від розміру пачки, а не від кількості файлів. Імена
+    від провайдерів читаються потоком і рахуються лише ті, що є в пачці.
+    """
+    counts = dict.fromkeys(names, 0)
+    if not counts:
+        return counts
+    for model, field in fields:
+        rows = (
+            model._default_manager.filter(**{f'{field.attname}__in': list(counts)})
+            .order_by().values(field.attname).annotate(total=Count('pk'))
+            .values_list(field.attname, 'total')
+        )
+        for name, total in rows:
+            counts[name] += total
+    for name in provider_names():
+        if name in counts:
+            counts[name] += 1
+    return counts
@@ -0,0 +1,213 @@
+"""Сховище завантажених файлів з адресацією за вмістом.
+
+Файл під час збереження проходить через SHA-256 і кладеться в
+blobs/ab/cd/<sha256>.<ext>, тому повторне завантаження того самого
+вмісту не займає місця на диску: поле отримує те саме ім'я, а лічильник
+посилань media.Blob збільшується. delete() лише зменшує лічильник і
+видаляє файл, коли посилань не лишилось. Старі файли з іменами на
+кшталт avatars/cat.png обслуговуються як у звичайному FileSystemStorage.
+"""
+import hashlib
+import os
+import tempfile
+from collections import Counter, defaultdict
+
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+BLOB_DIR = 'blobs'
+TMP_DIR = os.path.join(BLOB_DIR, 'tmp')
+# Частково завантажені файли (media.uploads); не віддаються і не чіпаються прибиранням blobs/
+UPLOADS_DIR = os.path.join(BLOB_DIR, 'uploads')
+MAX_EXTENSION_LENGTH = 10
+
+# Одне розширення для одного формату, щоб однаковий вміст не розходився по різних іменах
+EXTENSION_ALIASES = {'.jpeg': '.jpg', '.jpe': '.jpg', '.jfif': '.jpg', '.tif': '.tiff', '.htm': '.html'}
+
+
+def is_blob(name):
+    return bool(name) and name.replace('\\', '/').startswith(BLOB_DIR + '/')
+
+
+def is_internal(name):
+    """Службові каталоги сховища: тимчасові файли і незавершені завантаження"""
+    name = name.replace('\\', '/')
+    return any(name.startswith(directory.replace(os.sep, '/') + '/') for directory in (TMP_DIR, UPLOADS_DIR))
+
+
+def blob_name(digest, extension):
+    return '/'.join([BLOB_DIR, digest[:2], digest[2:4], digest + extension])
+
+
+def normalize_extension(name):
+    extension = os.path.splitext(name)[1].lower()
+    extension = EXTENSION_ALIASES.get(extension, extension)
+    if len(extension) > MAX_EXTENSION_LENGTH or not extension[1:].isalnum():
+        return ''
+    return extension
+
+
+class ContentAddressedStorage(FileSystemStorage):
+
+    def get_available_name(self, name, max_length=None):
+        # Ім'я визначає вміст (_save), а не upload_to, тому суфікси не потрібні
+        return name
+
+    def _stage(self, content):
+        """Пише вміст у blobs/tmp, рахуючи SHA-256; повертає (шлях, sha256, розмір)"""
+        tmp_dir = self.path(TMP_DIR)
+        os.makedirs(tmp_dir, exist_ok=True)
+        hasher = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                for chunk in content.chunks():
+                    hasher.update(chunk)
+                    tmp.write(chunk)
+                    size += len(chunk)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return tmp_path, hasher.hexdigest(), size
+
+    def _save(self, name, content):
+        tmp_path, digest, size = self._stage(content)
+        try:
+            return self._commit(tmp_path, digest, name, size)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def save_many(self, files):
+        """Зберігає кілька файлів (пари ім'я, вміст) з одним обліком Blob на всю пачку.
+
+        Повертає імена в тому самому порядку. Кількість запитів до БД не
+        залежить від кількості файлів: лічильники змінюються кількома
+        груповими UPDATE та одним bulk_create.
+        """
+        staged = []
+        try:
+            for name, content in files:
+                tmp_path, digest, size = self._stage(content)
+                staged.append((tmp_path, blob_name(digest, normalize_extension(name)), size))
+            if not staged:
+                return []
+            with transaction.atomic():
+                self._acquire_many(
+                    Counter(name for _, name, _ in staged),
+                    {name: size for _, name, size in staged},
+                )
+                for tmp_path, name, _ in staged:
+                    self._place(tmp_path, name)
+        except BaseException:
+            for tmp_path, _, _ in staged:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            raise
+        return [name for _, name, _ in staged]
+
+    def adopt(self, path, name, chunk_size=1024 * 1024):
+        """Переносить готовий локальний файл (у тій самій файловій системі) у blobs/ без копіювання.
+
+        Повертає (ім'я, sha256). Використовується для зібраних поетапних завантажень.
+        """
+        hasher = hashlib.sha256()
+        size = 0
+        with open(path, 'rb') as source:
+            for chunk in iter(lambda: source.read(chunk_size), b''):
+                hasher.update(chunk)
+                size += len(chunk)
+        digest = hasher.hexdigest()
+        return self._commit(path, digest, name, size), digest
+
+    def _commit(self, tmp_path, digest, name, size):
+        name = blob_name(digest, normalize_extension(name))
+        # Лічильник і файл змінюються під блокуванням рядка Blob, тому
+        # паралельний delete() не прибере файл, на який щойно з'явилось посилання
+        with transaction.atomic():
+            self._acquire(name, size)
+            self._place(tmp_path, name)
+        return name
+
+    def _place(self, tmp_path, name):
+        path = self.path(name)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+        if self.file_permissions_mode is not None:
+            os.chmod(path, self.file_permissions_mode)
+
+    def _acquire(self, name, size, count=1):
+        from .models import Blob
+
+        updated = Blob.objects.filter(name=name).update(
+            refcount=F('refcount') + count, updated_at=timezone.now()
+        )
+        if updated:
+            return
+        try:
+            with transaction.atomic():
+                Blob.objects.create(name=name, size=size, refcount=count)
+        except IntegrityError:
+            Blob.objects.filter(name=name).update(refcount=F('refcount') + count, updated_at=timezone.now())
+
+    def _acquire_many(self, counts, sizes):
+        from .models import Blob
+
+        now = timezone.now()
+        existing = set(
+            Blob.objects.select_for_update().filter(name__in=list(counts)).values_list('name', flat=True)
+        )
+        # Один UPDATE на кожну кратність (зазвичай усі файли різні - тобто один UPDATE)
+        by_count = defaultdict(list)
+        for name in existing:
+            by_count[counts[name]].append(name)
+        for count, names in by_count.items():
+            Blob.objects.filter(name__in=names).update(refcount=F('refcount') + count, updated_at=now)
+
+        missing = [name for name in counts if name not in existing]
+        if not missing:
+            return
+        try:
+            with transaction.atomic():
+                Blob.objects.bulk_create([
+                    Blob(name=name, size=sizes[name], refcount=counts[name]) for name in missing
+                ])
+        except IntegrityError:
+            # Хтось паралельно створив такий самий blob: рахуємо по одному
+            for name in missing:
+                self._acquire(name, sizes[name], counts[name])
+
+    def delete(self, name):
+        if not is_blob(name):
+            return super().delete(name)
+
+        from .models import Blob
+
+        with transaction.atomic():
+            blob = Blob.objects.select_for_update().filter(name=name).first()
+            if blob is None:
+                # Файл без обліку (наприклад, після збою) прибере gc_media
+                return
+            if blob.refcount > 1:
+                Blob.objects.filter(pk=blob.pk).update(
+                    refcount=F('refcount') - 1, updated_at=timezone.now()
+                )
+                return
+            blob.delete()
+            super().delete(name)
+
+
+content_storage = ContentAddressedStorage()
+
+
+def get_content_storage():
+    """Callable для FileField(storage=...), щоб міграції не фіксували налаштування сховища"""
+    return content_storage
@@ -0,0 +1,446 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import UserProfile
+from gallery.models import Mediafiles
+from portfolio.models import Attachment, Portfolio
+
+from . import gc, uploads
+from .models import Blob, Upload
+from .storage import content_storage
+
+class ContentAddressedStorageTest(TestCase):
+    """Тести для сховища за вмістом і gc_media"""
+
+    def setUp(self):
+        # Окремий каталог на кожен тест: файли не відкочуються разом з БД
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media_settings = override_settings(MEDIA_ROOT=self.media_root)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.portfolio = Portfolio.objects.create(owner=self.user, title='Проєкт')
+
+    def attach(self, content, name='report.pdf'):
+        return Attachment.objects.create(
+            portfolio=self.portfolio, file=ContentFile(content, name=name), name=name
+        )
+
+    def test_duplicates_share_one_file(self):
+        first = self.attach(b'same bytes', 'a.PDF')
+        second = self.attach(b'same bytes', 'b.pdf')
+
+        digest = hashlib.sha256(b'same bytes').hexdigest()
+        self.assertEqual(first.file.name, f'blobs/{digest[:2]}/{digest[2:4]}/{digest}.pdf')
+        self.assertEqual(second.file.name, first.file.name)
+        self.assertEqual(Blob.objects.get().refcount, 2)
+        with first.file.open() as f:
+            self.assertEqual(f.read(), b'same bytes')
+
+    def test_save_many_counts_references_in_batch(self):
+        self.attach(b'already stored')
+
+        names = content_storage.save_many([
+            ('copy.pdf', ContentFile(b'already stored')),
+            ('b.txt', ContentFile(b'new')),
+            ('c.txt', ContentFile(b'new')),
+        ])
+
+        self.assertEqual(names[1], names[2])
+        counts = dict(Blob.objects.values_list('name', 'refcount'))
+        self.assertEqual(counts, {names[0]: 2, names[1]: 2})
+        self.assertTrue(all(content_storage.exists(name) for name in names))
+
+    def test_delete_removes_file_with_last_reference(self):
+        name = self.attach(b'payload').file.name
+        content_storage.save('other.pdf', ContentFile(b'payload'))
+
+        content_storage.delete(name)
+        self.assertTrue(content_storage.exists(name))
+
+        content_storage.delete(name)
+        self.assertFalse(content_storage.exists(name))
+        self.assertFalse(Blob.objects.exists())
+
+    def test_gc_reclaims_files_of_deleted_rows(self):
+        kept = self.attach(b'kept').file.name
+        dropped = self.attach(b'dropped').file.name
+        self.attach(b'kept')
+        Attachment.objects.filter(file=dropped).delete()
+
+        report = gc.collect_blobs(grace=-1, dry_run=True)
+        self.assertEqual((report.files, report.bytes), (1, len(b'dropped')))
+        self.assertTrue(content_storage.exists(dropped))
+
+        gc.collect_blobs(grace=-1)
+        self.assertFalse(content_storage.exists(dropped))
+        self.assertTrue(content_storage.exists(kept))
+        self.assertEqual(Blob.objects.get(name=kept).refcount, 2)
+
+    def test_gc_walks_blobs_in_batches(self):
+        kept = [self.attach(b'kept %d' % i).file.name for i in range(3)]
+        dropped = [self.attach(b'dropped %d' % i).file.name for i in range(4)]
+        Attachment.objects.filter(file__in=dropped).delete()
+        Blob.objects.filter(name=kept[0]).update(refcount=7)
+
+        with mock.patch.object(gc, 'BATCH_SIZE', 2):
+            report = gc.collect_blobs(grace=-1)
+
+        self.assertEqual(report.files, 4)
+        self.assertEqual(report.recounted, 1)
+        self.assertEqual(set(Blob.objects.values_list('name', 'refcount')), {(name, 1) for name in kept})
+        self.assertFalse(any(content_storage.exists(name) for name in dropped))
+
+    def test_gc_respects_grace_period(self):
+        name = self.attach(b'fresh').file.name
+        Attachment.objects.all().delete()
+
+        gc.collect_blobs(grace=3600)
+
+        self.assertTrue(content_storage.exists(name))
+
+    def test_gc_removes_untracked_blob_files(self):
+        name = self.attach(b'untracked').file.name
+        Attachment.objects.all().delete()
+        Blob.objects.all().delete()
+        past = os.stat(content_storage.path(name)).st_mtime - 10
+
+        os.utime(content_storage.path(name), (past, past))
+        gc.collect_blobs(grace=5)
+
+        self.assertFalse(content_storage.exists(name))
+
+    def test_gc_media_command_adopts_legacy_duplicates(self):
+        profile = UserProfile.objects.create(user=self.user)
+        os.makedirs(os.path.join(self.media_root, 'avatars'), exist_ok=True)
+        for name in ('avatars/cat.png', 'avatars/cat_KNe55zK.png'):
+            with open(os.path.join(self.media_root, name), 'wb') as f:
+                f.write(b'cat')
+        other = UserProfile.objects.create(user=User.objects.create_user(username='other'))
+        UserProfile.objects.filter(pk=profile.pk).update(avatar='avatars/cat.png')
+        UserProfile.objects.filter(pk=other.pk).update(avatar='avatars/cat_KNe55zK.png')
+
+        out = StringIO()
+        call_command('gc_media', '--adopt-legacy', stdout=out)
+
+        names = set(UserProfile.objects.values_list('avatar', flat=True))
+        self.assertEqual(len(names), 1)
+        self.assertTrue(names.pop().startswith('blobs/'))
+        self.assertIn('Перенесено старих файлів: 2', out.getvalue())
+
+
+class OrphanCollectorTest(TestCase):
+    """Тести для прибирання файлів поза blobs/"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media_settings = override_settings(
+            MEDIA_ROOT=self.media_root, MEDIA_GC_PROTECTED=['avatars/default_*']
+        )
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+
+    def write(self, name, content=b'data', age=7200):
+        path = os.path.join(self.media_root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(content)
+        past = os.stat(path).st_mtime - age
+        os.utime(path, (past, past))
+        return path
+
+    def test_unreferenced_files_are_collected(self):
+        used = self.write('avatars/used.png')
+        replaced = self.write('avatars/replaced.png', b'old avatar')
+        default = self.write('avatars/default_avatar.png')
+        fresh = self.write('portfolio/files/uploading.pdf', age=0)
+        screenshot = self.write('portfolio/screenshots/shot.png', b'screenshot')
+        profile = UserProfile.objects.create(user=self.user)
+        UserProfile.objects.filter(pk=profile.pk).update(avatar='avatars/used.png')
+        portfolio = Portfolio.objects.create(owner=self.user, title='Проєкт')
+        portfolio.screenshots.create(image='portfolio/screenshots/shot.png')
+
+        # Каскад видаляє рядок Screenshot, а файл лишається на диску
+        portfolio.delete()
+        report = gc.collect_orphans(grace=3600, dry_run=True, batch_size=2)
+
+        self.assertEqual(report.files, 2)
+        self.assertEqual(report.bytes, len(b'old avatar') + len(b'screenshot'))
+        self.assertTrue(os.path.exists(replaced))
+
+        gc.collect_orphans(grace=3600, batch_size=2)
+
+        self.assertFalse(os.path.exists(replaced))
+        self.assertFalse(os.path.exists(screenshot))
+        for path in (used, default, fresh):
+            self.assertTrue(os.path.exists(path))
+
+    def test_blobs_are_left_to_blob_collector(self):
+        name = content_storage.save('a.pdf', ContentFile(b'blob'))
+        path = content_storage.path(name)
+        os.utime(path, (0, 0))
+
+        gc.collect_orphans(grace=3600)
+
+        self.assertTrue(os.path.exists(path))
+
+    def test_command_reports_reclaimable_bytes(self):
+        self.write('Photos/scheme_x3MupGw.png', b'x' * 2048)
+
+        out = StringIO()
+        call_command('gc_media', '--dry-run', stdout=out)
+
+        self.assertIn('Можна звільнити', out.getvalue())
+        self.assertIn('(файлів: 1)', out.getvalue())
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, 'Photos/scheme_x3MupGw.png')))
+
+
+class ServeMediaTest(TestCase):
+    """Тести для віддачі медіафайлів з Range і умовними запитами"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media_settings = override_settings(MEDIA_ROOT=self.media_root)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.content = bytes(range(256)) * 40
+        os.makedirs(os.path.join(self.media_root, 'gallery'))
+        with open(os.path.join(self.media_root, 'gallery', 'track.mp3'), 'wb') as f:
+            f.write(self.content)
+        self.url = '/media/gallery/track.mp3'
+
+    def test_full_response(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['Content-Length'], str(len(self.content)))
+        self.assertEqual(response['Content-Type'], 'audio/mpeg')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('ETag', response)
+
+    def test_range_request(self):
+        response = self.client.get(self.url, headers={'Range': 'bytes=100-199'})
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), self.content[100:200])
+        self.assertEqual(response['Content-Length'], '100')
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(self.content)}')
+
+    def test_open_and_suffix_ranges(self):
+        size = len(self.content)
+        tail = self.client.get(self.url, headers={'Range': f'bytes={size - 10}-'})
+        suffix = self.client.get(self.url, headers={'Range': 'bytes=-10'})
+
+        self.assertEqual(b''.join(tail.streaming_content), self.content[-10:])
+        self.assertEqual(b''.join(suffix.streaming_content), self.content[-10:])
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get(self.url, headers={'Range': 'bytes=999999-'})
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.content)}')
+
+    def test_conditional_request(self):
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_stale_if_range_returns_whole_file(self):
+        response = self.client.get(self.url, headers={'Range': 'bytes=0-9', 'If-Range': '"old"'})
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_path_traversal_is_rejected(self):
+        response = self.client.get('/media/../settings.py')
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_blobs_are_cached_forever(self):
+        name = content_storage.save('clip.mp4', ContentFile(b'video'))
+
+        response = self.client.get(content_storage.url(name))
+
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['ETag'], '"%s"' % hashlib.sha256(b'video').hexdigest())
+
+    def test_active_content_is_downloaded(self):
+        for name, body in (('page.html', b'<script>alert(1)</script>'), ('icon.svg', b'<svg onload="alert(1)"/>')):
+            with open(os.path.join(self.media_root, 'gallery', name), 'wb') as f:
+                f.write(body)
+
+            response = self.client.get(f'/media/gallery/{name}')
+
+            self.assertEqual(response['Content-Disposition'], f'attachment; filename="{name}"')
+            self.assertEqual(response['X-Content-Type-Options'], 'nosniff')
+
+    def test_media_types_shown_inline(self):
+        response = self.client.get(self.url)
+
+        self.assertFalse(response.get('Content-Disposition', '').startswith('attachment'))
+        self.assertEqual(response['X-Content-Type-Options'], 'nosniff')
+
+    @override_settings(MEDIA_SERVE_OFFLOAD='x-accel-redirect')
+    def test_accel_redirect_offload(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/gallery/track.mp3')
+        self.assertEqual(response.content, b'')
+
+
+class ChunkedUploadTest(TestCase):
+    """Тести для поетапних завантажень і прикріплення за токеном"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media_settings = override_settings(MEDIA_ROOT=self.media_root, MEDIA_UPLOAD_CHUNK_SIZE=1024)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.login(username='testuser', password='testpass123')
+        self.content = os.urandom(2500)
+
+    def start(self, **extra):
+        data = {'filename': 'lecture.mp4', 'size': len(self.content), **extra}
+        response = self.client.post(reverse('media:upload-create'), data, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        return response.json()['token']
+
+    def put(self, token, offset, chunk, checksum=None):
+        headers = {'Upload-Offset': str(offset)}
+        headers['X-Chunk-SHA256'] = hashlib.sha256(chunk).hexdigest() if checksum is None else checksum
+        return self.client.put(
+            reverse('media:upload-detail', args=[token]), chunk,
+            content_type='application/octet-stream', headers=headers
+        )
+
+    def upload_all(self, token):
+        for offset in range(0, len(self.content), 1024):
+            response = self.put(token, offset, self.content[offset:offset + 1024])
+            self.assertEqual(response.status_code, 200)
+        return self.client.post(reverse('media:upload-finalize', args=[token]))
+
+    def test_upload_in_chunks(self):
+        token = self.start()
+
+        response = self.upload_all(token)
+
+        self.assertEqual(response.status_code, 200)
+        upload = Upload.objects.get(token=token)
+        self.assertEqual(upload.status, Upload.COMPLETE)
+        with upload.file.open() as f:
+            self.assertEqual(f.read(), self.content)
+        digest = hashlib.sha256(self.content).hexdigest()
+        self.assertEqual(upload.file.name, f'blobs/{digest[:2]}/{digest[2:4]}/{digest}.mp4')
+
+    def test_resume_after_disconnect(self):
+        token = self.start()
+        self.put(token, 0, self.content[:1024])
+
+        state = self.client.get(reverse('media:upload-detail', args=[token])).json()
+        stale = self.put(token, 0, self.content[:1024])
+
+        self.assertEqual(state['offset'], 1024)
+        self.assertEqual(stale.status_code, 409)
+        self.assertEqual(stale.json()['offset'], 1024)
+        self.assertEqual(self.put(token, 1024, self.content[1024:2048]).status_code, 200)
+
+    def test_stale_upload_does_not_touch_accepted_chunk(self):
+        token = self.start()
+        stale = Upload.objects.get(token=token)
+        self.put(token, 0, self.content[:1024])
+
+        # Паралельний запит прочитав Upload до того, як перший зсунув лічильник
+        with self.assertRaises(uploads.OffsetMismatch) as error:
+            uploads.write_chunk(stale, 0, BytesIO(b'x' * 1024), 1024)
+
+        self.assertEqual(error.exception.offset, 1024)
+        with open(uploads.part_path(stale), 'rb') as part:
+            self.assertEqual(part.read(), self.content[:1024])
+
+    def test_bad_chunk_checksum_is_rolled_back(self):
+        token = self.start()
+
+        response = self.put(token, 0, self.content[:1024], checksum='0' * 64)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Upload.objects.get(token=token).received, 0)
+        self.assertEqual(os.path.getsize(uploads.part_path(Upload.objects.get(token=token))), 0)
+
+    def test_oversized_chunk_is_rejected(self):
+        token = self.start()
+
+        response = self.put(token, 0, self.content[:2000])
+
+        self.assertEqual(response.status_code, 413)
+
+    def test_file_checksum_is_verified(self):
+        token = self.start(sha256='f' * 64)
+
+        response = self.upload_all(token)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Upload.objects.exists())
+        self.assertFalse(Blob.objects.exists())
+
+    def test_other_users_upload_is_hidden(self):
+        token = self.start()
+        User.objects.create_user(username='other', password='pass123')
+        self.client.login(username='other', password='pass123')
+
+        response = self.client.get(reverse('media:upload-detail', args=[token]))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_gallery_form_attaches_upload_by_token(self):
+        token = self.start()
+        self.upload_all(token)
+        name = Upload.objects.get(token=token).file.name
+
+        response = self.client.post(reverse('add_file'), {
+            'title': 'Лекція', 'description': '', 'upload_token': token
+        })
+
+        self.assertEqual(response.status_code, 302)
+        item = Mediafiles.objects.get()
+        self.assertEqual(item.media_file.name, name)
+        self.assertEqual(item.media_type, 'video')
+        self.assertFalse(Upload.objects.exists())
+        self.assertEqual(Blob.objects.get(name=name).refcount, 1)
+
+    def test_gallery_form_requires_file_or_token(self):
+        response = self.client.post(reverse('add_file'), {'title': 'Без файлу', 'description': ''})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('media_file', response.context['form'].errors)
+
+    def test_expired_uploads_are_collected(self):
+        token = self.start()
+        self.put(token, 0, self.content[:1024])
+        Upload.objects.update(updated_at=timezone.now() - timedelta(days=2))
+
+        report = gc.collect_uploads(expiry=60 * 60)
+
+        self.assertEqual(report.files, 1)
+        self.assertFalse(Upload.objects.exists())
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'blobs', 'uploads')), [])
@@ -0,0 +1,165 @@
+"""Поетапні (chunked) завантаження з відновленням після обриву.
+
+Клієнт створює завантаження (start_upload), шле шматки PUT-запитами з
+поточним зсувом і SHA-256 шматка (write_chunk), а потім завершує його
+(finalize). Шматки пишуться одразу у файл у каталозі сховища, тож ні
+пам'ять, ні тимчасові файли Django не ростуть разом з розміром файлу.
+Після обриву клієнт питає поточний зсув (describe) і продовжує з нього.
+"""
+import hashlib
+import os
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Upload
+from .storage import UPLOADS_DIR, content_storage
+
+READ_BLOCK = 64 * 1024
+
+
+class UploadError(Exception):
+    """Помилка завантаження; status - HTTP-статус відповіді API"""
+    status = 400
+
+
+class UploadTooLarge(UploadError):
+    status = 413
+
+
+class OffsetMismatch(UploadError):
+    status = 409
+
+    def __init__(self, message, offset):
+        super().__init__(message)
+        self.offset = offset
+
+
+class ChecksumMismatch(UploadError):
+    pass
+
+
+def max_size():
+    return getattr(settings, 'MEDIA_UPLOAD_MAX_SIZE', 2 * 1024 ** 3)
+
+
+def chunk_size():
+    return getattr(settings, 'MEDIA_UPLOAD_CHUNK_SIZE', 8 * 1024 ** 2)
+
+
+def part_path(upload):
+    return content_storage.path(os.path.join(UPLOADS_DIR, f'{upload.token}.part'))
+
+
+def describe(upload):
+    data = {
+        'token': str(upload.token),
+        'filename': upload.filename,
+        'size': upload.size,
+        'offset': upload.received,
+        'complete': upload.status == Upload.COMPLETE,
+        'chunk_size': chunk_size(),
+    }
+    if upload.file:
+        data['url'] = upload.file.url
+    return data
+
+
+def start_upload(owner, filename, size, sha256=''):
+    filename = os.path.basename(filename or '').strip()
+    if not filename:
+        raise UploadError("Не вказано ім'я файлу.")
+    if size < 0:
+        raise UploadError("Некоректний розмір файлу.")
+    if size > max_size():
+        raise UploadTooLarge("Файл завеликий.")
+    sha256 = (sha256 or '').lower()
+    if sha256 and (len(sha256) != 64 or any(c not in '0123456789abcdef' for c in sha256)):
+        raise UploadError("Некоректна контрольна сума файлу.")
+
+    upload = Upload.objects.create(owner=owner, filename=filename[:255], size=size, sha256=sha256)
+    path = part_path(upload)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, 'wb').close()
+    return upload
+
+
+def write_chunk(upload, offset, stream, length, checksum=''):
+    """Дописує шматок з stream (file-like, напр. request) у позицію offset.
+
+    Шматок приймається, лише якщо offset збігається з уже отриманим
+    обсягом; інакше OffsetMismatch повідомляє клієнту, звідки продовжити.
+    Якщо контрольна сума не збіглась, записане обрізається назад.
+    Перевірка зсуву, запис і зсув лічильника виконуються під блокуванням
+    рядка Upload, тож паралельні запити з тим самим зсувом не пишуть у
+    файл одночасно.
+    """
+    if length <= 0:
+        raise UploadError("Порожній шматок.")
+
+    with transaction.atomic():
+        locked = Upload.objects.select_for_update().get(pk=upload.pk)
+        if locked.status != Upload.PENDING:
+            raise UploadError("Завантаження вже завершено.")
+        if offset != locked.received:
+            raise OffsetMismatch("Неправильний зсув шматка.", locked.received)
+        if length > chunk_size() or offset + length > locked.size:
+            raise UploadTooLarge("Шматок завеликий.")
+
+        hasher = hashlib.sha256()
+        written = 0
+        with open(part_path(locked), 'r+b') as part:
+            part.seek(offset)
+            while written < length:
+                block = stream.read(min(READ_BLOCK, length - written))
+                if not block:
+                    break
+                hasher.update(block)
+                part.write(block)
+                written += len(block)
+            if written != length or (checksum and hasher.hexdigest() != checksum.lower()):
+                part.truncate(offset)
+                if written != length:
+                    raise UploadError("Шматок отримано не повністю.")
+                raise ChecksumMismatch("Контрольна сума шматка не збігається.")
+
+        # Умова на received - для БД без блокування рядків (SQLite)
+        if not Upload.objects.filter(pk=upload.pk, received=offset).update(received=offset + length):
+            upload.refresh_from_db()
+            raise OffsetMismatch("Шматок уже отримано.", upload.received)
+    upload.received = offset + length
+    return upload
+
+
+def finalize(upload):
+    """Переносить зібраний файл у сховище за вмістом"""
+    if upload.status == Upload.COMPLETE:
+        return upload
+    if upload.received != upload.size:
+        raise OffsetMismatch("Файл отримано не повністю.", upload.received)
+
+    name, digest = content_storage.adopt(part_path(upload), upload.filename)
+    if upload.sha256 and digest != upload.sha256:
+        content_storage.delete(name)
+        upload.delete()
+        raise ChecksumMismatch("Контрольна сума файлу не збігається, завантажте його заново.")
+
+    upload.file = name
+    upload.status = Upload.COMPLETE
+    upload.save(update_fields=['file', 'status', 'updated_at'])
+    return upload
+
+
+def cancel(upload):
+    if upload.status == Upload.PENDING:
+        path = part_path(upload)
+        if os.path.exists(path):
+            os.remove(path)
+    elif upload.file:
+        content_storage.delete(upload.file.name)
+    upload.delete()
+
+
+def attach(upload):
+    """Прикріплення до моделі: посилання на файл переходить до її поля, рядок Upload більше не потрібен"""
+    Upload.objects.filter(pk=upload.pk).delete()
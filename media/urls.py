@@ -0,0 +1,11 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'media'
+
+urlpatterns = [
+    path('', views.UploadCreateView.as_view(), name='upload-create'),
+    path('<uuid:token>/', views.UploadDetailView.as_view(), name='upload-detail'),
+    path('<uuid:token>/finalize/', views.UploadFinalizeView.as_view(), name='upload-finalize'),
+]
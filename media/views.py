@@ -0,0 +1,284 @@
+"""Віддача файлів з MEDIA_ROOT з підтримкою HTTP Range.
+
+Замінює django.conf.urls.static.static(), який працює лише з DEBUG=True,
+завжди віддає файл цілком і не відповідає 206 на Range. Тут:
+
+* Range: bytes=... -> 206 з потрібним шматком; аудіо й відео можна
+  перемотувати без повторного завантаження вже отриманих байтів;
+* ETag/Last-Modified -> 304 на умовні запити (для blobs/ ETag - це sha256,
+  а файл кешується браузером назавжди);
+* FileResponse віддає справжній файловий об'єкт, тому WSGI-сервер з
+  wsgi.file_wrapper (gunicorn) шле його через sendfile() без копіювання;
+* MEDIA_SERVE_OFFLOAD = 'x-accel-redirect' (nginx) або 'x-sendfile'
+  (Apache/lighttpd) - Django лише перевіряє шлях, а файл віддає вебсервер.
+
+Файли завантажують користувачі, а віддаються вони з домену порталу, тож
+показуються у браузері лише безпечні типи (INLINE_TYPES: растрові
+зображення, аудіо, відео). Усе інше (HTML, SVG, PDF...) віддається з
+Content-Disposition: attachment, а nosniff не дає браузеру вгадати тип.
+"""
+import json
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+from django.views import View
+from django.views.decorators.http import require_safe
+
+from . import uploads
+from .models import Upload
+from .storage import is_blob, is_internal
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+# Вміст blobs/ ніколи не змінюється під тим самим іменем
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+# Типи, які можна показувати у браузері; SVG сюди не входить - він може містити скрипти
+INLINE_TYPES = {
+    'image/jpeg', 'image/png', 'image/gif', 'image/webp', 'image/avif', 'image/bmp',
+}
+INLINE_TYPE_PREFIXES = ('audio/', 'video/')
+
+
+def is_inline_type(content_type, encoding=None):
+    if encoding:
+        return False
+    return content_type in INLINE_TYPES or content_type.startswith(INLINE_TYPE_PREFIXES)
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header, size):
+    """Діапазон (start, end) включно з заголовка Range або None, якщо його треба ігнорувати.
+
+    Підтримується один діапазон; для кількох (bytes=0-1,5-6) віддається
+    весь файл, що дозволяє RFC 9110.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise RangeNotSatisfiable
+        return max(size - suffix, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if last and end < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    return start, min(end, size - 1)
+
+
+class RangeFile:
+    """Файл, з якого читається не більше length байтів від поточної позиції.
+
+    fileno() лишається доступним, тож gunicorn і тут використовує sendfile()
+    (він починає з поточної позиції файлу й обмежується Content-Length).
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def _etag(name, stat):
+    if is_blob(name):
+        return '"%s"' % os.path.splitext(os.path.basename(name))[0]
+    return '"%x-%x"' % (stat.st_size, stat.st_mtime_ns)
+
+
+def _if_range_matches(request, etag, mtime):
+    """If-Range: діапазон діє, лише якщо клієнт має ту саму версію файлу"""
+    value = request.headers.get('If-Range')
+    if not value:
+        return True
+    if value.startswith('"') or value.startswith('W/'):
+        return value == etag
+    return parse_http_date_safe(value) == mtime
+
+
+def _offload_response(path, name, content_type):
+    mode = getattr(settings, 'MEDIA_SERVE_OFFLOAD', None)
+    if mode == 'x-accel-redirect':
+        prefix = getattr(settings, 'MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(name)
+        return response
+    if mode == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+        return response
+    return None
+
+
+@require_safe
+def serve_media(request, path):
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    try:
+        stat = os.stat(fullpath)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404
+    if not os.path.isfile(fullpath):
+        raise Http404
+
+    name = path.replace('\\', '/')
+    if is_internal(name):
+        raise Http404
+    mtime = int(stat.st_mtime)
+    etag = _etag(name, stat)
+    not_modified = get_conditional_response(request, etag=etag, last_modified=mtime)
+    if not_modified is not None:
+        return not_modified
+
+    content_type, encoding = mimetypes.guess_type(fullpath)
+    content_type = content_type or 'application/octet-stream'
+
+    response = _offload_response(fullpath, name, content_type)
+    if response is None:
+        response = _file_response(request, fullpath, stat.st_size, etag, mtime, content_type)
+
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    if not is_inline_type(content_type, encoding):
+        response.headers['Content-Disposition'] = content_disposition_header(True, os.path.basename(name))
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = http_date(mtime)
+    if is_blob(name):
+        response.headers['Cache-Control'] = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    else:
+        response.headers['Cache-Control'] = f"public, max-age={getattr(settings, 'MEDIA_CACHE_MAX_AGE', 60 * 60)}"
+    return response
+
+
+def _file_response(request, fullpath, size, etag, mtime, content_type):
+    byte_range = None
+    header = request.headers.get('Range')
+    if header and _if_range_matches(request, etag, mtime):
+        try:
+            byte_range = parse_range(header, size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response.headers['Content-Range'] = f'bytes */{size}'
+            response.headers['Accept-Ranges'] = 'bytes'
+            return response
+
+    if request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type)
+        response.headers['Content-Length'] = size
+    elif byte_range is None:
+        response = FileResponse(open(fullpath, 'rb'), content_type=content_type)
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = FileResponse(
+            RangeFile(open(fullpath, 'rb'), start, length), content_type=content_type, status=206
+        )
+        response.headers['Content-Length'] = length
+        response.headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response.headers['Accept-Ranges'] = 'bytes'
+    return response
+
+
+# Поетапні завантаження (media.uploads): JSON API для static/js/chunked_upload.js
+
+def _error(exc):
+    data = {'error': str(exc)}
+    if isinstance(exc, uploads.OffsetMismatch):
+        data['offset'] = exc.offset
+    return JsonResponse(data, status=exc.status)
+
+
+class UploadCreateView(LoginRequiredMixin, View):
+    raise_exception = True
+
+    def post(self, request):
+        if request.content_type == 'application/json':
+            try:
+                data = json.loads(request.body or b'{}')
+            except ValueError:
+                return JsonResponse({'error': 'Некоректний JSON.'}, status=400)
+        else:
+            data = request.POST
+        try:
+            size = int(data.get('size'))
+        except (TypeError, ValueError):
+            return JsonResponse({'error': 'Не вказано розмір файлу.'}, status=400)
+        try:
+            upload = uploads.start_upload(request.user, data.get('filename'), size, data.get('sha256', ''))
+        except uploads.UploadError as exc:
+            return _error(exc)
+        return JsonResponse(uploads.describe(upload), status=201)
+
+
+class UploadDetailView(LoginRequiredMixin, View):
+    """GET - стан (звідки продовжувати), PUT - наступний шматок, DELETE - скасування"""
+    raise_exception = True
+
+    def get_upload(self):
+        return get_object_or_404(Upload, token=self.kwargs['token'], owner=self.request.user)
+
+    def get(self, request, token):
+        return JsonResponse(uploads.describe(self.get_upload()))
+
+    def put(self, request, token):
+        upload = self.get_upload()
+        try:
+            offset = int(request.headers.get('Upload-Offset', request.GET.get('offset', '')))
+            length = int(request.headers.get('Content-Length', ''))
+        except ValueError:
+            return JsonResponse({'error': 'Потрібні заголовки Upload-Offset і Content-Length.'}, status=400)
+        try:
+            # Тіло читається потоком з request, а не через request.body
+            uploads.write_chunk(upload, offset, request, length, request.headers.get('X-Chunk-SHA256', ''))
+        except uploads.UploadError as exc:
+            return _error(exc)
+        return JsonResponse(uploads.describe(upload))
+
+    def delete(self, request, token):
+        uploads.cancel(self.get_upload())
+        return HttpResponse(status=204)
+
+
+class UploadFinalizeView(UploadDetailView):
+    http_method_names = ['post']
+
+    def post(self, request, token):
+        try:
+            upload = uploads.finalize(self.get_upload())
+        except uploads.UploadError as exc:
+            return _error(exc)
+        return JsonResponse(uploads.describe(upload))
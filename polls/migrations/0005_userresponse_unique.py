@@ -0,0 +1,35 @@
+from django.db import migrations, models
+from django.db.models import Count, F, Min, Value
+from django.db.models.functions import Greatest
+
+
+def deduplicate(apps, schema_editor):
+    Answer = apps.get_model('polls', 'Answer')
+    UserResponse = apps.get_model('polls', 'UserResponse')
+
+    # Залишаємо першу відповідь користувача на кожне питання, голоси повторних знімаємо
+    duplicates = UserResponse.objects.order_by().values('user', 'question').annotate(
+        total=Count('pk'), first_id=Min('pk')
+    ).filter(total__gt=1)
+    for row in duplicates:
+        extra = UserResponse.objects.filter(user=row['user'], question=row['question']).exclude(
+            pk=row['first_id']
+        )
+        for answer_id in extra.values_list('selected_answer', flat=True):
+            Answer.objects.filter(pk=answer_id).update(votes=Greatest(F('votes') - 1, Value(0)))
+        extra.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0004_userresponse'),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='userresponse',
+            constraint=models.UniqueConstraint(fields=('user', 'question'), name='unique_user_question_response'),
+        ),
+    ]
@@ -30,5 +30,10 @@ class UserResponse(models.Model):
     question = models.ForeignKey(Question, on_delete=models.CASCADE)
     selected_answer = models.ForeignKey(Answer, on_delete=models.CASCADE)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'question'], name='unique_user_question_response'),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.question.question_text} - {self.selected_answer.answer_text}"
\ No newline at end of file
@@ -0,0 +1,110 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Prefetch
+
+from .models import Answer, Question, UserResponse
+
+
+class PollSubmissionError(Exception):
+    """Відповіді не можуть бути прийняті"""
+
+
+def poll_tree_cache_key(poll_id):
+    return f'poll_tree:{poll_id}'
+
+
+def invalidate_poll_tree(poll_id):
+    """Скидає закешовану структуру опитування (викликається з polls/signals.py)"""
+    cache.delete(poll_tree_cache_key(poll_id))
+
+
+def poll_tree(poll):
+    """Структура опитування (питання з варіантами) у вигляді словника.
+
+    Питання і відповіді завантажуються двома запитами з явним порядком за id,
+    а готовий словник кешується на POLL_TREE_CACHE_TIMEOUT секунд, тому
+    повторне відображення опитування не звертається до БД взагалі.
+    """
+    timeout = getattr(settings, 'POLL_TREE_CACHE_TIMEOUT', 0)
+    key = poll_tree_cache_key(poll.pk)
+    if timeout:
+        tree = cache.get(key)
+        if tree is not None:
+            return tree
+
+    questions = Question.objects.filter(poll=poll).order_by('pk').prefetch_related(
+        Prefetch('answers', queryset=Answer.objects.order_by('pk'))
+    )
+    tree = {
+        'id': poll.pk,
+        'title': poll.title,
+        'description': poll.description,
+        'questions': [
+            {
+                'id': question.pk,
+                'text': question.question_text,
+                'answers': [
+                    {'id': answer.pk, 'text': answer.answer_text}
+                    for answer in question.answers.all()
+                ],
+            }
+            for question in questions
+        ],
+    }
+
+    if timeout:
+        cache.set(key, tree, timeout)
+    return tree
+
+
+def selected_answers(data):
+    """Витягує пари (question_id, answer_id) з полів форми question_<id>"""
+    selected = {}
+    for key, value in data.items():
+        if not key.startswith('question_'):
+            continue
+        try:
+            selected[int(key[len('question_'):])] = int(value)
+        except ValueError:
+            raise PollSubmissionError("Некоректна відповідь.")
+    return selected
+
+
+def submit_poll(user, poll, data):
+    """Зберігає відповіді користувача на опитування за сталу кількість запитів.
+
+    Всі обрані відповіді перевіряються одним запитом, лічильники Answer.votes
+    збільшуються одним UPDATE через F(), а UserResponse записуються одним
+    bulk_create - усе в одній транзакції. Повертає кількість збережених відповідей.
+    Повторну відповідь відсікає обмеження unique_user_question_response: запит,
+    що програв гонку, отримує IntegrityError і вся транзакція відкочується.
+    """
+    selected = selected_answers(data)
+    if not selected:
+        return 0
+
+    with transaction.atomic():
+        if UserResponse.objects.filter(user=user, question__poll=poll).exists():
+            raise PollSubmissionError("Ви вже відповіли на це опитування.")
+
+        answers = dict(
+            Answer.objects.filter(
+                pk__in=selected.values(),
+                question__poll=poll
+            ).values_list('pk', 'question_id')
+        )
+        for question_id, answer_id in selected.items():
+            if answers.get(answer_id) != question_id:
+                raise PollSubmissionError("Некоректна відповідь.")
+
+        try:
+            with transaction.atomic():
+                UserResponse.objects.bulk_create([
+                    UserResponse(user=user, question_id=question_id, selected_answer_id=answer_id)
+                    for question_id, answer_id in selected.items()
+                ])
+        except IntegrityError:
+            raise PollSubmissionError("Ви вже відповіли на це опитування.")
+        Answer.objects.filter(pk__in=answers).update(votes=F('votes') + 1)
+    return len(selected)
@@ -0,0 +1,42 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Poll, Question, Answer
+from .services import invalidate_poll_tree
+
+
+def _cascaded_from(origin, *models):
+    """Чи видалення почалося з об'єкта (або QuerySet) однієї з моделей"""
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return origin is not None and model in models
+
+
+@receiver(post_save, sender=Poll)
+@receiver(post_delete, sender=Poll)
+def reset_tree_on_poll_change(sender, instance, **kwargs):
+    invalidate_poll_tree(instance.pk)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def reset_tree_on_question_change(sender, instance, origin=None, **kwargs):
+    # Каскад від опитування: дерево скидає reset_tree_on_poll_change
+    if _cascaded_from(origin, Poll):
+        return
+    invalidate_poll_tree(instance.poll_id)
+
+
+@receiver(post_save, sender=Answer)
+@receiver(post_delete, sender=Answer)
+def reset_tree_on_answer_change(sender, instance, origin=None, **kwargs):
+    # Каскад від опитування чи питання: дерево один раз скидає їхній обробник
+    if _cascaded_from(origin, Poll, Question):
+        return
+    if Answer.question.is_cached(instance):
+        poll_id = instance.question.poll_id
+    else:
+        # Лише poll_id, без завантаження всього питання
+        poll_id = Question.objects.filter(pk=instance.question_id).values_list('poll_id', flat=True).first()
+    if poll_id is not None:
+        invalidate_poll_tree(poll_id)
@@ -1,3 +1,140 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.query import QuerySet
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .models import Poll, Question, Answer, UserResponse
+from .services import PollSubmissionError, poll_tree, submit_poll
+
+
+class PollSubmissionTest(TestCase):
+    """Тести для збереження відповідей на опитування"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.poll = Poll.objects.create(title='Опитування', description='Опис')
+        self.questions = []
+        for i in range(20):
+            question = Question.objects.create(poll=self.poll, question_text=f'Питання {i}')
+            Answer.objects.create(question=question, answer_text='Так')
+            Answer.objects.create(question=question, answer_text='Ні')
+            self.questions.append(question)
+
+    def form_data(self):
+        return {
+            f'question_{q.pk}': q.answers.order_by('pk').first().pk
+            for q in self.questions
+        }
+
+    def test_submission_query_count_is_constant(self):
+        data = self.form_data()
+        # SAVEPOINT, exists, перевірка відповідей, SAVEPOINT, bulk INSERT, RELEASE, UPDATE, RELEASE
+        with self.assertNumQueries(8):
+            saved = submit_poll(self.user, self.poll, data)
+
+        self.assertEqual(saved, 20)
+        self.assertEqual(UserResponse.objects.filter(user=self.user).count(), 20)
+        self.assertEqual(
+            list(Answer.objects.filter(answer_text='Так').values_list('votes', flat=True).distinct()),
+            [1]
+        )
+
+    def test_second_submission_rejected(self):
+        submit_poll(self.user, self.poll, self.form_data())
+        with self.assertRaises(PollSubmissionError):
+            submit_poll(self.user, self.poll, self.form_data())
+        self.assertEqual(UserResponse.objects.count(), 20)
+
+    def test_concurrent_duplicate_rejected_by_constraint(self):
+        submit_poll(self.user, self.poll, self.form_data())
+        # Паралельний запит, що пройшов перевірку exists() до коміту першого
+        with mock.patch.object(QuerySet, 'exists', return_value=False):
+            with self.assertRaises(PollSubmissionError):
+                submit_poll(self.user, self.poll, self.form_data())
+
+        self.assertEqual(UserResponse.objects.count(), 20)
+        self.assertEqual(set(Answer.objects.filter(answer_text='Так').values_list('votes', flat=True)), {1})
+
+    def test_answer_from_other_question_rejected(self):
+        data = self.form_data()
+        first, second = self.questions[:2]
+        data[f'question_{first.pk}'] = second.answers.first().pk
+
+        with self.assertRaises(PollSubmissionError):
+            submit_poll(self.user, self.poll, data)
+        self.assertFalse(UserResponse.objects.exists())
+        self.assertFalse(Answer.objects.filter(votes__gt=0).exists())
+
+    def test_view_saves_answers(self):
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.post(
+            reverse('polls:poll-detail', kwargs={'pk': self.poll.pk}),
+            self.form_data()
+        )
+
+        self.assertRedirects(response, reverse('polls:poll-list'))
+        self.assertEqual(UserResponse.objects.count(), 20)
+
+
+@override_settings(POLL_TREE_CACHE_TIMEOUT=300)
+class PollTreeTest(TestCase):
+    """Тести для кешованої структури опитування"""
+
+    def setUp(self):
+        cache.clear()
+        self.poll = Poll.objects.create(title='Опитування', description='Опис')
+        for i in range(10):
+            question = Question.objects.create(poll=self.poll, question_text=f'Питання {i}')
+            for text in ['Так', 'Ні', 'Не знаю']:
+                Answer.objects.create(question=question, answer_text=text)
+
+    def test_tree_built_with_two_queries_and_cached(self):
+        with self.assertNumQueries(2):
+            tree = poll_tree(self.poll)
+        with self.assertNumQueries(0):
+            self.assertEqual(poll_tree(self.poll), tree)
+
+        self.assertEqual([q['text'] for q in tree['questions']], [f'Питання {i}' for i in range(10)])
+        self.assertEqual([a['text'] for a in tree['questions'][0]['answers']], ['Так', 'Ні', 'Не знаю'])
+
+    def test_answer_change_invalidates_tree(self):
+        poll_tree(self.poll)
+        question = self.poll.questions.first()
+        Answer.objects.create(question=question, answer_text='Інше')
+
+        answers = poll_tree(self.poll)['questions'][0]['answers']
+        self.assertEqual(answers[-1]['text'], 'Інше')
+
+    def test_cascade_resets_tree_once(self):
+        poll_id = self.poll.pk
+        with mock.patch('polls.signals.invalidate_poll_tree') as invalidate:
+            self.poll.delete()
+
+        invalidate.assert_called_once_with(poll_id)
+
+    def test_question_delete_does_not_load_question_per_answer(self):
+        question = self.poll.questions.first()
+        # Лише сам каскад (SELECT відповідей і DELETE), без SELECT питання на кожну відповідь
+        with mock.patch('polls.signals.invalidate_poll_tree') as invalidate:
+            with self.assertNumQueries(5):
+                question.delete()
+
+        invalidate.assert_called_once_with(self.poll.pk)
+
+    def test_detail_page_query_count_does_not_grow(self):
+        url = reverse('polls:poll-detail', kwargs={'pk': self.poll.pk})
+        self.client.get(url)
+        # Лише сам Poll - структура береться з кешу
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertContains(response, 'Питання 9')
+
+    def test_json_endpoint(self):
+        response = self.client.get(reverse('polls:poll-json', kwargs={'pk': self.poll.pk}))
+        data = response.json()
+        self.assertEqual(data['title'], 'Опитування')
+        self.assertEqual(len(data['questions']), 10)
+        self.assertEqual(len(data['questions'][0]['answers']), 3)
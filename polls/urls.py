@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import PollView, PollCreateView, QuestionCreateView, AnswerCreateView, PollDeleteView, PollDetailView
+from .views import PollView, PollCreateView, QuestionCreateView, AnswerCreateView, PollDeleteView, PollDetailView, PollJsonView
 
 app_name = 'polls'
 
@@ -10,4 +10,5 @@ urlpatterns = [
     path('create/answer/<int:question_id>/<int:poll_id>', AnswerCreateView.as_view(), name='answer-create'),
     path('delete/<int:pk>/', PollDeleteView.as_view(), name='poll-delete'),
     path('<int:pk>/', PollDetailView.as_view(), name='poll-detail'),
+    path('<int:pk>/json/', PollJsonView.as_view(), name='poll-json'),
 ]
@@ -1,8 +1,12 @@
 from django.shortcuts import render, redirect
+from django.http import JsonResponse
 from .models import Poll, Question, Answer, UserResponse
 from django.urls import reverse_lazy
 from django.views.generic import View, CreateView, ListView, DetailView, UpdateView, DeleteView
+from django.contrib import messages
+from django.contrib.auth.views import redirect_to_login
 from .forms import Answers_set, PollForm, QuestionForm
+from .services import PollSubmissionError, poll_tree, submit_poll
 
 # Create your views here.
 
@@ -72,24 +76,28 @@ class PollDetailView(DetailView):
     model = Poll
     context_object_name = 'poll'
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Питання та відповіді - з кешованої структури, а не окремим запитом на кожне питання
+        context['poll_tree'] = poll_tree(self.object)
+        return context
+
     def post(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
         self.object = self.get_object()
-        poll = self.object
-        if UserResponse.objects.filter(user=request.user, question__poll=poll).exists():
-            return redirect('polls:poll-list')  # Користувач вже відповів на це опитування
-        for question in poll.questions.all():
-            selected_answer_id = request.POST.get(f'question_{question.id}')
-            if selected_answer_id:
-                answer = question.answers.get(id=selected_answer_id)
-                answer.votes += 1
-                answer.save()
-                UserResponse.objects.create(
-                    user=request.user,
-                    question=question,
-                    selected_answer=answer
-                )
+        try:
+            submit_poll(request.user, self.object, request.POST)
+        except PollSubmissionError as e:
+            messages.error(request, str(e))
         return redirect('polls:poll-list')
 
+class PollJsonView(DetailView):
+    model = Poll
+
+    def render_to_response(self, context, **response_kwargs):
+        return JsonResponse(poll_tree(self.object))
+
 class PollDeleteView(DeleteView):
     template_name = 'polls/poll_confirm_delete.html'
     model = Poll
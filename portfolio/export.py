@@ -0,0 +1,94 @@
+"""Експорт портфоліо одним ZIP-архівом, що віддається потоком.
+
+Архів не збирається ні на диску, ні в пам'яті: zipfile пише в
+"злив" (_ChunkSink), з якого генератор одразу віддає накопичені байти
+клієнту. Файли читаються шматками по EXPORT_CHUNK_SIZE, тому пам'ять на
+один запит стала незалежно від розміру портфоліо. zipfile сам помічає,
+що потік не підтримує seek, і пише розміри в data descriptor після
+кожного файла.
+"""
+import os
+import posixpath
+import zipfile
+
+from django.utils import timezone
+
+EXPORT_CHUNK_SIZE = 256 * 1024
+
+# Вміст цих форматів уже стиснений: повторне стиснення лише витрачає процесор
+STORED_EXTENSIONS = {
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.zip', '.rar', '.7z', '.gz',
+    '.mp3', '.mp4', '.mov', '.avi', '.webm', '.pdf', '.docx', '.xlsx', '.pptx',
+}
+
+
+class _ChunkSink:
+    """Потік лише для запису: zipfile додає байти, генератор їх забирає"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def write(self, data):
+        self._buffer += data
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        if self._buffer:
+            data = bytes(self._buffer)
+            self._buffer.clear()
+            yield data
+
+
+def _unique(name, used):
+    stem, extension = posixpath.splitext(name)
+    candidate = name
+    counter = 1
+    while candidate in used:
+        counter += 1
+        candidate = f'{stem} ({counter}){extension}'
+    used.add(candidate)
+    return candidate
+
+
+def archive_entries(portfolio):
+    """Пари (ім'я в архіві, FieldFile); читаються одразу, до початку відповіді"""
+    used = set()
+    entries = []
+    for index, screenshot in enumerate(portfolio.screenshots.order_by('pk'), start=1):
+        if screenshot.image:
+            extension = os.path.splitext(screenshot.image.name)[1].lower()
+            entries.append((_unique(f'screenshots/{index:03d}{extension}', used), screenshot.image))
+    for attachment in portfolio.attachments.order_by('pk'):
+        if attachment.file:
+            filename = os.path.basename(attachment.name or attachment.file.name) or f'file-{attachment.pk}'
+            entries.append((_unique(f'attachments/{filename}', used), attachment.file))
+    return entries
+
+
+def stream_zip(entries, chunk_size=EXPORT_CHUNK_SIZE):
+    """Генератор байтів ZIP-архіву з переданих файлів"""
+    sink = _ChunkSink()
+    date_time = timezone.localtime().timetuple()[:6]
+    with zipfile.ZipFile(sink, 'w', allowZip64=True) as archive:
+        for arcname, field_file in entries:
+            storage = field_file.storage
+            try:
+                size = storage.size(field_file.name)
+                source = storage.open(field_file.name, 'rb')
+            except OSError:
+                # Файла немає в сховищі (наприклад, прибраний вручну) - архів без нього
+                continue
+            info = zipfile.ZipInfo(arcname, date_time=date_time)
+            extension = posixpath.splitext(arcname)[1].lower()
+            info.compress_type = zipfile.ZIP_STORED if extension in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+            # Відомий розмір дозволяє zipfile заздалегідь вирішити, чи потрібен ZIP64
+            info.file_size = size
+            with source, archive.open(info, 'w') as target:
+                for chunk in iter(lambda: source.read(chunk_size), b''):
+                    target.write(chunk)
+                    yield from sink.drain()
+            yield from sink.drain()
+    yield from sink.drain()
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:26
+
+import media.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='attachment',
+            name='file',
+            field=models.FileField(storage=media.storage.get_content_storage, upload_to='portfolio/files/'),
+        ),
+        migrations.AlterField(
+            model_name='screenshot',
+            name='image',
+            field=models.ImageField(storage=media.storage.get_content_storage, upload_to='portfolio/screenshots/'),
+        ),
+    ]
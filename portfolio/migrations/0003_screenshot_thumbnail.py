@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:58
+
+import media.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0002_alter_attachment_file_alter_screenshot_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='screenshot',
+            name='thumbnail',
+            field=models.ImageField(blank=True, editable=False, storage=media.storage.get_content_storage, upload_to='portfolio/thumbnails/'),
+        ),
+    ]
@@ -1,26 +1,61 @@
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Coalesce, NullIf
 from django.conf import settings
 
+from media.storage import get_content_storage
+
+class PortfolioQuerySet(models.QuerySet):
+
+    def with_cover(self):
+        """Анотує cover - мініатюру першого скриншота (або сам скриншот, поки мініатюри немає)"""
+        first_screenshot = (
+            Screenshot.objects.filter(portfolio=models.OuterRef('pk'))
+            .order_by('pk')
+            .annotate(src=Coalesce(NullIf('thumbnail', Value('')), 'image', output_field=models.CharField()))
+            .values('src')[:1]
+        )
+        return self.annotate(cover=models.Subquery(first_screenshot))
+
+
 class Portfolio(models.Model):
     owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='portfolios')
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = PortfolioQuerySet.as_manager()
+
     def __str__(self):
         return self.title
 
+    @property
+    def cover_url(self):
+        """URL обкладинки з анотації cover (PortfolioQuerySet.with_cover) або None"""
+        cover = getattr(self, 'cover', None)
+        if not cover:
+            return None
+        return Screenshot._meta.get_field('image').storage.url(cover)
+
 class Screenshot(models.Model):
     portfolio = models.ForeignKey(Portfolio, on_delete=models.CASCADE, related_name='screenshots')
-    image = models.ImageField(upload_to='portfolio/screenshots/')
+    image = models.ImageField(upload_to='portfolio/screenshots/', storage=get_content_storage)
+    # Зменшена копія для карток і сторінки проєкту (задача portfolio.screenshot_thumbnail)
+    thumbnail = models.ImageField(
+        upload_to='portfolio/thumbnails/', storage=get_content_storage, blank=True, editable=False
+    )
     caption = models.CharField(max_length=255, blank=True)
 
+    @property
+    def preview_url(self):
+        return (self.thumbnail or self.image).url
+
     def __str__(self):
         return f"Screenshot {self.pk} for {self.portfolio_id}"
 
 class Attachment(models.Model):
     portfolio = models.ForeignKey(Portfolio, on_delete=models.CASCADE, related_name='attachments')
-    file = models.FileField(upload_to='portfolio/files/')
+    file = models.FileField(upload_to='portfolio/files/', storage=get_content_storage)
     name = models.CharField(max_length=255, blank=True)
 
     def __str__(self):
@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.db import transaction
+
+from core.images import enqueue_downscale_many
+from jobs import queue
+
+from .models import Attachment, ExternalLink, Screenshot
+from .tasks import thumbnail_job
+
+
+def _store(model, field_name, files):
+    """Записує файли в сховище поля пачкою; повертає збережені імена"""
+    field = model._meta.get_field(field_name)
+    return field.storage.save_many([(field.generate_filename(None, f.name), f) for f in files])
+
+
+def _release(model, field_name, names):
+    storage = model._meta.get_field(field_name).storage
+    for name in names:
+        storage.delete(name)
+
+
+def _normalize_links(links):
+    """Пари (назва, url) без порожніх і повторних адрес, у порядку введення"""
+    seen = set()
+    result = []
+    for name, url in links:
+        url = (url or '').strip()
+        if url and url not in seen:
+            seen.add(url)
+            result.append(((name or '')[:200], url))
+    return result
+
+
+def save_portfolio(form, owner=None, screenshots=(), attachments=(), links=()):
+    """Зберігає портфоліо з форми разом із файлами та посиланнями.
+
+    Спочатку файли записуються в сховище (поза транзакцією), потім
+    портфоліо і всі дочірні записи зберігаються в одному atomic-блоці
+    через bulk_create, тож кількість запитів не залежить від кількості
+    файлів. Якщо щось упало, транзакція відкочується, а вже записані
+    файли видаляються. Посилання, які вже є в портфоліо, не дублюються.
+    """
+    screenshots = list(screenshots)
+    attachments = list(attachments)
+    screenshot_names = _store(Screenshot, 'image', screenshots)
+    try:
+        attachment_names = _store(Attachment, 'file', attachments)
+    except BaseException:
+        _release(Screenshot, 'image', screenshot_names)
+        raise
+
+    try:
+        with transaction.atomic():
+            portfolio = form.save(commit=False)
+            if owner is not None:
+                portfolio.owner = owner
+            adding = portfolio._state.adding
+            portfolio.save()
+            form.save_m2m()
+
+            links = _normalize_links(links)
+            if links and not adding:
+                existing = set(
+                    ExternalLink.objects.filter(portfolio=portfolio, url__in=[url for _, url in links])
+                    .values_list('url', flat=True)
+                )
+                links = [(name, url) for name, url in links if url not in existing]
+
+            created_screenshots = Screenshot.objects.bulk_create([
+                Screenshot(portfolio=portfolio, image=name) for name in screenshot_names
+            ])
+            Attachment.objects.bulk_create([
+                Attachment(portfolio=portfolio, file=name, name=upload.name[:255])
+                for name, upload in zip(attachment_names, attachments)
+            ])
+            ExternalLink.objects.bulk_create([
+                ExternalLink(portfolio=portfolio, name=name, url=url) for name, url in links
+            ])
+            enqueue_downscale_many(created_screenshots, 'image', settings.UPLOAD_IMAGE_MAX_SIZE)
+            if created_screenshots:
+                queue.enqueue_many(
+                    'portfolio.screenshot_thumbnail', [thumbnail_job(s) for s in created_screenshots]
+                )
+    except BaseException:
+        _release(Screenshot, 'image', screenshot_names)
+        _release(Attachment, 'file', attachment_names)
+        raise
+    return portfolio
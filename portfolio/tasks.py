@@ -0,0 +1,32 @@
+from django.conf import settings
+
+from core import images
+from jobs import queue
+from jobs.registry import task
+
+from .models import Screenshot
+
+
+def thumbnail_job(screenshot):
+    return f'portfolio-thumbnail:{screenshot.pk}', {'screenshot_id': screenshot.pk}
+
+
+@task('portfolio.screenshot_thumbnail')
+def screenshot_thumbnail(screenshot_id):
+    screenshot = Screenshot.objects.filter(pk=screenshot_id).first()
+    if screenshot is None or not screenshot.image:
+        return
+    source = screenshot.image.name
+    name = images.downscale(screenshot.image, settings.PORTFOLIO_THUMBNAIL_SIZE)
+    if name is None:
+        # Скриншот і так маленький (або не зображення): показується оригінал
+        return
+    storage = screenshot.image.storage
+    updated = Screenshot.objects.filter(pk=screenshot.pk, image=source).update(thumbnail=name)
+    if not updated:
+        # Оригінал встигли замінити (наприклад, core.downscale_image) - робимо мініатюру з нового
+        storage.delete(name)
+        key, payload = thumbnail_job(screenshot)
+        queue.enqueue('portfolio.screenshot_thumbnail', key=key, **payload)
+    elif screenshot.thumbnail:
+        storage.delete(screenshot.thumbnail.name)
@@ -1,3 +1,266 @@
-from django.test import TestCase
+import shutil
+import tempfile
+import zipfile
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+
+from core.models import UserProfile
+from jobs import queue
+from jobs.models import Job
+from media.models import Blob
+
+from . import export
+from .models import Attachment, ExternalLink, Portfolio, Screenshot
+
+
+def screenshot(index):
+    buffer = BytesIO()
+    Image.new('RGB', (40, 30), (index * 7 % 256, 80, 120)).save(buffer, 'PNG')
+    return SimpleUploadedFile(f'shot{index}.png', buffer.getvalue(), content_type='image/png')
+
+
+class PortfolioIngestionTest(TestCase):
+    """Тести для збереження портфоліо з файлами (portfolio.services.save_portfolio)"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user(username='owner', password='pass123')
+        self.client.login(username='owner', password='pass123')
+
+    def post_create(self, shots, start=0, **extra):
+        data = {
+            'title': 'Проєкт',
+            'description': 'Опис',
+            'screenshots': [screenshot(i) for i in range(start, start + shots)],
+            'attachments': [SimpleUploadedFile('report.pdf', b'%%PDF-1.4 report %d' % start)],
+            'link_name': ['Код', 'Код ще раз', ''],
+            'link_url': ['https://example.com/repo', 'https://example.com/repo', ''],
+        }
+        data.update(extra)
+        return self.client.post(reverse('portfolio:create'), data)
+
+    def test_create_persists_children(self):
+        response = self.post_create(3)
+
+        portfolio = Portfolio.objects.get()
+        self.assertRedirects(response, reverse('portfolio:detail', kwargs={'pk': portfolio.pk}))
+        self.assertEqual(portfolio.owner, self.user)
+        self.assertEqual(portfolio.screenshots.count(), 3)
+        self.assertEqual(list(portfolio.attachments.values_list('name', flat=True)), ['report.pdf'])
+        self.assertEqual(list(portfolio.links.values_list('url', flat=True)), ['https://example.com/repo'])
+        self.assertEqual(Job.objects.filter(name='core.downscale_image').count(), 3)
+        self.assertTrue(all(s.image.storage.exists(s.image.name) for s in portfolio.screenshots.all()))
+
+    def test_query_count_does_not_depend_on_file_count(self):
+        with CaptureQueriesContext(connection) as few:
+            self.post_create(2)
+        with CaptureQueriesContext(connection) as many:
+            self.post_create(40, start=2)
+
+        self.assertEqual(Screenshot.objects.count(), 42)
+        self.assertEqual(len(many), len(few))
+
+    def test_failure_rolls_back_rows_and_files(self):
+        with mock.patch.object(ExternalLink.objects, 'bulk_create', side_effect=RuntimeError('збій')):
+            with self.assertRaises(RuntimeError):
+                self.post_create(2)
+
+        self.assertFalse(Portfolio.objects.exists())
+        self.assertFalse(Screenshot.objects.exists())
+        self.assertFalse(Attachment.objects.exists())
+        self.assertFalse(Blob.objects.exists())
+
+    def test_update_skips_existing_links(self):
+        self.post_create(0)
+        portfolio = Portfolio.objects.get()
+
+        self.client.post(reverse('portfolio:update', kwargs={'pk': portfolio.pk}), {
+            'title': 'Проєкт',
+            'description': 'Новий опис',
+            'link_name': ['Код', 'Демо'],
+            'link_url': ['https://example.com/repo', 'https://example.com/demo'],
+        })
+
+        self.assertEqual(
+            sorted(portfolio.links.values_list('url', flat=True)),
+            ['https://example.com/demo', 'https://example.com/repo']
+        )
+
+
+class PortfolioPagesTest(TestCase):
+    """Тести для сторінок портфоліо: обкладинки та кількість запитів"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user(username='owner', password='pass123')
+        UserProfile.objects.create(user=self.user)
+        self.client.login(username='owner', password='pass123')
+
+    def create_portfolios(self, count, shots=2):
+        for index in range(count):
+            portfolio = Portfolio.objects.create(owner=self.user, title=f'Проєкт {index}')
+            for shot in range(shots):
+                Screenshot.objects.create(portfolio=portfolio, image=screenshot(index * 10 + shot))
+            ExternalLink.objects.create(portfolio=portfolio, url=f'https://example.com/{index}')
+            Attachment.objects.create(portfolio=portfolio, file=SimpleUploadedFile('a.txt', b'%d' % index))
+
+    def count_queries(self, url):
+        # Перший запит прогріває сесію і кеші навбару, рахуємо другий
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_list_queries_do_not_grow_with_cards(self):
+        self.create_portfolios(2)
+        _, few = self.count_queries(reverse('portfolio:list'))
+        self.create_portfolios(10)
+        response, many = self.count_queries(reverse('portfolio:list'))
+
+        self.assertEqual(few, many)
+        first = response.context['portfolios'][0]
+        self.assertEqual(first.cover, first.screenshots.order_by('pk').first().image.name)
+        self.assertContains(response, first.cover_url)
+
+    def test_detail_prefetches_children(self):
+        self.create_portfolios(1, shots=1)
+        portfolio = Portfolio.objects.get()
+        _, few = self.count_queries(reverse('portfolio:detail', kwargs={'pk': portfolio.pk}))
+        for index in range(5):
+            Screenshot.objects.create(portfolio=portfolio, image=screenshot(100 + index))
+            ExternalLink.objects.create(portfolio=portfolio, url=f'https://example.com/more/{index}')
+
+        response, many = self.count_queries(reverse('portfolio:detail', kwargs={'pk': portfolio.pk}))
+        self.assertEqual(few, many)
+        self.assertEqual(len(response.context['portfolio'].screenshots.all()), 6)
+
+    def test_user_portfolio_resolves_user_once(self):
+        self.create_portfolios(3)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('portfolio:user_portfolio', kwargs={'username': 'owner'}))
+
+        lookups = [q['sql'] for q in queries.captured_queries if '"auth_user"."username" =' in q['sql']]
+        self.assertEqual(len(lookups), 1)
+        self.assertEqual(response.context['profile_user'].user, self.user)
+        self.assertEqual(len(response.context['portfolio_items']), 3)
+
+    def test_cover_uses_thumbnail_when_ready(self):
+        portfolio = Portfolio.objects.create(owner=self.user, title='Великий')
+        buffer = BytesIO()
+        Image.new('RGB', (1600, 1000), (10, 20, 30)).save(buffer, 'JPEG')
+        shot = Screenshot.objects.create(
+            portfolio=portfolio, image=SimpleUploadedFile('big.jpg', buffer.getvalue())
+        )
+        queue.enqueue('portfolio.screenshot_thumbnail', screenshot_id=shot.pk)
+        queue.run_pending()
+
+        shot.refresh_from_db()
+        with shot.thumbnail.open() as f:
+            self.assertEqual(max(Image.open(f).size), 480)
+        self.assertEqual(Portfolio.objects.with_cover().get().cover, shot.thumbnail.name)
+
+
+class PortfolioExportTest(TestCase):
+    """Тести для потокового ZIP-експорту портфоліо"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user(username='owner', password='pass123')
+        self.portfolio = Portfolio.objects.create(owner=self.user, title='Курсова')
+        Screenshot.objects.create(portfolio=self.portfolio, image=screenshot(1))
+        Attachment.objects.create(
+            portfolio=self.portfolio, name='notes.txt', file=SimpleUploadedFile('notes.txt', b'text ' * 1000)
+        )
+        Attachment.objects.create(
+            portfolio=self.portfolio, name='notes.txt', file=SimpleUploadedFile('notes.txt', b'other')
+        )
+        self.url = reverse('portfolio:download', kwargs={'pk': self.portfolio.pk})
+
+    def test_requires_login(self):
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+    def test_streams_valid_archive(self):
+        self.client.login(username='owner', password='pass123')
+        response = self.client.get(self.url)
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        self.assertIn('attachment;', response['Content-Disposition'])
+        archive = zipfile.ZipFile(BytesIO(b''.join(response.streaming_content)))
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(
+            archive.namelist(),
+            ['screenshots/001.png', 'attachments/notes.txt', 'attachments/notes (2).txt']
+        )
+        self.assertEqual(archive.read('attachments/notes.txt'), b'text ' * 1000)
+        self.assertEqual(archive.getinfo('screenshots/001.png').compress_type, zipfile.ZIP_STORED)
+
+    def test_chunks_are_bounded_and_missing_files_skipped(self):
+        entries = export.archive_entries(self.portfolio)
+        missing = Attachment.objects.create(portfolio=self.portfolio, file='portfolio/files/gone.bin')
+        entries.append(('attachments/gone.bin', missing.file))
+
+        chunks = list(export.stream_zip(entries, chunk_size=512))
+
+        # Шматок файла плюс заголовок запису - без накопичення всього архіву
+        self.assertLess(max(len(chunk) for chunk in chunks), 2048)
+        archive = zipfile.ZipFile(BytesIO(b''.join(chunks)))
+        self.assertNotIn('attachments/gone.bin', archive.namelist())
+        self.assertEqual(len(archive.namelist()), 3)
+
+
+class PortfolioOwnershipTest(TestCase):
+    """Тести для прав власника на портфоліо"""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', password='pass123')
+        self.stranger = User.objects.create_user(username='stranger', password='pass123')
+        self.portfolio = Portfolio.objects.create(owner=self.owner, title='Мій проєкт')
+        Portfolio.objects.create(owner=self.stranger, title='Чужий проєкт')
+        self.delete_url = reverse('portfolio:delete', kwargs={'pk': self.portfolio.pk})
+
+    def test_stranger_cannot_delete(self):
+        self.client.login(username='stranger', password='pass123')
+        self.assertEqual(self.client.post(self.delete_url).status_code, 403)
+        self.assertTrue(Portfolio.objects.filter(pk=self.portfolio.pk).exists())
+
+    def test_owner_delete_loads_portfolio_once(self):
+        self.client.login(username='owner', password='pass123')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.delete_url)
+
+        lookups = [
+            q['sql'] for q in queries.captured_queries
+            if q['sql'].startswith('SELECT') and 'FROM "portfolio_portfolio"' in q['sql']
+        ]
+        self.assertEqual(len(lookups), 1)
+        self.assertRedirects(response, reverse('portfolio:list'), fetch_redirect_response=False)
+        self.assertFalse(Portfolio.objects.filter(pk=self.portfolio.pk).exists())
+
+    def test_list_filters_own_projects(self):
+        self.client.login(username='owner', password='pass123')
+        response = self.client.get(reverse('portfolio:list'), {'mine': '1'})
+
+        self.assertEqual(list(response.context['portfolios']), [self.portfolio])
+        self.assertEqual(len(self.client.get(reverse('portfolio:list')).context['portfolios']), 2)
@@ -9,5 +9,6 @@ urlpatterns = [
     path('<int:pk>/', views.PortfolioDetailView.as_view(), name='detail'),
     path('<int:pk>/edit/', views.portfolio_update, name='update'),
     path('<int:pk>/delete/', views.PortfolioDeleteView.as_view(), name='delete'),
+    path('<int:pk>/download/', views.PortfolioDownloadView.as_view(), name='download'),
     path('<str:username>/', views.UserPortfolioView.as_view(), name='user_portfolio'),
 ]
@@ -1,29 +1,51 @@
+from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy
+from django.http import StreamingHttpResponse
+from django.utils.http import content_disposition_header
+from django.views import View
 from django.views.generic import ListView, DetailView, DeleteView
-from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 
-from .models import Portfolio, Screenshot, Attachment, ExternalLink
+from core.mixins import OwnedQuerysetMixin, OwnerRequiredMixin
+
+from .models import Attachment, ExternalLink, Portfolio, Screenshot
+from . import export
 from .forms import PortfolioForm
+from .services import save_portfolio
 
-class PortfolioListView(ListView):
+class PortfolioListView(OwnedQuerysetMixin, ListView):
     model = Portfolio
     template_name = 'portfolio/portfolio_list.html'
     context_object_name = 'portfolios'
     paginate_by = 12
-    ordering = ['-created_at']
+
+    def get_queryset(self):
+        # Власник і обкладинка в тому самому запиті, що й сторінка карток
+        queryset = Portfolio.objects.select_related('owner').with_cover().order_by('-created_at', '-pk')
+        if self.show_mine():
+            queryset = self.get_owned_queryset(queryset)
+        return queryset
+
+    def show_mine(self):
+        return self.request.user.is_authenticated and self.request.GET.get('mine') == '1'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['show_mine'] = self.show_mine()
+        return context
 
 class PortfolioDetailView(DetailView):
     model = Portfolio
     template_name = 'portfolio/portfolio_detail.html'
     context_object_name = 'portfolio'
-
-class OwnerRequiredMixin(UserPassesTestMixin):
-    def test_func(self):
-        obj = self.get_object()
-        return obj.owner == self.request.user
+    queryset = Portfolio.objects.select_related('owner').prefetch_related(
+        Prefetch('screenshots', queryset=Screenshot.objects.order_by('pk')),
+        Prefetch('attachments', queryset=Attachment.objects.order_by('pk')),
+        Prefetch('links', queryset=ExternalLink.objects.order_by('pk')),
+    )
 
 class PortfolioDeleteView(LoginRequiredMixin, OwnerRequiredMixin, DeleteView):
     model = Portfolio
@@ -31,6 +53,20 @@ class PortfolioDeleteView(LoginRequiredMixin, OwnerRequiredMixin, DeleteView):
     success_url = reverse_lazy('portfolio:list')
 
 
+# Усі скриншоти й файли проєкту одним ZIP, що віддається потоком
+class PortfolioDownloadView(LoginRequiredMixin, View):
+
+    def get(self, request, pk):
+        portfolio = get_object_or_404(Portfolio, pk=pk)
+        # Перелік файлів читаємо до відповіді, генератор лише читає сховище
+        entries = export.archive_entries(portfolio)
+        response = StreamingHttpResponse(export.stream_zip(entries), content_type='application/zip')
+        response['Content-Disposition'] = content_disposition_header(True, f'{portfolio.title}.zip')
+        # Проксі (nginx) не повинен буферизувати архів перед віддачею
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
 # Список проектів з портфоліо чужого користувача
 class UserPortfolioView(LoginRequiredMixin, ListView):
     model = Portfolio
@@ -39,32 +75,35 @@ class UserPortfolioView(LoginRequiredMixin, ListView):
     paginate_by = 6
 
     def get_queryset(self):
-        user = get_object_or_404(User, username=self.kwargs['username'])
-        return Portfolio.objects.filter(owner=user).order_by('-created_at')
+        # Користувач з профілем одним запитом; get_context_data бере його звідси
+        self.profile_owner = get_object_or_404(
+            User.objects.select_related('profile'), username=self.kwargs['username']
+        )
+        return (
+            Portfolio.objects.filter(owner=self.profile_owner)
+            .select_related('owner').with_cover().order_by('-created_at', '-pk')
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['profile_user'] = get_object_or_404(User, username=self.kwargs['username']).profile
+        context['profile_user'] = self.profile_owner.profile
         return context
 
 
+def _uploaded_children(request):
+    return {
+        'screenshots': request.FILES.getlist('screenshots'),
+        'attachments': request.FILES.getlist('attachments'),
+        'links': zip(request.POST.getlist('link_name'), request.POST.getlist('link_url')),
+    }
+
+
 @login_required
 def portfolio_create(request):
     if request.method == 'POST':
         form = PortfolioForm(request.POST)
         if form.is_valid():
-            p = form.save(commit=False)
-            p.owner = request.user
-            p.save()
-            for f in request.FILES.getlist('screenshots'):
-                Screenshot.objects.create(portfolio=p, image=f)
-            for f in request.FILES.getlist('attachments'):
-                Attachment.objects.create(portfolio=p, file=f, name=f.name)
-            link_names = request.POST.getlist('link_name')
-            link_urls = request.POST.getlist('link_url')
-            for name, url in zip(link_names, link_urls):
-                if url:
-                    ExternalLink.objects.create(portfolio=p, name=name or '', url=url)
+            p = save_portfolio(form, owner=request.user, **_uploaded_children(request))
             return redirect('portfolio:detail', pk=p.pk)
     else:
         form = PortfolioForm()
@@ -73,21 +112,12 @@ def portfolio_create(request):
 @login_required
 def portfolio_update(request, pk):
     p = get_object_or_404(Portfolio, pk=pk)
-    if p.owner != request.user:
+    if p.owner_id != request.user.pk:
         return redirect('portfolio:detail', pk=pk)
     if request.method == 'POST':
         form = PortfolioForm(request.POST, instance=p)
         if form.is_valid():
-            p = form.save()
-            for f in request.FILES.getlist('screenshots'):
-                Screenshot.objects.create(portfolio=p, image=f)
-            for f in request.FILES.getlist('attachments'):
-                Attachment.objects.create(portfolio=p, file=f, name=f.name)
-            link_names = request.POST.getlist('link_name')
-            link_urls = request.POST.getlist('link_url')
-            for name, url in zip(link_names, link_urls):
-                if url:
-                    ExternalLink.objects.create(portfolio=p, name=name or '', url=url)
+            p = save_portfolio(form, **_uploaded_children(request))
             return redirect('portfolio:detail', pk=p.pk)
     else:
         form = PortfolioForm(instance=p)
@@ -0,0 +1,278 @@
+"""Повнотекстовий індекс порталу на SQLite FTS5.
+
+Усі джерела (теми й коментарі форуму, оголошення, матеріали, голосування,
+портфоліо) пишуться в одну віртуальну таблицю search_entry. rowid запису
+складається з коду джерела та id об'єкта, тому оновлення і видалення -
+це пошук за rowid, а не сканування індексу. Записи оновлюються сигналами
+(search/signals.py) у тій самій транзакції, що й зміна об'єкта.
+"""
+import re
+from dataclasses import dataclass
+from typing import Callable
+
+from django.apps import apps
+from django.db import connection
+from django.urls import reverse
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+TABLE = 'search_entry'
+ROWID_BASE = 10 ** 12
+
+# Службові символи для підсвічування в snippet(), замінюються на <mark> після екранування
+MARK_START = '\x02'
+MARK_END = '\x03'
+
+
+@dataclass(frozen=True)
+class SearchSource:
+    code: int
+    kind: str
+    label: str
+    model: str
+    title: Callable
+    body: Callable
+    url: Callable
+    should_index: Callable = lambda obj: True
+    related: tuple = ()
+    # Сторінки джерела доступні лише після входу - анонімам його записи не показуються
+    login_required: bool = False
+    # Пари (модель, поле FK), з яких запис бере текст: зміна такого об'єкта переіндексовує залежні записи
+    depends_on: tuple = ()
+
+    def get_model(self):
+        return apps.get_model(self.model)
+
+    def queryset(self):
+        queryset = self.get_model()._default_manager.all()
+        if self.related:
+            queryset = queryset.select_related(*self.related)
+        return queryset
+
+
+SOURCES = [
+    SearchSource(
+        code=1, kind='theme', label='Форум', model='forum.Theme',
+        title=lambda o: o.question,
+        body=lambda o: ' '.join(filter(None, [o.topic, o.other_content])),
+        url=lambda o: reverse('theme-detail', kwargs={'pk': o.pk}),
+    ),
+    SearchSource(
+        code=2, kind='post', label='Коментар на форумі', model='forum.Posts',
+        title=lambda o: o.theme.question,
+        body=lambda o: o.content,
+        url=lambda o: reverse('theme-detail', kwargs={'pk': o.theme_id}),
+        related=('theme',),
+        depends_on=(('forum.Theme', 'theme'),),
+    ),
+    SearchSource(
+        code=3, kind='announcement', label='Оголошення', model='announcements.Announcement',
+        title=lambda o: o.title,
+        body=lambda o: o.content,
+        url=lambda o: reverse('announcements:announcement-detail', kwargs={'pk': o.pk}),
+    ),
+    SearchSource(
+        code=4, kind='material', label='Матеріали', model='materials.Material',
+        title=lambda o: o.name,
+        body=lambda o: o.description,
+        url=lambda o: reverse('materials:material-list'),
+    ),
+    SearchSource(
+        code=5, kind='vote', label='Голосування', model='voting.Vote',
+        title=lambda o: o.title,
+        body=lambda o: o.description,
+        url=lambda o: reverse('voting:vote_detail', kwargs={'pk': o.pk}),
+        should_index=lambda o: o.is_active,
+        login_required=True,
+    ),
+    SearchSource(
+        code=6, kind='portfolio', label='Портфоліо', model='portfolio.Portfolio',
+        title=lambda o: o.title,
+        body=lambda o: o.description,
+        url=lambda o: reverse('portfolio:detail', kwargs={'pk': o.pk}),
+    ),
+]
+
+
+def available():
+    """FTS5 є лише в SQLite; на інших БД індекс вимкнено"""
+    return connection.vendor == 'sqlite'
+
+
+def source_for(model):
+    label = model._meta.label
+    for source in SOURCES:
+        if source.model == label:
+            return source
+    return None
+
+
+def visible_kinds(user):
+    """Види записів, які може бачити користувач"""
+    return [source.kind for source in SOURCES if user.is_authenticated or not source.login_required]
+
+
+def _rowid(source, pk):
+    return source.code * ROWID_BASE + pk
+
+
+def _entry(source, obj):
+    return (_rowid(source, obj.pk), source.title(obj) or '', source.body(obj) or '', source.kind, source.url(obj))
+
+
+def _insert(cursor, entries):
+    cursor.executemany(
+        f'INSERT INTO {TABLE} (rowid, title, body, kind, url) VALUES (%s, %s, %s, %s, %s)', entries
+    )
+
+
+def index_object(source, obj):
+    """Додає або оновлює запис об'єкта в індексі"""
+    if not available():
+        return
+    if not source.should_index(obj):
+        remove_object(source, obj.pk)
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [_rowid(source, obj.pk)])
+        _insert(cursor, [_entry(source, obj)])
+
+
+def reindex_dependents(model, instance, batch_size=500):
+    """Оновлює записи, що беруть текст з instance (назва теми в записах коментарів)"""
+    if not available():
+        return
+    label = model._meta.label
+    for source in SOURCES:
+        for parent, field_name in source.depends_on:
+            if parent != label:
+                continue
+            entries = []
+            objects = source.queryset().filter(**{field_name: instance}).iterator(chunk_size=batch_size)
+            with connection.cursor() as cursor:
+                for obj in objects:
+                    if source.should_index(obj):
+                        entries.append(_entry(source, obj))
+                    if len(entries) >= batch_size:
+                        _replace(cursor, entries)
+                        entries = []
+                if entries:
+                    _replace(cursor, entries)
+
+
+def _replace(cursor, entries):
+    cursor.executemany(f'DELETE FROM {TABLE} WHERE rowid = %s', [(entry[0],) for entry in entries])
+    _insert(cursor, entries)
+
+
+def remove_object(source, pk):
+    if not available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [_rowid(source, pk)])
+
+
+def rebuild(batch_size=500):
+    """Перебудовує індекс з нуля; повертає кількість проіндексованих об'єктів"""
+    if not available():
+        return 0
+    total = 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE}')
+        for source in SOURCES:
+            rows = []
+            for obj in source.queryset().iterator(chunk_size=batch_size):
+                if not source.should_index(obj):
+                    continue
+                rows.append(_entry(source, obj))
+                if len(rows) >= batch_size:
+                    _insert(cursor, rows)
+                    total += len(rows)
+                    rows = []
+            if rows:
+                _insert(cursor, rows)
+                total += len(rows)
+        cursor.execute(f"INSERT INTO {TABLE} ({TABLE}) VALUES ('optimize')")
+    return total
+
+
+def build_match(query):
+    """Перетворює введений текст на безпечний запит FTS5 (усі слова, з префіксним пошуком)"""
+    words = re.findall(r'\w+', query)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def _highlight(text):
+    return mark_safe(
+        escape(text).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+    )
+
+
+@dataclass
+class SearchHit:
+    kind: str
+    label: str
+    title: str
+    snippet: str
+    url: str
+
+
+class SearchResults:
+    """Ліниві результати пошуку, сумісні з django.core.paginator.Paginator.
+
+    kinds - лише записи цих видів (None - усі).
+    """
+
+    def __init__(self, query, kinds=None):
+        self.match = build_match(query)
+        self.kinds = None if kinds is None else list(kinds)
+        self._count = None
+
+    def _where(self):
+        """Умова WHERE і її параметри"""
+        if self.kinds is None:
+            return f'{TABLE} MATCH %s', [self.match]
+        placeholders = ', '.join(['%s'] * len(self.kinds))
+        return f'{TABLE} MATCH %s AND kind IN ({placeholders})', [self.match, *self.kinds]
+
+    def count(self):
+        if self._count is None:
+            if not self.match or self.kinds == [] or not available():
+                self._count = 0
+            else:
+                where, params = self._where()
+                with connection.cursor() as cursor:
+                    cursor.execute(f'SELECT COUNT(*) FROM {TABLE} WHERE {where}', params)
+                    self._count = cursor.fetchone()[0]
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            raise TypeError('SearchResults підтримує лише зрізи')
+        start = item.start or 0
+        limit = (item.stop if item.stop is not None else self.count()) - start
+        if not self.match or self.kinds == [] or limit <= 0 or not available():
+            return []
+        labels = {source.kind: source.label for source in SOURCES}
+        where, params = self._where()
+        with connection.cursor() as cursor:
+            # bm25: збіг у заголовку важить у 10 разів більше, ніж у тексті
+            cursor.execute(
+                f"SELECT kind, title, snippet({TABLE}, 1, %s, %s, '…', 16), url "
+                f"FROM {TABLE} WHERE {where} "
+                f"ORDER BY bm25({TABLE}, 10.0, 1.0) LIMIT %s OFFSET %s",
+                [MARK_START, MARK_END, *params, limit, start]
+            )
+            return [
+                SearchHit(
+                    kind=kind,
+                    label=labels.get(kind, kind),
+                    title=title,
+                    snippet=_highlight(snippet),
+                    url=url,
+                )
+                for kind, title, snippet, url in cursor.fetchall()
+            ]
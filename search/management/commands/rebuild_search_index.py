@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from search import index
+
+
+class Command(BaseCommand):
+    help = "Перебудовує повнотекстовий індекс пошуку (SQLite FTS5)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if not index.available():
+            raise CommandError("Повнотекстовий пошук підтримується лише для SQLite (FTS5)")
+
+        with transaction.atomic():
+            total = index.rebuild(batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(f"Проіндексовано об'єктів: {total}"))
@@ -0,0 +1,23 @@
+from django.db.models.signals import post_save, post_delete
+
+from . import index
+
+
+def update_entry(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    index.index_object(index.source_for(sender), instance)
+    if not created:
+        index.reindex_dependents(sender, instance)
+
+
+def delete_entry(sender, instance, **kwargs):
+    index.remove_object(index.source_for(sender), instance.pk)
+
+
+def connect_sources():
+    """Підписує індекс на зміни всіх моделей з index.SOURCES"""
+    for source in index.SOURCES:
+        model = source.get_model()
+        post_save.connect(update_entry, sender=model, dispatch_uid=f'search_update_{source.kind}')
+        post_delete.connect(delete_entry, sender=model, dispatch_uid=f'search_delete_{source.kind}')
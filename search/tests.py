@@ -0,0 +1,122 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from announcements.models import Announcement
+from forum.models import Theme, Posts
+from voting.models import Vote
+
+from . import index
+
+
+def indexed_rows():
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT kind, title FROM {index.TABLE} ORDER BY rowid')
+        return cursor.fetchall()
+
+
+class SearchIndexTest(TestCase):
+    """Тести для підтримки індексу сигналами та команди перебудови"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+
+    def test_save_and_delete_update_index(self):
+        theme = Theme.objects.create(owner=self.user, topic='Розклад', question='Коли екзамен?')
+        self.assertIn(('theme', 'Коли екзамен?'), indexed_rows())
+
+        theme.question = 'Коли залік?'
+        theme.save()
+        self.assertEqual(
+            [row for row in indexed_rows() if row[0] == 'theme'],
+            [('theme', 'Коли залік?')]
+        )
+
+        theme.delete()
+        self.assertEqual(indexed_rows(), [])
+
+    def test_theme_rename_reindexes_its_posts(self):
+        theme = Theme.objects.create(owner=self.user, topic='Розклад', question='Коли екзамен?')
+        for content in ('Завтра', 'Післязавтра'):
+            Posts.objects.create(owner=self.user, reaction='LIKE', theme=theme, content=content)
+
+        theme.question = 'Коли залік?'
+        theme.save()
+
+        self.assertEqual(
+            [row for row in indexed_rows() if row[0] == 'post'],
+            [('post', 'Коли залік?'), ('post', 'Коли залік?')]
+        )
+        hits = index.SearchResults('залік')[:10]
+        self.assertEqual(sorted(hit.kind for hit in hits), ['post', 'post', 'theme'])
+
+    def test_inactive_vote_is_not_indexed(self):
+        vote = Vote.objects.create(title='Староста', description='Вибори', created_by=self.user)
+        self.assertIn(('vote', 'Староста'), indexed_rows())
+
+        vote.is_active = False
+        vote.save()
+        self.assertNotIn(('vote', 'Староста'), indexed_rows())
+
+    def test_rebuild_command(self):
+        Announcement.objects.create(title='Перенесення пари', content='Пара о 10:00')
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {index.TABLE}')
+
+        call_command('rebuild_search_index', stdout=StringIO())
+
+        self.assertEqual(indexed_rows(), [('announcement', 'Перенесення пари')])
+
+
+class SearchViewTest(TestCase):
+    """Тести для сторінки результатів пошуку"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        theme = Theme.objects.create(owner=self.user, topic='Загальне', question='Курсова робота')
+        Posts.objects.create(
+            owner=self.user, reaction='LIKE', theme=theme,
+            content='Хто вже здав курсова <script>alert(1)</script>?'
+        )
+        Announcement.objects.create(title='Оголошення', content='Захист курсова у п\'ятницю')
+        self.url = reverse('search:search')
+
+    def test_title_match_ranks_first(self):
+        response = self.client.get(self.url, {'q': 'курсова'})
+
+        hits = response.context['results']
+        self.assertEqual(response.context['paginator'].count, 3)
+        self.assertEqual(hits[0].kind, 'theme')
+
+    def test_prefix_match_and_snippet_is_escaped(self):
+        response = self.client.get(self.url, {'q': 'здав'})
+
+        hits = response.context['results']
+        self.assertEqual(len(hits), 1)
+        self.assertIn('<mark>здав</mark>', hits[0].snippet)
+        self.assertNotIn('<script>', hits[0].snippet)
+
+    def test_operators_in_query_are_treated_as_text(self):
+        response = self.client.get(self.url, {'q': 'курсова" OR NEAR('})
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_votes_hidden_from_anonymous_users(self):
+        Vote.objects.create(title='Курсова тема', description='Обираємо', created_by=self.user)
+
+        response = self.client.get(self.url, {'q': 'обираємо'})
+        self.assertEqual(response.context['paginator'].count, 0)
+
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.get(self.url, {'q': 'обираємо'})
+        self.assertEqual([hit.kind for hit in response.context['results']], ['vote'])
+
+    def test_empty_query(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['results']), [])
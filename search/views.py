@@ -0,0 +1,18 @@
+from django.views.generic import ListView
+
+from .index import SearchResults, visible_kinds
+
+
+class SearchView(ListView):
+    template_name = 'search/results.html'
+    context_object_name = 'results'
+    paginate_by = 20
+
+    def get_queryset(self):
+        # Записи, сторінки яких потребують входу (голосування), анонімам не показуються
+        return SearchResults(self.request.GET.get('q', ''), kinds=visible_kinds(self.request.user))
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.request.GET.get('q', '')
+        return context
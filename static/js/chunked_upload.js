@@ -0,0 +1,121 @@
+// Поетапне завантаження великих файлів (media.uploads).
+// Файл з input[data-chunked-upload] більший за THRESHOLD надсилається шматками
+// через API, а форма отримує лише токен у прихованому полі upload_token.
+// Після обриву з'єднання повторне надсилання форми продовжує з останнього шматка.
+(function () {
+    const THRESHOLD = 16 * 1024 * 1024;
+    const RETRIES = 5;
+
+    function storageKey(file) {
+        return `chunked-upload:${file.name}:${file.size}:${file.lastModified}`;
+    }
+
+    async function sha256(buffer) {
+        if (!window.crypto || !window.crypto.subtle) {
+            return '';  // crypto.subtle доступний лише на HTTPS/localhost
+        }
+        const digest = await window.crypto.subtle.digest('SHA-256', buffer);
+        return Array.from(new Uint8Array(digest)).map(b => b.toString(16).padStart(2, '0')).join('');
+    }
+
+    async function request(url, options, csrfToken) {
+        options.headers = Object.assign({'X-CSRFToken': csrfToken}, options.headers || {});
+        options.credentials = 'same-origin';
+        const response = await fetch(url, options);
+        const data = response.status === 204 ? {} : await response.json();
+        return {response, data};
+    }
+
+    async function resumeOrStart(baseUrl, file, csrfToken) {
+        const token = sessionStorage.getItem(storageKey(file));
+        if (token) {
+            const {response, data} = await request(`${baseUrl}${token}/`, {method: 'GET'}, csrfToken);
+            if (response.ok) {
+                return data;
+            }
+        }
+        const {response, data} = await request(baseUrl, {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({filename: file.name, size: file.size}),
+        }, csrfToken);
+        if (!response.ok) {
+            throw new Error(data.error || 'Не вдалося почати завантаження');
+        }
+        sessionStorage.setItem(storageKey(file), data.token);
+        return data;
+    }
+
+    async function upload(baseUrl, file, csrfToken, onProgress) {
+        let state = await resumeOrStart(baseUrl, file, csrfToken);
+        let offset = state.offset;
+        while (!state.complete && offset < file.size) {
+            const chunk = await file.slice(offset, offset + state.chunk_size).arrayBuffer();
+            const checksum = await sha256(chunk);
+            let attempt = 0;
+            for (;;) {
+                try {
+                    const {response, data} = await request(`${baseUrl}${state.token}/`, {
+                        method: 'PUT',
+                        headers: {'Upload-Offset': String(offset), 'X-Chunk-SHA256': checksum},
+                        body: chunk,
+                    }, csrfToken);
+                    if (response.ok || response.status === 409) {
+                        // 409: сервер уже має інший обсяг - продовжуємо з його зсуву
+                        offset = data.offset;
+                        break;
+                    }
+                    throw new Error(data.error || `HTTP ${response.status}`);
+                } catch (error) {
+                    attempt += 1;
+                    if (attempt > RETRIES) {
+                        throw error;
+                    }
+                    await new Promise(resolve => setTimeout(resolve, 500 * 2 ** attempt));
+                }
+            }
+            onProgress(offset / file.size);
+        }
+        const {response, data} = await request(`${baseUrl}${state.token}/finalize/`, {method: 'POST'}, csrfToken);
+        if (!response.ok) {
+            sessionStorage.removeItem(storageKey(file));
+            throw new Error(data.error || 'Не вдалося завершити завантаження');
+        }
+        sessionStorage.removeItem(storageKey(file));
+        return data.token;
+    }
+
+    document.querySelectorAll('input[type=file][data-chunked-upload]').forEach(function (input) {
+        const form = input.form;
+        const tokenInput = form.querySelector('input[name=upload_token]');
+        const progress = form.querySelector('[data-upload-progress]');
+        let busy = false;
+
+        form.addEventListener('submit', async function (event) {
+            const file = input.files[0];
+            if (!file || file.size < THRESHOLD || !tokenInput || busy) {
+                return;
+            }
+            event.preventDefault();
+            busy = true;
+            const csrfToken = form.querySelector('input[name=csrfmiddlewaretoken]').value;
+            if (progress) {
+                progress.classList.remove('d-none');
+            }
+            try {
+                tokenInput.value = await upload(input.dataset.chunkedUpload, file, csrfToken, function (ratio) {
+                    if (progress) {
+                        progress.firstElementChild.style.width = `${Math.round(ratio * 100)}%`;
+                    }
+                });
+                // Файл уже на сервері, у формі лишається тільки токен
+                input.value = '';
+                form.submit();
+            } catch (error) {
+                alert(`Помилка завантаження: ${error.message}. Надішліть форму ще раз, щоб продовжити.`);
+            } finally {
+                busy = false;
+            }
+        });
+    });
+})();
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from voting import tallies
+from voting.models import Vote
+
+
+class Command(BaseCommand):
+    help = "Перебудовує лічильники голосів (voters_count/responses_count) з VoteResponse"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'vote_ids', nargs='*', type=int,
+            help="ID голосувань для перерахунку (за замовчуванням усі)"
+        )
+
+    def handle(self, *args, **options):
+        votes = Vote.objects.all()
+        if options['vote_ids']:
+            votes = votes.filter(pk__in=options['vote_ids'])
+
+        with transaction.atomic():
+            updated = tallies.recount(votes)
+
+        self.stdout.write(self.style.SUCCESS(f"Перераховано голосувань: {updated}"))
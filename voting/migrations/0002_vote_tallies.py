@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:00
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_tallies(apps, schema_editor):
+    Vote = apps.get_model('voting', 'Vote')
+    VoteOption = apps.get_model('voting', 'VoteOption')
+    VoteResponse = apps.get_model('voting', 'VoteResponse')
+
+    option_counts = VoteResponse.objects.filter(
+        vote_option=OuterRef('pk')
+    ).order_by().values('vote_option').annotate(total=Count('pk')).values('total')
+    VoteOption.objects.update(responses_count=Coalesce(Subquery(option_counts), 0))
+
+    voter_counts = VoteResponse.objects.filter(
+        vote_option__vote=OuterRef('pk')
+    ).order_by().values('vote_option__vote').annotate(
+        total=Count('user', distinct=True)
+    ).values('total')
+    Vote.objects.update(voters_count=Coalesce(Subquery(voter_counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voting', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vote',
+            name='voters_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Кількість учасників'),
+        ),
+        migrations.AddField(
+            model_name='voteoption',
+            name='responses_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Кількість голосів'),
+        ),
+        migrations.RunPython(fill_tallies, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_and_deduplicate(apps, schema_editor):
+    Vote = apps.get_model('voting', 'Vote')
+    VoteOption = apps.get_model('voting', 'VoteOption')
+    VoteResponse = apps.get_model('voting', 'VoteResponse')
+
+    VoteResponse.objects.update(
+        vote=Subquery(VoteOption.objects.filter(pk=OuterRef('vote_option')).values('vote')[:1])
+    )
+
+    # Залишаємо лише останню відповідь кожного користувача в кожному голосуванні
+    duplicates = VoteResponse.objects.order_by().values('user', 'vote').annotate(
+        total=Count('pk'), last_id=Max('pk')
+    ).filter(total__gt=1)
+    for row in duplicates:
+        VoteResponse.objects.filter(user=row['user'], vote=row['vote']).exclude(
+            pk=row['last_id']
+        ).delete()
+
+    # Перераховуємо лічильники після видалення дублікатів
+    option_counts = VoteResponse.objects.filter(
+        vote_option=OuterRef('pk')
+    ).order_by().values('vote_option').annotate(total=Count('pk')).values('total')
+    VoteOption.objects.update(responses_count=Coalesce(Subquery(option_counts), 0))
+
+    voter_counts = VoteResponse.objects.filter(
+        vote=OuterRef('pk')
+    ).order_by().values('vote').annotate(total=Count('pk')).values('total')
+    Vote.objects.update(voters_count=Coalesce(Subquery(voter_counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voting', '0002_vote_tallies'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='voteresponse',
+            name='vote',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='responses', to='voting.vote', verbose_name='Голосування'),
+        ),
+        migrations.RunPython(backfill_and_deduplicate, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='voteresponse',
+            name='vote',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='responses', to='voting.vote', verbose_name='Голосування'),
+        ),
+        migrations.AddConstraint(
+            model_name='voteresponse',
+            constraint=models.UniqueConstraint(fields=('user', 'vote'), name='unique_user_vote_response'),
+        ),
+    ]
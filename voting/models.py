@@ -1,9 +1,37 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.db.models import BooleanField, Case, Exists, OuterRef, Q, Value, When
 from django.utils import timezone
 
 
+class VoteQuerySet(models.QuerySet):
+    """Запити до голосувань з обчисленими на стороні БД полями"""
+
+    def with_open_state(self):
+        """Додає open_now - те саме, що Vote.is_open(), але одним SQL-виразом"""
+        now = timezone.now()
+        return self.annotate(
+            open_now=Case(
+                When(
+                    Q(is_active=True) &
+                    (Q(start_date__isnull=True) | Q(start_date__lte=now)) &
+                    (Q(end_date__isnull=True) | Q(end_date__gte=now)),
+                    then=Value(True)
+                ),
+                default=Value(False),
+                output_field=BooleanField()
+            )
+        )
+
+    def with_user_voted(self, user):
+        """Додає user_voted - чи голосував user у кожному голосуванні"""
+        return self.annotate(
+            user_voted=Exists(
+                VoteResponse.objects.filter(user=user, vote=OuterRef('pk'))
+            )
+        )
+
 
 class Vote(models.Model):
     """Модель голосування"""
@@ -25,6 +53,10 @@ class Vote(models.Model):
     allow_revote = models.BooleanField(default=True, verbose_name="Дозволити переголосування")
     is_anonymous = models.BooleanField(default=False, verbose_name="Анонімне голосування")
 
+    # Денормалізований лічильник унікальних учасників (оновлюється в voting/tallies.py)
+    voters_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Кількість учасників")
+
+    objects = VoteQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Голосування"
@@ -60,7 +92,7 @@ class Vote(models.Model):
     
     def total_votes(self):
         """Загальна кількість голосів"""
-        return VoteResponse.objects.filter(vote_option__vote=self).values('user').distinct().count()
+        return VoteResponse.objects.filter(vote=self).values('user').distinct().count()
     
     def unique_voters(self):
         """Кількість унікальних користувачів, які проголосували"""
@@ -77,6 +109,9 @@ class VoteOption(models.Model):
     )
     text = models.CharField(max_length=200, verbose_name="Текст варіанту")
     order = models.PositiveIntegerField(default=0, verbose_name="Порядок відображення")
+
+    # Денормалізований лічильник відповідей (оновлюється в voting/tallies.py)
+    responses_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Кількість голосів")
     
     class Meta:
         verbose_name = "Варіант голосування"
@@ -112,31 +147,43 @@ class VoteResponse(models.Model):
         related_name='responses',
         verbose_name="Обраний варіант"
     )
+    # Дублює vote_option.vote, щоб БД могла гарантувати один голос на користувача
+    vote = models.ForeignKey(
+        Vote,
+        on_delete=models.CASCADE,
+        related_name='responses',
+        editable=False,
+        verbose_name="Голосування"
+    )
     voted_at = models.DateTimeField(auto_now_add=True, verbose_name="Час голосування")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Час оновлення")
     
     class Meta:
         verbose_name = "Відповідь користувача"
         verbose_name_plural = "Відповіді користувачів"
-        # Якщо не дозволяється переголосування, можна додати unique_together
-        # unique_together = ['user', 'vote_option__vote']
         ordering = ['-voted_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'vote'], name='unique_user_vote_response'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.vote_option.vote.title}"
     
+    def save(self, *args, **kwargs):
+        # Голосування завжди береться з обраного варіанту
+        if self.vote_option_id is not None:
+            self.vote_id = self.vote_option.vote_id
+        super().save(*args, **kwargs)
+    
     @classmethod
     def has_user_voted(cls, user, vote):
         """Перевірка, чи голосував користувач"""
-        return cls.objects.filter(
-            user=user, 
-            vote_option__vote=vote
-        ).exists()
+        return cls.objects.filter(user=user, vote=vote).exists()
     
     @classmethod
     def get_user_response(cls, user, vote):
         """Отримати відповідь користувача"""
         try:
-            return cls.objects.get(user=user, vote_option__vote=vote)
+            return cls.objects.get(user=user, vote=vote)
         except cls.DoesNotExist:
             return None
\ No newline at end of file
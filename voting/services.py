@@ -0,0 +1,129 @@
+"""Сервіси голосувань, спільні для HTML- та JSON-представлень."""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+
+from . import tallies
+from .models import VoteResponse
+
+
+class VoteError(Exception):
+    """Голос не може бути прийнятий; повідомлення показується користувачу"""
+
+
+class VoteClosedError(VoteError):
+    pass
+
+
+class RevoteNotAllowedError(VoteError):
+    pass
+
+
+def percentage(count, total):
+    """Відсоток count від total з одним знаком після коми"""
+    if not total:
+        return 0
+    return round((count / total) * 100, 1)
+
+
+def ensure_open(vote):
+    """VoteClosedError, якщо голосування зараз не приймає голосів"""
+    if not vote.is_open():
+        raise VoteClosedError("Це голосування вже завершено або ще не розпочато.")
+
+
+def cast_vote(user, vote, option):
+    """Записує або змінює голос користувача однією транзакцією.
+
+    Унікальність (user, vote) гарантує обмеження в БД, тому паралельні
+    повторні надсилання форми не створюють дублікатів: запит, що програв
+    гонку, отримує IntegrityError і оновлює вже створену відповідь.
+    Повертає (response, created).
+    """
+    if option.vote_id != vote.pk:
+        raise VoteError("Обраний варіант не належить до цього голосування.")
+    ensure_open(vote)
+
+    with transaction.atomic():
+        response = VoteResponse.objects.select_for_update().filter(user=user, vote=vote).first()
+        if response is None:
+            try:
+                with transaction.atomic():
+                    response = VoteResponse.objects.create(user=user, vote_option=option)
+                return response, True
+            except IntegrityError:
+                response = VoteResponse.objects.select_for_update().get(user=user, vote=vote)
+
+        if not vote.allow_revote:
+            raise RevoteNotAllowedError("Ви вже проголосували. Переголосування заборонено.")
+
+        if response.vote_option_id != option.pk:
+            old_option_id = response.vote_option_id
+            response.vote_option = option
+            response.save(update_fields=['vote_option', 'updated_at'])
+            tallies.response_moved(old_option_id, option.pk)
+        return response, False
+
+
+def vote_results(vote, include_voters=False):
+    """Результати голосування за сталу кількість запитів.
+
+    Кількості беруться з денормалізованих лічильників (voting/tallies.py),
+    тому всі варіанти читаються одним запитом без агрегатів. Якщо
+    include_voters=True, усі відповіді з користувачами вибираються ще одним
+    запитом і розкладаються по варіантах у Python.
+    """
+    total = vote.voters_count
+    options_stats = [
+        {
+            'option': option,
+            'count': option.responses_count,
+            'percentage': percentage(option.responses_count, total),
+        }
+        for option in vote.options.all()
+    ]
+
+    if include_voters:
+        voters = defaultdict(list)
+        responses = VoteResponse.objects.filter(
+            vote=vote
+        ).select_related('user').order_by('-voted_at')
+        for response in responses:
+            voters[response.vote_option_id].append(response)
+        for stat in options_stats:
+            stat['voters'] = voters[stat['option'].pk]
+
+    return {
+        'options_stats': options_stats,
+        'total_votes': total,
+    }
+
+
+def results_as_dict(vote, results):
+    """Серіалізує результати vote_results() для JSON-відповіді"""
+    options = []
+    for stat in results['options_stats']:
+        item = {
+            'id': stat['option'].pk,
+            'text': stat['option'].text,
+            'count': stat['count'],
+            'percentage': stat['percentage'],
+        }
+        if 'voters' in stat:
+            item['voters'] = [
+                {
+                    'username': response.user.username,
+                    'voted_at': response.voted_at.isoformat(),
+                }
+                for response in stat['voters']
+            ]
+        options.append(item)
+
+    return {
+        'id': vote.pk,
+        'title': vote.title,
+        'is_open': vote.is_open(),
+        'is_anonymous': vote.is_anonymous,
+        'total_votes': results['total_votes'],
+        'options': options,
+    }
@@ -0,0 +1,38 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import tallies
+from .models import Vote, VoteOption, VoteResponse
+
+
+def _origin_model(origin):
+    """Модель, з якої почалося видалення (об'єкт або QuerySet)"""
+    if isinstance(origin, QuerySet):
+        return origin.model
+    return type(origin) if origin is not None else None
+
+
+@receiver(post_save, sender=VoteResponse)
+def count_new_response(sender, instance, created, raw=False, **kwargs):
+    """Оновлює лічильники після створення відповіді"""
+    if created and not raw:
+        tallies.response_added(instance)
+
+
+@receiver(post_delete, sender=VoteResponse)
+def uncount_deleted_response(sender, instance, origin=None, **kwargs):
+    """Оновлює лічильники після видалення відповіді"""
+    # Каскад від голосування чи варіанту: лічильники або видаляються разом
+    # з ним, або перераховуються один раз у uncount_deleted_option
+    if _origin_model(origin) in (Vote, VoteOption):
+        return
+    tallies.response_removed(instance)
+
+
+@receiver(post_delete, sender=VoteOption)
+def uncount_deleted_option(sender, instance, origin=None, **kwargs):
+    """Після видалення варіанту разом з його відповідями перераховує учасників голосування"""
+    if _origin_model(origin) is Vote:
+        return
+    tallies.recount_voters(instance.vote_id)
@@ -0,0 +1,70 @@
+"""Денормалізовані лічильники голосів.
+
+Vote.voters_count і VoteOption.responses_count зберігають те, що раніше
+щоразу рахувалось агрегатними запитами по VoteResponse. Лічильники
+оновлюються атомарними F()-виразами в тій самій транзакції, що й запис
+відповіді, а recount() перебудовує їх з VoteResponse з нуля.
+"""
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Vote, VoteOption, VoteResponse
+
+
+def response_added(response):
+    """Враховує нову відповідь у лічильниках"""
+    VoteOption.objects.filter(pk=response.vote_option_id).update(
+        responses_count=F('responses_count') + 1
+    )
+    # Обмеження unique_user_vote_response гарантує, що це новий учасник
+    Vote.objects.filter(pk=response.vote_id).update(voters_count=F('voters_count') + 1)
+
+
+def response_removed(response):
+    """Прибирає видалену відповідь з лічильників"""
+    VoteOption.objects.filter(pk=response.vote_option_id).update(
+        responses_count=Greatest(F('responses_count') - 1, Value(0))
+    )
+    Vote.objects.filter(pk=response.vote_id).update(
+        voters_count=Greatest(F('voters_count') - 1, Value(0))
+    )
+
+
+def recount_voters(vote_id):
+    """Перераховує Vote.voters_count з VoteResponse одним запитом"""
+    voter_counts = VoteResponse.objects.filter(
+        vote=OuterRef('pk')
+    ).order_by().values('vote').annotate(total=Count('pk')).values('total')
+    Vote.objects.filter(pk=vote_id).update(voters_count=Coalesce(Subquery(voter_counts), 0))
+
+
+def response_moved(old_option_id, new_option_id):
+    """Переносить голос між варіантами при переголосуванні"""
+    VoteOption.objects.filter(pk=old_option_id).update(
+        responses_count=Greatest(F('responses_count') - 1, Value(0))
+    )
+    VoteOption.objects.filter(pk=new_option_id).update(
+        responses_count=F('responses_count') + 1
+    )
+
+
+def recount(votes=None):
+    """Перераховує лічильники з VoteResponse.
+
+    votes - queryset голосувань, які треба перерахувати (за замовчуванням усі).
+    Повертає кількість оновлених голосувань.
+    """
+    if votes is None:
+        votes = Vote.objects.all()
+
+    option_counts = VoteResponse.objects.filter(
+        vote_option=OuterRef('pk')
+    ).order_by().values('vote_option').annotate(total=Count('pk')).values('total')
+    VoteOption.objects.filter(vote__in=votes).update(
+        responses_count=Coalesce(Subquery(option_counts), 0)
+    )
+
+    voter_counts = VoteResponse.objects.filter(
+        vote=OuterRef('pk')
+    ).order_by().values('vote').annotate(total=Count('pk')).values('total')
+    return votes.order_by().update(voters_count=Coalesce(Subquery(voter_counts), 0))
@@ -1,10 +1,18 @@
-from django.test import TestCase, Client
+import threading
+from unittest import mock
+from django.test import TestCase, TransactionTestCase, Client
 from django.contrib.auth.models import User, Group
 from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection, connections, IntegrityError, OperationalError
+from django.test.utils import CaptureQueriesContext
+from core.models import UserProfile
 from .models import Vote, VoteOption, VoteResponse
 from .forms import VoteForm, VoteOptionFormSet, VoteResponseForm
+from .services import cast_vote, RevoteNotAllowedError
 
 
 class VoteModelTest(TestCase):
@@ -289,6 +297,17 @@ class VoteViewsTest(TestCase):
         
         self.assertEqual(response.status_code, 403)  # Forbidden
     
+    def test_profile_role_does_not_grant_vote_moderation(self):
+        """Тест що роль профілю moderator не дає прав на голосування - лише staff і група Moderators"""
+        UserProfile.objects.create(user=self.user, role='moderator')
+        self.client.login(username='testuser', password='testpass123')
+
+        self.assertEqual(self.client.get(reverse('voting:vote_create')).status_code, 403)
+        self.assertEqual(
+            self.client.post(reverse('voting:vote_delete', kwargs={'pk': self.vote.pk})).status_code, 403
+        )
+        self.assertTrue(Vote.objects.filter(pk=self.vote.pk).exists())
+
     def test_vote_update_view_admin(self):
         """Тест редагування голосування адміністратором"""
         self.client.login(username='admin', password='adminpass123')
@@ -324,7 +343,24 @@ class VoteViewsTest(TestCase):
         
         user_response = VoteResponse.get_user_response(self.user, self.vote)
         self.assertEqual(user_response.vote_option, self.option1)
-    
+
+    def test_closed_vote_rejected_before_form(self):
+        """Закрите голосування відхиляється без перевірки форми"""
+        self.vote.is_active = False
+        self.vote.save()
+        self.client.login(username='testuser', password='testpass123')
+
+        with mock.patch('voting.views.VoteResponseForm') as form_class:
+            response = self.client.post(
+                reverse('voting:vote_detail', kwargs={'pk': self.vote.pk}),
+                {'vote_option': self.option1.pk},
+                follow=True
+            )
+
+        form_class.assert_not_called()
+        self.assertContains(response, 'Це голосування вже завершено')
+        self.assertFalse(VoteResponse.has_user_voted(self.user, self.vote))
+
     def test_revoting(self):
         """Тест переголосування"""
         self.vote.allow_revote = True
@@ -492,3 +528,325 @@ class VoteIntegrationTest(TestCase):
         # Голос не повинен змінитися
         user1_response = VoteResponse.get_user_response(self.user1, vote)
         self.assertEqual(user1_response.vote_option, red)
+
+
+class VoteTallyTest(TestCase):
+    """Тести для денормалізованих лічильників голосів"""
+    
+    def setUp(self):
+        self.client = Client()
+        
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.user2 = User.objects.create_user(username='user2', password='pass123')
+        
+        self.vote = Vote.objects.create(
+            title='Тест',
+            description='Опис',
+            created_by=self.user,
+            allow_revote=True
+        )
+        self.option1 = VoteOption.objects.create(vote=self.vote, text='Варіант 1', order=1)
+        self.option2 = VoteOption.objects.create(vote=self.vote, text='Варіант 2', order=2)
+    
+    def assertTallies(self, voters, counts):
+        self.vote.refresh_from_db()
+        self.assertEqual(self.vote.voters_count, voters)
+        for option, count in zip([self.option1, self.option2], counts):
+            option.refresh_from_db()
+            self.assertEqual(option.responses_count, count)
+    
+    def test_counters_follow_responses(self):
+        """Тест оновлення лічильників при створенні та видаленні відповідей"""
+        response = VoteResponse.objects.create(user=self.user, vote_option=self.option1)
+        VoteResponse.objects.create(user=self.user2, vote_option=self.option2)
+        self.assertTallies(2, [1, 1])
+        
+        response.delete()
+        self.assertTallies(1, [0, 1])
+    
+    def test_cascade_delete_does_not_update_per_response(self):
+        """Тест що видалення голосування не оновлює лічильники для кожної відповіді"""
+        def delete_queries(count):
+            vote = Vote.objects.create(title='Каскад', description='Опис', created_by=self.user)
+            option = VoteOption.objects.create(vote=vote, text='Так')
+            for index in range(count):
+                user = User.objects.create_user(username=f'voter{count}_{index}')
+                VoteResponse.objects.create(user=user, vote_option=option)
+            with CaptureQueriesContext(connection) as queries:
+                vote.delete()
+            return [q['sql'] for q in queries.captured_queries]
+
+        few = delete_queries(1)
+        many = delete_queries(10)
+        self.assertEqual(len(many), len(few))
+        self.assertFalse([sql for sql in many if sql.startswith('UPDATE')])
+
+    def test_option_delete_recounts_voters_once(self):
+        """Тест що видалення варіанту перераховує учасників одним запитом"""
+        VoteResponse.objects.create(user=self.user, vote_option=self.option1)
+        VoteResponse.objects.create(user=self.user2, vote_option=self.option2)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.option1.delete()
+
+        updates = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.vote.refresh_from_db()
+        self.option2.refresh_from_db()
+        self.assertEqual((self.vote.voters_count, self.option2.responses_count), (1, 1))
+
+    def test_revote_moves_counter(self):
+        """Тест що переголосування переносить голос, а не додає новий"""
+        self.client.login(username='testuser', password='testpass123')
+        url = reverse('voting:vote_detail', kwargs={'pk': self.vote.pk})
+        
+        self.client.post(url, {'vote_option': self.option1.pk})
+        self.assertTallies(1, [1, 0])
+        
+        self.client.post(url, {'vote_option': self.option2.pk})
+        self.assertTallies(1, [0, 1])
+    
+    def test_recount_votes_command(self):
+        """Тест перебудови лічильників командою recount_votes"""
+        VoteResponse.objects.create(user=self.user, vote_option=self.option1)
+        VoteResponse.objects.create(user=self.user2, vote_option=self.option1)
+        Vote.objects.update(voters_count=0)
+        VoteOption.objects.update(responses_count=7)
+        
+        call_command('recount_votes', stdout=StringIO())
+        self.assertTallies(2, [2, 0])
+    
+    def test_pages_without_aggregate_queries(self):
+        """Тест що список і результати не рахують голоси агрегатами"""
+        VoteResponse.objects.create(user=self.user, vote_option=self.option1)
+        VoteResponse.objects.create(user=self.user2, vote_option=self.option2)
+        self.client.login(username='testuser', password='testpass123')
+        
+        for url in [
+            reverse('voting:vote_list'),
+            reverse('voting:vote_results', kwargs={'pk': self.vote.pk}),
+        ]:
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            aggregates = [
+                q['sql'] for q in ctx.captured_queries
+                if 'voting_voteresponse' in q['sql'] and 'COUNT(' in q['sql']
+            ]
+            self.assertEqual(aggregates, [])
+        
+        percentages = [stat['percentage'] for stat in response.context['options_stats']]
+        self.assertEqual(percentages, [50.0, 50.0])
+
+
+class VoteResultsServiceTest(TestCase):
+    """Тести для сервісу результатів голосування"""
+    
+    def setUp(self):
+        self.client = Client()
+        
+        self.moderator = User.objects.create_user(username='moderator', password='modpass123')
+        self.moderator.groups.add(Group.objects.create(name='Moderators'))
+        
+        self.vote = Vote.objects.create(
+            title='Тест',
+            description='Опис',
+            created_by=self.moderator
+        )
+        self.options = [
+            VoteOption.objects.create(vote=self.vote, text=f'Варіант {i}', order=i)
+            for i in range(3)
+        ]
+        for i in range(4):
+            user = User.objects.create_user(username=f'voter{i}', password='pass123')
+            VoteResponse.objects.create(user=user, vote_option=self.options[i % 2])
+    
+    def results_queries(self):
+        self.client.login(username='moderator', password='modpass123')
+        url = reverse('voting:vote_results', kwargs={'pk': self.vote.pk})
+        self.client.get(url)  # прогріваємо кеш ролей
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+    
+    def test_results_query_count_is_constant(self):
+        """Тест що кількість запитів не залежить від кількості варіантів і голосів"""
+        before = self.results_queries()
+        
+        for i in range(3, 10):
+            option = VoteOption.objects.create(vote=self.vote, text=f'Варіант {i}', order=i)
+            user = User.objects.create_user(username=f'late{i}', password='pass123')
+            VoteResponse.objects.create(user=user, vote_option=option)
+        
+        self.assertEqual(self.results_queries(), before)
+    
+    def test_results_json(self):
+        """Тест JSON-представлення результатів"""
+        self.client.login(username='moderator', password='modpass123')
+        response = self.client.get(
+            reverse('voting:vote_results_json', kwargs={'pk': self.vote.pk})
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['total_votes'], 4)
+        self.assertEqual([o['count'] for o in data['options']], [2, 2, 0])
+        self.assertEqual([o['percentage'] for o in data['options']], [50.0, 50.0, 0])
+        self.assertEqual(len(data['options'][0]['voters']), 2)
+    
+    def test_results_json_hides_voters_for_members(self):
+        """Тест що звичайний користувач не бачить, хто голосував"""
+        User.objects.create_user(username='member', password='pass123')
+        self.client.login(username='member', password='pass123')
+        data = self.client.get(
+            reverse('voting:vote_results_json', kwargs={'pk': self.vote.pk})
+        ).json()
+        
+        self.assertNotIn('voters', data['options'][0])
+
+
+class VoteListQueryTest(TestCase):
+    """Тести для анотованого списку голосувань"""
+    
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.login(username='testuser', password='testpass123')
+    
+    def create_votes(self, count, **kwargs):
+        for i in range(count):
+            author = User.objects.create_user(username=f'author{Vote.objects.count()}')
+            vote = Vote.objects.create(title=f'Голосування {i}', description='Опис', created_by=author, **kwargs)
+            option = VoteOption.objects.create(vote=vote, text='Варіант', order=1)
+            VoteResponse.objects.create(user=self.user, vote_option=option)
+    
+    def list_queries(self):
+        self.client.get(reverse('voting:vote_list'))  # прогріваємо кеш ролей
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('voting:vote_list'))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+    
+    def test_list_query_count_is_constant(self):
+        """Тест що кількість запитів не залежить від кількості карток"""
+        self.create_votes(1)
+        before = self.list_queries()
+        
+        self.create_votes(9)
+        self.assertEqual(self.list_queries(), before)
+    
+    def test_open_state_matches_model(self):
+        """Тест що open_now збігається з Vote.is_open()"""
+        now = timezone.now()
+        self.create_votes(1)
+        self.create_votes(1, start_date=now + timedelta(days=1))
+        self.create_votes(1, start_date=now - timedelta(days=2), end_date=now - timedelta(days=1))
+        self.create_votes(1, is_active=False)
+        
+        for vote in Vote.objects.with_open_state():
+            self.assertEqual(vote.open_now, vote.is_open())
+    
+    def test_user_voted_flag(self):
+        """Тест позначки про участь користувача"""
+        self.create_votes(1)
+        other = User.objects.create_user(username='other')
+        
+        self.assertTrue(Vote.objects.with_user_voted(self.user).get().user_voted)
+        self.assertFalse(Vote.objects.with_user_voted(other).get().user_voted)
+
+
+class CastVoteTest(TestCase):
+    """Тести для атомарного запису голосу"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.vote = Vote.objects.create(title='Тест', description='Опис', created_by=self.user)
+        self.option1 = VoteOption.objects.create(vote=self.vote, text='Варіант 1', order=1)
+        self.option2 = VoteOption.objects.create(vote=self.vote, text='Варіант 2', order=2)
+    
+    def test_database_rejects_second_response(self):
+        """Тест що БД не допускає двох відповідей одного користувача"""
+        VoteResponse.objects.create(user=self.user, vote_option=self.option1)
+        with self.assertRaises(IntegrityError):
+            VoteResponse.objects.create(user=self.user, vote_option=self.option2)
+    
+    def test_revote_updates_existing_response(self):
+        """Тест що переголосування оновлює ту саму відповідь"""
+        first, created = cast_vote(self.user, self.vote, self.option1)
+        self.assertTrue(created)
+        second, created = cast_vote(self.user, self.vote, self.option2)
+        
+        self.assertFalse(created)
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(VoteResponse.objects.get().vote_option, self.option2)
+        self.option1.refresh_from_db()
+        self.option2.refresh_from_db()
+        self.assertEqual((self.option1.responses_count, self.option2.responses_count), (0, 1))
+    
+    def test_lost_race_updates_winner_response(self):
+        """Тест що запит, який програв гонку, не падає і не дублює відповідь"""
+        VoteResponse.objects.create(user=self.user, vote_option=self.option1)
+        
+        # Імітуємо паралельний запит: перевірка не бачить відповіді, яку вже створено
+        with mock.patch('voting.services.VoteResponse.objects.select_for_update') as select:
+            select.return_value.filter.return_value.first.return_value = None
+            select.return_value.get.side_effect = lambda **kw: VoteResponse.objects.get(**kw)
+            response, created = cast_vote(self.user, self.vote, self.option2)
+        
+        self.assertFalse(created)
+        self.assertEqual(VoteResponse.objects.count(), 1)
+        self.assertEqual(response.vote_option, self.option2)
+        self.vote.refresh_from_db()
+        self.assertEqual(self.vote.voters_count, 1)
+    
+    def test_no_revote_when_forbidden(self):
+        """Тест заборони переголосування"""
+        self.vote.allow_revote = False
+        self.vote.save()
+        cast_vote(self.user, self.vote, self.option1)
+        
+        with self.assertRaises(RevoteNotAllowedError):
+            cast_vote(self.user, self.vote, self.option2)
+        self.assertEqual(VoteResponse.objects.get().vote_option, self.option1)
+
+
+class ConcurrentVoteTest(TransactionTestCase):
+    """Стрес-тест паралельного надсилання голосу"""
+    
+    def test_concurrent_submissions(self):
+        user = User.objects.create_user(username='testuser', password='testpass123')
+        vote = Vote.objects.create(title='Тест', description='Опис', created_by=user)
+        options = [
+            VoteOption.objects.create(vote=vote, text=f'Варіант {i}', order=i)
+            for i in range(2)
+        ]
+        errors = []
+        barrier = threading.Barrier(8)
+        
+        def submit(i):
+            try:
+                barrier.wait()
+                for attempt in range(20):
+                    try:
+                        cast_vote(user, vote, options[i % 2])
+                        break
+                    except OperationalError:
+                        # SQLite блокує паралельних записувачів - пробуємо ще раз
+                        continue
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connections.close_all()
+        
+        threads = [threading.Thread(target=submit, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(errors, [])
+        self.assertEqual(VoteResponse.objects.filter(user=user, vote=vote).count(), 1)
+        vote.refresh_from_db()
+        self.assertEqual(vote.voters_count, 1)
+        self.assertEqual(sum(VoteOption.objects.values_list('responses_count', flat=True)), 1)
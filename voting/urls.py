@@ -12,6 +12,7 @@ urlpatterns = [
     
     # Результати голосування
     path('<int:pk>/results/', views.VoteResultsView.as_view(), name='vote_results'),
+    path('<int:pk>/results/json/', views.VoteResultsJsonView.as_view(), name='vote_results_json'),
     
     # CRUD операції (тільки для модераторів/адміністраторів)
     path('create/', views.VoteCreateView.as_view(), name='vote_create'),
@@ -1,18 +1,20 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
-from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
 from django.contrib import messages
 from django.db import transaction
 from django.http import JsonResponse
+from core.mixins import ModeratorRequiredMixin as PortalModeratorMixin
+from core.permissions import get_portal_roles
 from .models import Vote, VoteOption, VoteResponse
 from .forms import VoteForm, VoteOptionFormSet, VoteResponseForm
+from .services import VoteError, cast_vote, ensure_open, vote_results, results_as_dict
 
 
-class ModeratorRequiredMixin(UserPassesTestMixin):
-    """Mixin для перевірки прав модератора або адміністратора"""
-    def test_func(self):
-        return self.request.user.is_staff or self.request.user.groups.filter(name='Moderators').exists()
+class ModeratorRequiredMixin(PortalModeratorMixin):
+    """Модератори голосувань: staff або члени групи Moderators"""
+    moderator_check = 'is_vote_moderator'
 
 
 class VoteListView(LoginRequiredMixin, ListView):
@@ -23,22 +25,14 @@ class VoteListView(LoginRequiredMixin, ListView):
     paginate_by = 10
     
     def get_queryset(self):
-        queryset = super().get_queryset()
+        # Автор, стан відкритості та "чи голосував я" приходять одним запитом,
+        # кількість учасників - з лічильника Vote.voters_count
+        queryset = super().get_queryset().select_related('created_by').with_open_state()
+        queryset = queryset.with_user_voted(self.request.user)
         # Показуємо тільки активні голосування для звичайних користувачів
-        if not (self.request.user.is_staff or self.request.user.groups.filter(name='Moderators').exists()):
+        if not get_portal_roles(self.request).is_vote_moderator:
             queryset = queryset.filter(is_active=True)
         return queryset
-    
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        # Додаємо інформацію про те, чи голосував користувач
-        if self.request.user.is_authenticated:
-            user_votes = VoteResponse.objects.filter(
-                user=self.request.user,
-                vote_option__vote__in=context['votes']
-            ).values_list('vote_option__vote_id', flat=True)
-            context['user_votes'] = set(user_votes)
-        return context
 
 
 class VoteDetailView(LoginRequiredMixin, DetailView):
@@ -59,7 +53,7 @@ class VoteDetailView(LoginRequiredMixin, DetailView):
         context['can_vote'] = vote.is_open() and (not context['has_voted'] or vote.allow_revote)
         
         # Додаємо статистику
-        context['total_votes'] = vote.total_votes()
+        context['total_votes'] = vote.voters_count
         
         # Додаємо форму для голосування
         if context['can_vote']:
@@ -70,38 +64,24 @@ class VoteDetailView(LoginRequiredMixin, DetailView):
     def post(self, request, *args, **kwargs):
         """Обробка голосування"""
         vote = self.get_object()
-        
-        if not vote.is_open():
-            messages.error(request, "Це голосування вже завершено або ще не розпочато.")
-            return redirect('voting:vote_detail', pk=vote.pk)
-        
-        # Перевірка, чи користувач вже голосував
-        user_response = VoteResponse.get_user_response(request.user, vote)
-        
-        if user_response and not vote.allow_revote:
-            messages.error(request, "Ви вже проголосували. Переголосування заборонено.")
+        # Стан голосування перевіряємо до форми: закрите не вибирає варіантів
+        try:
+            ensure_open(vote)
+        except VoteError as e:
+            messages.error(request, str(e))
             return redirect('voting:vote_detail', pk=vote.pk)
-        
+
         form = VoteResponseForm(request.POST, vote=vote)
-        
         if form.is_valid():
-            option = form.cleaned_data['vote_option']
-            
-            # Якщо користувач вже голосував, видаляємо стару відповідь
-            if user_response:
-                user_response.delete()
-            
-            # Створюємо нову відповідь
-            VoteResponse.objects.create(
-                user=request.user,
-                vote_option=option
-            )
-            
-            messages.success(request, "Ваш голос збережено!")
-            return redirect('voting:vote_detail', pk=vote.pk)
+            try:
+                cast_vote(request.user, vote, form.cleaned_data['vote_option'])
+            except VoteError as e:
+                messages.error(request, str(e))
+            else:
+                messages.success(request, "Ваш голос збережено!")
         else:
             messages.error(request, "Помилка при голосуванні. Будь ласка, спробуйте ще раз.")
-            return redirect('voting:vote_detail', pk=vote.pk)
+        return redirect('voting:vote_detail', pk=vote.pk)
 
 
 class VoteCreateView(LoginRequiredMixin, ModeratorRequiredMixin, CreateView):
@@ -212,30 +192,22 @@ class VoteResultsView(LoginRequiredMixin, DetailView):
     template_name = 'voting/vote_results.html'  # З 's' - стандартна назва
     context_object_name = 'vote'
     
+    def show_voters(self):
+        """Список тих, хто голосував, бачать лише модератори і тільки для неанонімних голосувань"""
+        return not self.object.is_anonymous and get_portal_roles(self.request).is_vote_moderator
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        vote = self.object
+        show_voters = self.show_voters()
         
-        # Збираємо статистику по кожному варіанту
-        options_stats = []
-        for option in vote.options.all():
-            options_stats.append({
-                'option': option,
-                'count': option.vote_count(),
-                'percentage': option.vote_percentage()
-            })
-        
-        context['options_stats'] = options_stats
-        context['total_votes'] = vote.total_votes()
-        
-        # Якщо голосування не анонімне і користувач - модератор
-        if not vote.is_anonymous and (self.request.user.is_staff or 
-                                       self.request.user.groups.filter(name='Moderators').exists()):
-            context['show_voters'] = True
-            # Отримуємо список користувачів для кожного варіанту
-            for stat in options_stats:
-                stat['voters'] = VoteResponse.objects.filter(
-                    vote_option=stat['option']
-                ).select_related('user').order_by('-voted_at')
-        
-        return context
\ No newline at end of file
+        # Вся статистика рахується сервісом за сталу кількість запитів
+        context.update(vote_results(self.object, include_voters=show_voters))
+        context['show_voters'] = show_voters
+        return context
+
+
+class VoteResultsJsonView(VoteResultsView):
+    """Результати голосування у форматі JSON"""
+    
+    def render_to_response(self, context, **response_kwargs):
+        return JsonResponse(results_as_dict(self.object, context))